@@ -0,0 +1,177 @@
+"""
+Answer cache in front of RAGChatbot.chat/achat.
+
+Students ask the same questions in slightly different words, and each one
+costs an embedding, a Pinecone query and a Gemini generation. Lookups go:
+
+1. exact: the normalized query (lowercase, punctuation and extra spaces
+   removed) was answered before -> no embedding, search or generation
+2. semantic: the query embedding has cosine similarity of at least
+   CHAT_CACHE_SIMILARITY with a cached query's -> no search or generation
+
+Only real answers are stored (not errors or "nothing found"). Entries
+expire after CHAT_CACHE_TTL seconds and the cache keeps at most
+CHAT_CACHE_MAX_ENTRIES (least recently used are dropped first). Answers
+depend on the indexed PDFs, so process_pdfs clears the cache; the
+/process-pdfs endpoint also bumps the "chatbot" namespace version in the
+shared-state backend so the other workers drop theirs (sync_version). A
+chat that started before a clear does not store its answer.
+
+The cache is per worker process.
+
+Settings (env):
+    CHAT_CACHE_ENABLED      "false" to turn the cache off
+    CHAT_CACHE_MAX_ENTRIES  default 256
+    CHAT_CACHE_TTL          seconds, default 3600
+    CHAT_CACHE_SIMILARITY   cosine similarity threshold, default 0.92
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+CHAT_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "true").lower() != "false"
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "256"))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "3600"))
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0.92"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    return _SPACES.sub(" ", _PUNCTUATION.sub(" ", query.lower())).strip()
+
+
+def _unit(embedding) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class _Entry:
+    __slots__ = ("top_k", "embedding", "result", "expires_at")
+
+    def __init__(self, top_k: int, embedding: np.ndarray, result: Dict[str, Any], expires_at: float):
+        self.top_k = top_k
+        self.embedding = embedding
+        self.result = result
+        self.expires_at = expires_at
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        max_entries: int = CHAT_CACHE_MAX_ENTRIES,
+        ttl: float = CHAT_CACHE_TTL,
+        similarity: float = CHAT_CACHE_SIMILARITY,
+        enabled: bool = CHAT_CACHE_ENABLED,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self.enabled = enabled
+        # (top_k, normalized query) -> entry, least recently used first
+        self._entries: "OrderedDict[Tuple[int, str], _Entry]" = OrderedDict()
+        # Stacked unit embeddings of _entries, rebuilt after a change
+        self._keys = []
+        self._matrix: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.generation = 0
+        self._version: Optional[int] = None
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "invalidations": 0}
+
+    def _drop(self, key):
+        del self._entries[key]
+        self._matrix = None
+
+    def _live(self, key) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_exact(self, query: str, top_k: int) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._live((top_k, normalize_query(query)))
+            if entry is None:
+                return None
+            self._stats["exact_hits"] += 1
+            return entry.result
+
+    def get_similar(self, embedding, top_k: int) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Best cached answer for the same top_k whose query is similar enough, with its similarity."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            if self._matrix is None and self._entries:
+                self._keys = list(self._entries)
+                self._matrix = np.stack([self._entries[key].embedding for key in self._keys])
+            if self._matrix is not None:
+                scores = self._matrix @ _unit(embedding)
+                for i in np.argsort(scores)[::-1]:
+                    if scores[i] < self.similarity:
+                        break
+                    key = self._keys[i]
+                    if key[0] != top_k:
+                        continue
+                    entry = self._live(key)
+                    if entry is not None:
+                        self._stats["semantic_hits"] += 1
+                        return entry.result, float(scores[i])
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, query: str, top_k: int, embedding, result: Dict[str, Any], generation: int):
+        """Store an answer computed while the cache was at `generation` (dropped if cleared since)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            key = (top_k, normalize_query(query))
+            self._entries[key] = _Entry(top_k, _unit(embedding), result, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self.generation += 1
+            self._stats["invalidations"] += 1
+
+    def sync_version(self, version: int):
+        """Clear the cache if the shared "chatbot" version moved since the last call."""
+        if self._version is not None and version != self._version:
+            self.clear()
+        self._version = version
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._stats["exact_hits"] + self._stats["semantic_hits"]
+            lookups = hits + self._stats["misses"]
+            return {
+                **self._stats,
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "similarity_threshold": self.similarity,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+            }
+
+
+answer_cache = AnswerCache()
@@ -1,20 +1,112 @@
 import os
+import asyncio
 import logging
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from dotenv import load_dotenv
 
+import numpy as np
 import google.generativeai as genai
-from pinecone import Pinecone, ServerlessSpec
 from pypdf import PdfReader
 from sentence_transformers import SentenceTransformer
 import uuid
 
+from backend.AI.answer_cache import answer_cache
+from backend.AI.vector_store import LocalVectorStore, VectorStore, make_vector_store
+from backend.utils.cache import namespace_version
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Chat requests never run the pipeline on the event loop:
+#   CHAT_EMBED_WORKERS      threads for SentenceTransformer.encode (default 1; torch already
+#                           parallelises a single encode across cores and releases the GIL)
+#   CHAT_IO_WORKERS         threads for the blocking vector store and other blocking calls (default 8)
+#   CHAT_EMBED_TIMEOUT      seconds for the query embedding (default 10)
+#   CHAT_SEARCH_TIMEOUT     seconds for the vector store query (default 10)
+#   CHAT_GENERATE_TIMEOUT   seconds for the Gemini answer (default 60)
+# A stage over its timeout fails the request with 504; a timed-out thread
+# still finishes in the background and its result is dropped.
+#   CHAT_STATS_TTL          seconds describe_index_stats results are reused (default 60)
+# PDF ingestion (process_pdfs) encodes and upserts chunks in batches
+# (benchmark: python -m backend.AI.chatbot):
+#   CHAT_UPSERT_BATCH_SIZE  chunks per encode call and per vector store upsert (default 100,
+#                           the batch size Pinecone recommends)
+#   CHAT_EMBED_BATCH_SIZE   batch_size passed to SentenceTransformer.encode (default 32)
+#   CHAT_UPSERT_WORKERS     upserts in flight while the next batch encodes (default 4)
+# Encoding dominates ingestion on CPU (about 95 ms per chunk with an
+# all-MiniLM-L6-v2-shaped model on one core), so with batches of 100 a PDF
+# needs only a few upserts and the upsert settings stay within noise; the
+# workers matter when upsert round trips are slow.
+CHAT_EMBED_WORKERS = int(os.getenv("CHAT_EMBED_WORKERS", "1"))
+CHAT_IO_WORKERS = int(os.getenv("CHAT_IO_WORKERS", "8"))
+CHAT_EMBED_TIMEOUT = float(os.getenv("CHAT_EMBED_TIMEOUT", "10"))
+CHAT_SEARCH_TIMEOUT = float(os.getenv("CHAT_SEARCH_TIMEOUT", "10"))
+CHAT_GENERATE_TIMEOUT = float(os.getenv("CHAT_GENERATE_TIMEOUT", "60"))
+CHAT_STATS_TTL = float(os.getenv("CHAT_STATS_TTL", "60"))
+CHAT_UPSERT_BATCH_SIZE = int(os.getenv("CHAT_UPSERT_BATCH_SIZE", "100"))
+CHAT_EMBED_BATCH_SIZE = int(os.getenv("CHAT_EMBED_BATCH_SIZE", "32"))
+CHAT_UPSERT_WORKERS = int(os.getenv("CHAT_UPSERT_WORKERS", "4"))
+
+_embed_pool: Optional[ThreadPoolExecutor] = None
+_io_pool: Optional[ThreadPoolExecutor] = None
+
+
+class ChatTimeoutError(TimeoutError):
+    """A chat stage (embedding, vector search, generation) took longer than its timeout."""
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"{stage} timed out after {timeout:g}s")
+        self.stage = stage
+
+
+def _get_embed_pool() -> ThreadPoolExecutor:
+    global _embed_pool
+    if _embed_pool is None:
+        _embed_pool = ThreadPoolExecutor(max_workers=CHAT_EMBED_WORKERS, thread_name_prefix="embed")
+    return _embed_pool
+
+
+def _get_io_pool() -> ThreadPoolExecutor:
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=CHAT_IO_WORKERS, thread_name_prefix="chat-io")
+    return _io_pool
+
+
+def shutdown_chat_pools():
+    global _embed_pool, _io_pool
+    for pool in (_embed_pool, _io_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _embed_pool = _io_pool = None
+
+
+async def _stage(name: str, timeout: float, awaitable):
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Chat stage '{name}' timed out after {timeout:g}s")
+        raise ChatTimeoutError(name, timeout)
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+
+def _log_timings(timings: Dict[str, float], outcome: str):
+    stages = ", ".join(f"{stage.removesuffix('_ms')} {ms:.0f} ms" for stage, ms in timings.items())
+    logger.info(f"Chat {outcome}" + (f": {stages}" if stages else ""))
+
+
+async def run_blocking(func, *args):
+    """Run a blocking chatbot call (vector store, PDF processing) in the chat I/O pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_io_pool(), func, *args)
+
 class RAGChatbot:
     def __init__(
         self,
@@ -22,17 +114,19 @@ class RAGChatbot:
         pinecone_api_key: Optional[str] = None,
         index_name: str = "takrapdfs",
         data_folder: str = "data",
-        embedding_model_name: str = "all-MiniLM-L6-v2"
+        embedding_model_name: str = "all-MiniLM-L6-v2",
+        vector_store: Optional[VectorStore] = None
     ):
         """
-        Initialize RAG Chatbot with Gemini and Pinecone
+        Initialize RAG Chatbot with Gemini and a vector store
         
         Args:
             gemini_api_key: Google Gemini API key (defaults to GEMINI_API_KEY env var)
             pinecone_api_key: Pinecone API key (defaults to PINECONE_API_KEY env var)
-            index_name: Name of the Pinecone index
+            index_name: Name of the Pinecone index (also the local store's name)
             data_folder: Path to folder containing PDFs
             embedding_model_name: Name of the sentence transformer model for embeddings
+            vector_store: Store for the chunk embeddings (defaults to the one CHAT_VECTOR_STORE selects)
         """
         # Get Gemini API key
         self.gemini_api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
@@ -48,14 +142,13 @@ class RAGChatbot:
         self.embedding_model = SentenceTransformer(embedding_model_name)
         self.embedding_dimension = self.embedding_model.get_sentence_embedding_dimension()
         
-        # Initialize Pinecone client
-        self.pinecone_api_key = pinecone_api_key or os.getenv("PINECONE_API_KEY")
-        if not self.pinecone_api_key:
-            raise ValueError("PINECONE_API_KEY not found. Please set it in environment variables or pass it as parameter.")
-        
-        self.pc = Pinecone(api_key=self.pinecone_api_key)
+        # Vector store (Pinecone, or the local index for offline use)
+        self.store = vector_store or make_vector_store(self.embedding_dimension, index_name, pinecone_api_key)
         self.index_name = index_name
-        self.index = None  # Will be initialized on first use
+        # Cached store stats and when they were fetched (time.monotonic)
+        self._stats = None
+        self._stats_at = 0.0
+        self.answer_cache = answer_cache
         
         # Data folder path - resolve relative to this file's directory
         data_path = Path(data_folder)
@@ -71,112 +164,14 @@ class RAGChatbot:
         if not self.data_folder.exists():
             raise ValueError(f"Data folder not found: {self.data_folder}")
         
-        logger.info(f"RAG Chatbot initialized with Pinecone index: {index_name}")
+        logger.info(f"RAG Chatbot initialized with {self.store.kind} vector store: {index_name}")
     
-    def _ensure_index_connected(self):
-        """Ensure Pinecone index is connected, create if needed"""
-        if self.index is not None:
-            try:
-                # Test connection by describing the index
-                self.index.describe_index_stats()
-                return True
-            except Exception as e:
-                logger.warning(f"Pinecone index connection lost, attempting to reconnect: {e}")
-                self.index = None
-        
-        # Initialize or connect to Pinecone index
-        try:
-            # Check if index exists
-            existing_indexes = [idx.name for idx in self.pc.list_indexes()]
-            
-            if self.index_name not in existing_indexes:
-                # Create index if it doesn't exist
-                logger.info(f"Creating Pinecone index: {self.index_name} with dimension {self.embedding_dimension}")
-                self.pc.create_index(
-                    name=self.index_name,
-                    dimension=self.embedding_dimension,
-                    metric="cosine",
-                    spec=ServerlessSpec(
-                        cloud="aws",
-                        region="us-east-1"  # You can change this to your preferred region
-                    )
-                )
-                logger.info(f"Created new Pinecone index: {self.index_name}. Waiting for index to be ready...")
-                # Wait for index to be ready (Pinecone serverless indexes can take a moment)
-                max_wait = 60  # Maximum wait time in seconds
-                wait_time = 0
-                while wait_time < max_wait:
-                    try:
-                        # Check if index is ready by trying to connect
-                        temp_index = self.pc.Index(self.index_name)
-                        temp_index.describe_index_stats()  # This will fail if index isn't ready
-                        logger.info("Index is ready!")
-                        break
-                    except Exception:
-                        time.sleep(2)
-                        wait_time += 2
-                if wait_time >= max_wait:
-                    logger.warning(f"Index creation may still be in progress. Continuing anyway...")
-            else:
-                logger.info(f"Pinecone index {self.index_name} already exists")
-                # Check if the existing index has the correct dimension
-                try:
-                    index_info = self.pc.describe_index(self.index_name)
-                    existing_dimension = index_info.dimension
-                    if existing_dimension != self.embedding_dimension:
-                        logger.warning(
-                            f"Dimension mismatch detected! Index '{self.index_name}' has dimension {existing_dimension}, "
-                            f"but embedding model produces {self.embedding_dimension} dimensions. "
-                            f"Deleting and recreating index..."
-                        )
-                        # Delete the existing index
-                        self.pc.delete_index(self.index_name)
-                        logger.info(f"Deleted index {self.index_name}. Waiting before recreation...")
-                        time.sleep(5)  # Wait a bit for deletion to complete
-                        
-                        # Recreate with correct dimension
-                        logger.info(f"Creating Pinecone index: {self.index_name} with dimension {self.embedding_dimension}")
-                        self.pc.create_index(
-                            name=self.index_name,
-                            dimension=self.embedding_dimension,
-                            metric="cosine",
-                            spec=ServerlessSpec(
-                                cloud="aws",
-                                region="us-east-1"
-                            )
-                        )
-                        logger.info(f"Recreated index {self.index_name} with correct dimension. Waiting for index to be ready...")
-                        # Wait for index to be ready
-                        max_wait = 60
-                        wait_time = 0
-                        while wait_time < max_wait:
-                            try:
-                                temp_index = self.pc.Index(self.index_name)
-                                temp_index.describe_index_stats()
-                                logger.info("Index is ready!")
-                                break
-                            except Exception:
-                                time.sleep(2)
-                                wait_time += 2
-                        if wait_time >= max_wait:
-                            logger.warning(f"Index creation may still be in progress. Continuing anyway...")
-                        logger.warning(
-                            f"Index was recreated with correct dimension. "
-                            f"You will need to re-index your PDFs by calling process_pdfs(force_reload=True)"
-                        )
-                except Exception as e:
-                    logger.warning(f"Could not verify index dimension: {e}. Continuing anyway...")
-            
-            # Connect to the index
-            self.index = self.pc.Index(self.index_name)
-            logger.info("Successfully connected to Pinecone index")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to connect to Pinecone index: {e}")
-            raise ConnectionError(
-                f"Could not connect to Pinecone index '{self.index_name}'. "
-                f"Please check your PINECONE_API_KEY and index configuration. Error: {str(e)}"
-            )
+    def _index_stats(self, max_age: float = CHAT_STATS_TTL):
+        """Vector store stats, reused for up to max_age seconds"""
+        if self._stats is None or time.monotonic() - self._stats_at > max_age:
+            self._stats = self.store.stats()
+            self._stats_at = time.monotonic()
+        return self._stats
     
     def _get_embedding(self, text: str) -> List[float]:
         """Get embedding for text using sentence-transformers"""
@@ -187,6 +182,16 @@ class RAGChatbot:
             logger.error(f"Error getting embedding: {e}")
             raise
     
+    def _get_embeddings(self, texts: List[str], batch_size: int = CHAT_EMBED_BATCH_SIZE) -> np.ndarray:
+        """Unit-length float32 embeddings for texts, one row each, encoded in batches"""
+        embeddings = self.embedding_model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+    
     def _chunk_text(self, text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
         """Split text into chunks with overlap"""
         chunks = []
@@ -211,23 +216,87 @@ class RAGChatbot:
             logger.error(f"Error extracting text from PDF {pdf_path}: {e}")
             raise
     
-    def process_pdfs(self, force_reload: bool = False) -> Dict[str, Any]:
+    def _embed_and_upsert(
+        self,
+        chunks: List[str],
+        source: str,
+        upsert_pool: ThreadPoolExecutor,
+        upsert_batch_size: int,
+        embed_batch_size: int,
+        max_in_flight: int
+    ) -> Tuple[int, Optional[Exception]]:
+        """Encode the chunks of one PDF batch by batch, upserting each batch in upsert_pool
+        
+        Returns the number of chunks stored and the first upsert error (None if
+        every upsert succeeded); the count includes batches stored before and
+        after a failed one. A batch that fails to encode is skipped.
         """
-        Process all PDFs in the data folder and store in Pinecone
+        pending = deque()
+        stored = 0
+        error = None
+        
+        def settle(future, count: int):
+            nonlocal stored, error
+            try:
+                future.result()
+                stored += count
+            except Exception as e:
+                error = error or e
+        
+        for start in range(0, len(chunks), upsert_batch_size):
+            batch = chunks[start:start + upsert_batch_size]
+            try:
+                # One tolist() per batch instead of one per vector
+                embeddings = self._get_embeddings(batch, embed_batch_size).tolist()
+            except Exception as e:
+                logger.error(f"Error embedding chunks {start}-{start + len(batch) - 1} from {source}: {e}")
+                continue
+            
+            vectors = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "values": embedding,
+                    "metadata": {
+                        "text": chunk,
+                        "source": source,
+                        "chunk_index": start + offset,
+                        "total_chunks": len(chunks)
+                    }
+                }
+                for offset, (chunk, embedding) in enumerate(zip(batch, embeddings))
+            ]
+            # Bound the batches held in memory to the ones being upserted
+            if len(pending) >= max_in_flight:
+                settle(*pending.popleft())
+            pending.append((upsert_pool.submit(self.store.upsert, vectors), len(vectors)))
+        
+        while pending:
+            settle(*pending.popleft())
+        return stored, error
+    
+    def process_pdfs(
+        self,
+        force_reload: bool = False,
+        upsert_batch_size: int = CHAT_UPSERT_BATCH_SIZE,
+        embed_batch_size: int = CHAT_EMBED_BATCH_SIZE,
+        upsert_workers: int = CHAT_UPSERT_WORKERS
+    ) -> Dict[str, Any]:
+        """
+        Process all PDFs in the data folder and store them in the vector store
         
         Args:
             force_reload: If True, reprocess all PDFs even if already indexed
+            upsert_batch_size: Chunks encoded together and sent in one upsert
+            embed_batch_size: batch_size for SentenceTransformer.encode
+            upsert_workers: Upserts allowed in flight while the next batch encodes
         
         Returns:
             Dictionary with processing results
         """
-        # Ensure Pinecone index is connected
-        self._ensure_index_connected()
-        
         # Check if index already has data (indexing should be done only once)
         if not force_reload:
             try:
-                stats = self.index.describe_index_stats()
+                stats = self._index_stats(max_age=0)
                 total_vectors = stats.get('total_vector_count', 0)
                 if total_vectors > 0:
                     logger.info(f"Index {self.index_name} already has {total_vectors} vectors. Skipping indexing. Use force_reload=True to reindex.")
@@ -248,164 +317,102 @@ class RAGChatbot:
         
         processed_count = 0
         total_chunks = 0
+        errors = []
         
-        for pdf_path in pdf_files:
-            try:
-                logger.info(f"Processing PDF: {pdf_path.name}")
-                
-                # Extract text from PDF
-                text = self._extract_text_from_pdf(pdf_path)
-                
-                if not text.strip():
-                    logger.warning(f"No text extracted from {pdf_path.name}")
-                    continue
-                
-                # Chunk the text
-                chunks = self._chunk_text(text)
-                logger.info(f"Created {len(chunks)} chunks from {pdf_path.name}")
-                
-                # Generate embeddings and store in Pinecone
-                vectors_to_upsert = []
-                for idx, chunk in enumerate(chunks):
-                    try:
-                        embedding = self._get_embedding(chunk)
-                        vector_id = str(uuid.uuid4())
-                        
-                        vectors_to_upsert.append({
-                            "id": vector_id,
-                            "values": embedding,
-                            "metadata": {
-                                "text": chunk,
-                                "source": pdf_path.name,
-                                "chunk_index": idx,
-                                "total_chunks": len(chunks)
-                            }
-                        })
-                    except Exception as e:
-                        logger.error(f"Error processing chunk {idx} from {pdf_path.name}: {e}")
+        # Upserts run in this pool while the next batch is encoded
+        with ThreadPoolExecutor(max_workers=upsert_workers, thread_name_prefix="upsert") as upsert_pool:
+            for pdf_path in pdf_files:
+                try:
+                    logger.info(f"Processing PDF: {pdf_path.name}")
+                    
+                    # Extract text from PDF
+                    text = self._extract_text_from_pdf(pdf_path)
+                    
+                    if not text.strip():
+                        logger.warning(f"No text extracted from {pdf_path.name}")
                         continue
-                
-                # Upsert vectors to Pinecone in batches
-                if vectors_to_upsert:
-                    # Pinecone recommends batch sizes of 100
-                    batch_size = 100
-                    for i in range(0, len(vectors_to_upsert), batch_size):
-                        batch = vectors_to_upsert[i:i + batch_size]
-                        self.index.upsert(vectors=batch)
                     
-                    processed_count += 1
-                    total_chunks += len(vectors_to_upsert)
-                    logger.info(f"Stored {len(vectors_to_upsert)} chunks from {pdf_path.name} in Pinecone")
-                
-            except Exception as e:
-                logger.error(f"Error processing PDF {pdf_path.name}: {e}")
-                continue
+                    # Chunk the text
+                    chunks = self._chunk_text(text)
+                    logger.info(f"Created {len(chunks)} chunks from {pdf_path.name}")
+                    
+                    # Generate embeddings and store them
+                    stored, error = self._embed_and_upsert(
+                        chunks, pdf_path.name, upsert_pool, upsert_batch_size, embed_batch_size, upsert_workers
+                    )
+                    # Count partial writes too, so stats and cached answers are invalidated
+                    total_chunks += stored
+                    if stored:
+                        self._stats = None
+                        logger.info(f"Stored {stored} chunks from {pdf_path.name} in the {self.store.kind} vector store")
+                    if error is not None:
+                        raise error
+                    if stored:
+                        processed_count += 1
+                    
+                except Exception as e:
+                    logger.error(f"Error processing PDF {pdf_path.name}: {e}")
+                    errors.append({"file": pdf_path.name, "error": str(e)})
+                    continue
+        
+        if total_chunks:
+            # Cached answers were generated from the previous index
+            self.answer_cache.clear()
         
         return {
-            "message": "PDFs processed successfully",
+            "message": "PDFs processed with errors" if errors else "PDFs processed successfully",
             "processed_files": processed_count,
-            "total_chunks": total_chunks
+            "total_chunks": total_chunks,
+            "errors": errors
         }
     
-    def _search_relevant_chunks(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-        """Search for relevant chunks in Pinecone"""
-        # Ensure Pinecone index is connected
-        self._ensure_index_connected()
-        
+    def _query_chunks(self, query_embedding: List[float], top_k: int = 5) -> List[Dict[str, Any]]:
+        """Query the vector store with an embedding (blocking)"""
         try:
-            # Get query embedding
-            query_embedding = self._get_embedding(query)
-            
             # Ensure query_embedding is a list of floats (not numpy array)
             if not isinstance(query_embedding, list):
                 query_embedding = query_embedding.tolist() if hasattr(query_embedding, 'tolist') else list(query_embedding)
             
-            # Ensure top_k is valid (must be > 1 for Pinecone)
-            if top_k < 2:
-                top_k = 2
-                logger.warning(f"top_k must be > 1, using {top_k} instead")
-            
             logger.debug(f"Query embedding dimension: {len(query_embedding)}, top_k: {top_k}")
-            
-            # Query Pinecone index - use the correct format from Pinecone SDK
-            # Format: index.query(vector=[...], top_k=int, include_metadata=bool)
-            search_results = self.index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                include_metadata=True
-            )
-            
-            # Format results - Pinecone returns QueryResponse object with matches attribute
-            chunks = []
-            
-            if hasattr(search_results, 'matches') and search_results.matches:
-                for match in search_results.matches:
-                    # Extract metadata - it's a dict in Pinecone responses
-                    metadata = match.metadata if hasattr(match, 'metadata') else {}
-                    if not isinstance(metadata, dict):
-                        # Convert to dict if it's an object
-                        metadata = dict(metadata) if hasattr(metadata, '__dict__') else {}
-                    
-                    chunks.append({
-                        "text": metadata.get("text", ""),
-                        "source": metadata.get("source", ""),
-                        "score": float(match.score) if hasattr(match, 'score') else 0.0
-                    })
-            else:
-                logger.warning(f"No matches found in search results. Response type: {type(search_results)}")
-            
-            return chunks
+            return self.store.query(query_embedding, top_k)
         except Exception as e:
             logger.error(f"Error searching chunks: {e}")
             raise ConnectionError(
-                f"Failed to query Pinecone index. "
+                f"Failed to query the {self.store.kind} vector store. "
                 f"Make sure the index '{self.index_name}' exists and has been indexed. "
                 f"Error: {str(e)}"
             )
     
-    def chat(self, user_query: str, top_k: int = 5) -> Dict[str, Any]:
-        """
-        Chat with the RAG system
-        
-        Args:
-            user_query: User's question
-            top_k: Number of relevant chunks to retrieve
-        
-        Returns:
-            Dictionary with response and metadata
-        """
+    def _no_chunks_result(self) -> Dict[str, Any]:
+        """Answer when the search found nothing (blocking if the cached index stats are stale)"""
         try:
-            # Search for relevant chunks
-            relevant_chunks = self._search_relevant_chunks(user_query, top_k)
-            
-            if not relevant_chunks:
-                # Check if index is empty
-                try:
-                    stats = self.index.describe_index_stats()
-                    total_vectors = stats.get('total_vector_count', 0)
-                    if total_vectors == 0:
-                        return {
-                            "response": "The knowledge base is empty. Please process PDFs first by calling the /api/chatbot/process-pdfs endpoint.",
-                            "sources": [],
-                            "chunks_used": 0
-                        }
-                except Exception:
-                    pass
-                
+            stats = self._index_stats()
+            total_vectors = stats.get('total_vector_count', 0)
+            if total_vectors == 0:
                 return {
-                    "response": "I couldn't find relevant information in the documents. Please try rephrasing your question or ensure PDFs have been processed.",
+                    "response": "The knowledge base is empty. Please process PDFs first by calling the /api/chatbot/process-pdfs endpoint.",
                     "sources": [],
                     "chunks_used": 0
                 }
-            
-            # Build context from chunks
-            context = "\n\n".join([
-                f"[Source: {chunk['source']}]\n{chunk['text']}"
-                for chunk in relevant_chunks
-            ])
-            
-            # Create prompt with context
-            prompt = f"""You are a helpful assistant that answers questions based on the provided context from PDF documents.
+        except Exception:
+            pass
+        
+        return {
+            "response": "I couldn't find relevant information in the documents. Please try rephrasing your question or ensure PDFs have been processed.",
+            "sources": [],
+            "chunks_used": 0
+        }
+    
+    @staticmethod
+    def _build_prompt(user_query: str, relevant_chunks: List[Dict[str, Any]]) -> str:
+        # Build context from chunks
+        context = "\n\n".join([
+            f"[Source: {chunk['source']}]\n{chunk['text']}"
+            for chunk in relevant_chunks
+        ])
+        
+        # Create prompt with context
+        return f"""You are a helpful assistant that answers questions based on the provided context from PDF documents.
 
 Context from documents:
 {context}
@@ -415,42 +422,161 @@ User Question: {user_query}
 Please provide a clear and accurate answer based on the context above. If the context doesn't contain enough information to answer the question, say so. Cite the source when possible.
 
 Answer:"""
+    
+    @staticmethod
+    def _answer_result(response, relevant_chunks: List[Dict[str, Any]]) -> Dict[str, Any]:
+        answer = response.text if hasattr(response, 'text') else str(response)
+        
+        # Extract sources
+        sources = list(set([chunk['source'] for chunk in relevant_chunks]))
+        
+        return {
+            "response": answer,
+            "sources": sources,
+            "chunks_used": len(relevant_chunks),
+            "relevant_chunks": relevant_chunks
+        }
+    
+    @staticmethod
+    def _cached_result(result: Dict[str, Any], hit: str, timings: Dict[str, float]) -> Dict[str, Any]:
+        _log_timings(timings, f"answered from cache ({hit})")
+        return {**result, "cache_hit": hit, "timings": timings}
+    
+    @staticmethod
+    def _error_result(e: Exception) -> Dict[str, Any]:
+        logger.error(f"Error in chat: {e}")
+        return {
+            "response": f"Sorry, I encountered an error: {str(e)}",
+            "sources": [],
+            "chunks_used": 0,
+            "error": str(e)
+        }
+    
+    def chat(self, user_query: str, top_k: int = 5) -> Dict[str, Any]:
+        """
+        Chat with the RAG system (blocking; the API uses achat)
+
+        The answer cache is not synced with the shared "chatbot" cache
+        version here, so chat() only sees invalidation done by this
+        process (reindexing through this instance); answers cached before
+        another worker reindexed can still be returned. Use achat where
+        that matters.
+
+        Args:
+            user_query: User's question
+            top_k: Number of relevant chunks to retrieve
+        
+        Returns:
+            Dictionary with response and metadata
+        """
+        cached = self.answer_cache.get_exact(user_query, top_k)
+        if cached is not None:
+            return self._cached_result(cached, "exact", {})
+        
+        generation = self.answer_cache.generation
+        timings: Dict[str, float] = {}
+        try:
+            start = time.perf_counter()
+            query_embedding = self._get_embedding(user_query)
+            timings["embed_ms"] = _elapsed_ms(start)
             
-            # Generate response using Gemini
-            response = self.model.generate_content(prompt)
-            answer = response.text if hasattr(response, 'text') else str(response)
+            similar = self.answer_cache.get_similar(query_embedding, top_k)
+            if similar is not None:
+                return self._cached_result(similar[0], "semantic", timings)
             
-            # Extract sources
-            sources = list(set([chunk['source'] for chunk in relevant_chunks]))
+            # Search for relevant chunks
+            start = time.perf_counter()
+            relevant_chunks = self._query_chunks(query_embedding, top_k)
+            result = None if relevant_chunks else self._no_chunks_result()
+            timings["search_ms"] = _elapsed_ms(start)
             
-            return {
-                "response": answer,
-                "sources": sources,
-                "chunks_used": len(relevant_chunks),
-                "relevant_chunks": relevant_chunks
-            }
+            if result is None:
+                # Generate response using Gemini
+                start = time.perf_counter()
+                response = self.model.generate_content(self._build_prompt(user_query, relevant_chunks))
+                timings["generate_ms"] = _elapsed_ms(start)
+                result = self._answer_result(response, relevant_chunks)
+                self.answer_cache.put(user_query, top_k, query_embedding, result, generation)
             
         except Exception as e:
-            logger.error(f"Error in chat: {e}")
-            return {
-                "response": f"Sorry, I encountered an error: {str(e)}",
-                "sources": [],
-                "chunks_used": 0,
-                "error": str(e)
-            }
+            result = self._error_result(e)
+        _log_timings(timings, "answered" if "error" not in result else "failed")
+        return {**result, "timings": timings}
     
-    def get_collection_info(self) -> Dict[str, Any]:
-        """Get information about the Pinecone index"""
+    async def achat(self, user_query: str, top_k: int = 5) -> Dict[str, Any]:
+        """
+        Chat with the RAG system without blocking the event loop
+        
+        The embedding runs in the embedding pool, the vector store query in the
+        chat I/O pool and generation on Gemini's async client, each with its
+        own timeout. Per-stage latency is logged and returned under "timings".
+        
+        Raises:
+            ChatTimeoutError: a stage took longer than its timeout
+        """
+        try:
+            # Another worker may have reindexed
+            self.answer_cache.sync_version(await namespace_version("chatbot"))
+        except Exception as e:
+            logger.warning(f"Could not read the chatbot cache version: {e}")
+        cached = self.answer_cache.get_exact(user_query, top_k)
+        if cached is not None:
+            return self._cached_result(cached, "exact", {})
+        
+        loop = asyncio.get_running_loop()
+        generation = self.answer_cache.generation
+        timings: Dict[str, float] = {}
         try:
-            # Ensure Pinecone index is connected
-            self._ensure_index_connected()
+            start = time.perf_counter()
+            query_embedding = await _stage(
+                "embedding", CHAT_EMBED_TIMEOUT,
+                loop.run_in_executor(_get_embed_pool(), self._get_embedding, user_query),
+            )
+            timings["embed_ms"] = _elapsed_ms(start)
+            
+            similar = self.answer_cache.get_similar(query_embedding, top_k)
+            if similar is not None:
+                return self._cached_result(similar[0], "semantic", timings)
+            
+            start = time.perf_counter()
+            relevant_chunks = await _stage(
+                "vector search", CHAT_SEARCH_TIMEOUT,
+                run_blocking(self._query_chunks, query_embedding, top_k),
+            )
+            result = None
+            if not relevant_chunks:
+                result = await _stage("vector search", CHAT_SEARCH_TIMEOUT, run_blocking(self._no_chunks_result))
+            timings["search_ms"] = _elapsed_ms(start)
+            
+            if result is None:
+                start = time.perf_counter()
+                response = await _stage(
+                    "generation", CHAT_GENERATE_TIMEOUT,
+                    self.model.generate_content_async(self._build_prompt(user_query, relevant_chunks)),
+                )
+                timings["generate_ms"] = _elapsed_ms(start)
+                result = self._answer_result(response, relevant_chunks)
+                self.answer_cache.put(user_query, top_k, query_embedding, result, generation)
             
-            stats = self.index.describe_index_stats()
+        except ChatTimeoutError:
+            _log_timings(timings, "timed out")
+            raise
+        except Exception as e:
+            result = self._error_result(e)
+        _log_timings(timings, "answered" if "error" not in result else "failed")
+        return {**result, "timings": timings}
+    
+    def get_collection_info(self) -> Dict[str, Any]:
+        """Get information about the vector store"""
+        try:
+            stats = self._index_stats()
             return {
                 "index_name": self.index_name,
+                "vector_store": self.store.kind,
                 "total_vector_count": stats.get('total_vector_count', 0),
                 "dimension": stats.get('dimension', 0),
-                "index_fullness": stats.get('index_fullness', 0)
+                "index_fullness": stats.get('index_fullness', 0),
+                "stats_age_seconds": round(time.monotonic() - self._stats_at, 1)
             }
         except ConnectionError as e:
             return {"error": str(e), "pinecone_connected": False}
@@ -462,9 +588,69 @@ Answer:"""
 # Global chatbot instance (lazy initialization)
 _chatbot_instance: Optional[RAGChatbot] = None
 
+_chatbot_lock = asyncio.Lock()
+
 def get_chatbot() -> RAGChatbot:
     """Get or create chatbot instance"""
     global _chatbot_instance
     if _chatbot_instance is None:
         _chatbot_instance = RAGChatbot()
     return _chatbot_instance
+
+
+async def aget_chatbot() -> RAGChatbot:
+    """get_chatbot for async code: the first call loads the embedding model in a thread"""
+    global _chatbot_instance
+    if _chatbot_instance is None:
+        async with _chatbot_lock:
+            if _chatbot_instance is None:
+                _chatbot_instance = await run_blocking(RAGChatbot)
+    return _chatbot_instance
+
+
+def _benchmark(upsert_latency: float = 0.05):
+    """Chunks per second embedding and upserting the bundled PDFs into a throwaway local index
+    
+    Text extraction is done once up front and not timed. Each upsert sleeps
+    upsert_latency seconds first, standing in for a Pinecone round trip, so
+    the overlap of encoding and upserts shows.
+    """
+    import tempfile
+    
+    class DelayedStore(LocalVectorStore):
+        def upsert(self, vectors):
+            time.sleep(upsert_latency)
+            super().upsert(vectors)
+    
+    # The placeholder store is replaced per run once the model's dimension is known
+    bot = RAGChatbot(gemini_api_key=os.getenv("GEMINI_API_KEY") or "benchmark", vector_store=VectorStore())
+    pdf_files = list(bot.data_folder.glob("*.pdf"))
+    chunks = [chunk for pdf_path in pdf_files for chunk in bot._chunk_text(bot._extract_text_from_pdf(pdf_path))]
+    print(f"{len(chunks)} chunks from {', '.join(p.name for p in pdf_files)}, {upsert_latency * 1000:.0f} ms per upsert")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        def report(name: str, run):
+            bot.store = DelayedStore(os.path.join(tmp, str(len(os.listdir(tmp)))), bot.embedding_dimension)
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            print(f"  {name:44} {len(chunks) / elapsed:8.1f} chunks/s  ({elapsed:.2f} s)")
+        
+        def per_chunk():
+            # The previous ingestion: one encode per chunk, upserts after all of them
+            vectors = [{"id": str(uuid.uuid4()), "values": bot._get_embedding(chunk), "metadata": {"text": chunk}} for chunk in chunks]
+            for i in range(0, len(vectors), CHAT_UPSERT_BATCH_SIZE):
+                bot.store.upsert(vectors[i:i + CHAT_UPSERT_BATCH_SIZE])
+        
+        report("per-chunk encode, sequential upserts", per_chunk)
+        for upsert_batch_size, upsert_workers in ((CHAT_UPSERT_BATCH_SIZE, 1), (8, 1), (8, CHAT_UPSERT_WORKERS)):
+            def batched():
+                with ThreadPoolExecutor(max_workers=upsert_workers) as upsert_pool:
+                    bot._embed_and_upsert(
+                        chunks, "benchmark", upsert_pool, upsert_batch_size, CHAT_EMBED_BATCH_SIZE, upsert_workers
+                    )
+            report(f"batches of {upsert_batch_size}, {upsert_workers} upsert(s) in flight", batched)
+
+
+if __name__ == "__main__":
+    _benchmark()
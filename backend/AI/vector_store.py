@@ -0,0 +1,424 @@
+"""
+Vector stores for the RAG chatbot.
+
+RAGChatbot keeps its chunk embeddings in a VectorStore, chosen with
+CHAT_VECTOR_STORE:
+
+    pinecone    default; the Pinecone serverless index (needs PINECONE_API_KEY
+                and the pinecone package)
+    local       LocalVectorStore: a float32 matrix memory-mapped from
+                CHAT_LOCAL_INDEX_DIR, searched in process with no network
+
+The corpus is a handful of PDFs, i.e. a few hundred chunks, so the local
+store searches by brute force: one matrix-vector product over unit-length
+rows gives exact cosine scores in microseconds, and an approximate index
+(HNSW and the like) would not pay for itself at this size.
+
+Stores are blocking; RAGChatbot calls them from its chat I/O pool.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Not on Windows; the local store then only guards against threads of one process.
+    fcntl = None
+
+try:
+    from pinecone import Pinecone, ServerlessSpec
+except ImportError:
+    # Without the package only the local store is available.
+    Pinecone = ServerlessSpec = None
+
+logger = logging.getLogger(__name__)
+
+CHAT_VECTOR_STORE = os.getenv("CHAT_VECTOR_STORE", "pinecone").lower()
+CHAT_LOCAL_INDEX_DIR = os.getenv("CHAT_LOCAL_INDEX_DIR") or str(Path(__file__).parent / "index")
+
+
+class VectorStore:
+    """Chunk embeddings with their metadata ({"text", "source", ...})"""
+    kind = ""
+    
+    def query(self, vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+        """The top_k closest chunks as {"text", "source", "score"}, best first"""
+        raise NotImplementedError
+    
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        """Insert or replace vectors given as {"id", "values", "metadata"}"""
+        raise NotImplementedError
+    
+    def stats(self) -> Dict[str, Any]:
+        """{"total_vector_count", "dimension", "index_fullness"}"""
+        raise NotImplementedError
+
+
+class PineconeStore(VectorStore):
+    kind = "pinecone"
+    
+    def __init__(self, api_key: str, index_name: str, dimension: int):
+        if Pinecone is None:
+            raise ValueError("CHAT_VECTOR_STORE is pinecone but the pinecone package is not installed")
+        self.pc = Pinecone(api_key=api_key)
+        self.index_name = index_name
+        self.dimension = dimension
+        self.index = None  # Will be initialized on first use
+    
+    def _ensure_index_connected(self):
+        """Connect to the Pinecone index on first use, create if needed
+        
+        An established connection is not re-checked here; a failure shows up
+        in the real call, and _with_reconnect reconnects and retries it.
+        """
+        if self.index is not None:
+            return True
+        
+        # Initialize or connect to Pinecone index
+        try:
+            # Check if index exists
+            existing_indexes = [idx.name for idx in self.pc.list_indexes()]
+            
+            if self.index_name not in existing_indexes:
+                # Create index if it doesn't exist
+                logger.info(f"Creating Pinecone index: {self.index_name} with dimension {self.dimension}")
+                self.pc.create_index(
+                    name=self.index_name,
+                    dimension=self.dimension,
+                    metric="cosine",
+                    spec=ServerlessSpec(
+                        cloud="aws",
+                        region="us-east-1"  # You can change this to your preferred region
+                    )
+                )
+                logger.info(f"Created new Pinecone index: {self.index_name}. Waiting for index to be ready...")
+                # Wait for index to be ready (Pinecone serverless indexes can take a moment)
+                max_wait = 60  # Maximum wait time in seconds
+                wait_time = 0
+                while wait_time < max_wait:
+                    try:
+                        # Check if index is ready by trying to connect
+                        temp_index = self.pc.Index(self.index_name)
+                        temp_index.describe_index_stats()  # This will fail if index isn't ready
+                        logger.info("Index is ready!")
+                        break
+                    except Exception:
+                        time.sleep(2)
+                        wait_time += 2
+                if wait_time >= max_wait:
+                    logger.warning(f"Index creation may still be in progress. Continuing anyway...")
+            else:
+                logger.info(f"Pinecone index {self.index_name} already exists")
+                # Check if the existing index has the correct dimension
+                try:
+                    index_info = self.pc.describe_index(self.index_name)
+                    existing_dimension = index_info.dimension
+                    if existing_dimension != self.dimension:
+                        logger.warning(
+                            f"Dimension mismatch detected! Index '{self.index_name}' has dimension {existing_dimension}, "
+                            f"but embedding model produces {self.dimension} dimensions. "
+                            f"Deleting and recreating index..."
+                        )
+                        # Delete the existing index
+                        self.pc.delete_index(self.index_name)
+                        logger.info(f"Deleted index {self.index_name}. Waiting before recreation...")
+                        time.sleep(5)  # Wait a bit for deletion to complete
+                        
+                        # Recreate with correct dimension
+                        logger.info(f"Creating Pinecone index: {self.index_name} with dimension {self.dimension}")
+                        self.pc.create_index(
+                            name=self.index_name,
+                            dimension=self.dimension,
+                            metric="cosine",
+                            spec=ServerlessSpec(
+                                cloud="aws",
+                                region="us-east-1"
+                            )
+                        )
+                        logger.info(f"Recreated index {self.index_name} with correct dimension. Waiting for index to be ready...")
+                        # Wait for index to be ready
+                        max_wait = 60
+                        wait_time = 0
+                        while wait_time < max_wait:
+                            try:
+                                temp_index = self.pc.Index(self.index_name)
+                                temp_index.describe_index_stats()
+                                logger.info("Index is ready!")
+                                break
+                            except Exception:
+                                time.sleep(2)
+                                wait_time += 2
+                        if wait_time >= max_wait:
+                            logger.warning(f"Index creation may still be in progress. Continuing anyway...")
+                        logger.warning(
+                            f"Index was recreated with correct dimension. "
+                            f"You will need to re-index your PDFs by calling process_pdfs(force_reload=True)"
+                        )
+                except Exception as e:
+                    logger.warning(f"Could not verify index dimension: {e}. Continuing anyway...")
+            
+            # Connect to the index
+            self.index = self.pc.Index(self.index_name)
+            logger.info("Successfully connected to Pinecone index")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to connect to Pinecone index: {e}")
+            raise ConnectionError(
+                f"Could not connect to Pinecone index '{self.index_name}'. "
+                f"Please check your PINECONE_API_KEY and index configuration. Error: {str(e)}"
+            )
+    
+    def _with_reconnect(self, call):
+        """Run call(index); if it fails, reconnect once and retry"""
+        self._ensure_index_connected()
+        try:
+            return call(self.index)
+        except Exception as e:
+            logger.warning(f"Pinecone call failed, reconnecting: {e}")
+            self.index = None
+            self._ensure_index_connected()
+            return call(self.index)
+    
+    def query(self, vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+        # Ensure top_k is valid (must be > 1 for Pinecone)
+        if top_k < 2:
+            top_k = 2
+            logger.warning(f"top_k must be > 1, using {top_k} instead")
+        
+        # Query Pinecone index - use the correct format from Pinecone SDK
+        # Format: index.query(vector=[...], top_k=int, include_metadata=bool)
+        search_results = self._with_reconnect(lambda index: index.query(
+            vector=vector,
+            top_k=top_k,
+            include_metadata=True
+        ))
+        
+        # Format results - Pinecone returns QueryResponse object with matches attribute
+        chunks = []
+        
+        if hasattr(search_results, 'matches') and search_results.matches:
+            for match in search_results.matches:
+                # Extract metadata - it's a dict in Pinecone responses
+                metadata = match.metadata if hasattr(match, 'metadata') else {}
+                if not isinstance(metadata, dict):
+                    # Convert to dict if it's an object
+                    metadata = dict(metadata) if hasattr(metadata, '__dict__') else {}
+                
+                chunks.append({
+                    "text": metadata.get("text", ""),
+                    "source": metadata.get("source", ""),
+                    "score": float(match.score) if hasattr(match, 'score') else 0.0
+                })
+        else:
+            logger.warning(f"No matches found in search results. Response type: {type(search_results)}")
+        
+        return chunks
+    
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        self._with_reconnect(lambda index: index.upsert(vectors=vectors))
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = self._with_reconnect(lambda index: index.describe_index_stats())
+        return {
+            "total_vector_count": stats.get('total_vector_count', 0),
+            "dimension": stats.get('dimension', 0),
+            "index_fullness": stats.get('index_fullness', 0)
+        }
+
+
+class LocalVectorStore(VectorStore):
+    """Exact cosine search over a memory-mapped float32 matrix
+    
+    Files in the index directory:
+        vectors.f32     unit-length float32 rows, one per chunk
+        metadata.jsonl  one {"id", "metadata"} line per row
+        index.json      {"dimension": ...}
+        index.lock      flock target shared by every process using the index
+    
+    Rows are appended on upsert (an existing id is overwritten in place), and
+    the matrix is re-mapped read-only afterwards, so searches never copy it
+    into memory.
+    
+    Several gunicorn workers may open the same directory. Writers hold an
+    exclusive flock on index.lock and re-read the files first, so row offsets
+    come from what is on disk; readers hold a shared flock and reload when the
+    files' size or mtime changed since they last read them.
+    """
+    kind = "local"
+    
+    def __init__(self, path: str, dimension: int, name: str = "local"):
+        self.path = Path(path)
+        self.dimension = dimension
+        self.index_name = name
+        self._vectors_file = self.path / "vectors.f32"
+        self._metadata_file = self.path / "metadata.jsonl"
+        self._info_file = self.path / "index.json"
+        self._lock_file = self.path / "index.lock"
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._metadata: List[Dict[str, Any]] = []
+        self._matrix: Optional[np.memmap] = None
+        self._signature = None
+        self.path.mkdir(parents=True, exist_ok=True)
+        # The file lock is always taken before self._lock
+        with self._file_lock(exclusive=True), self._lock:
+            self._check_dimension()
+            self._read()
+    
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """Cross-process lock on index.lock (a fresh descriptor each time, so threads don't share it)"""
+        with self._lock_file.open("a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+    
+    def _files_signature(self):
+        signature = []
+        for file in (self._vectors_file, self._metadata_file, self._info_file):
+            try:
+                stat = file.stat()
+                signature.append((stat.st_size, stat.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def _reset(self):
+        for file in (self._vectors_file, self._metadata_file):
+            file.unlink(missing_ok=True)
+        self._info_file.write_text(json.dumps({"dimension": self.dimension}))
+    
+    def _check_dimension(self):
+        if self._info_file.exists():
+            existing_dimension = json.loads(self._info_file.read_text()).get("dimension")
+            if existing_dimension != self.dimension:
+                logger.warning(
+                    f"Dimension mismatch detected! Local index '{self.path}' has dimension {existing_dimension}, "
+                    f"but embedding model produces {self.dimension} dimensions. Clearing it; "
+                    f"re-index your PDFs by calling process_pdfs(force_reload=True)"
+                )
+                self._reset()
+        else:
+            self._reset()
+    
+    def _read(self) -> int:
+        """Load the files into memory (under the file lock). Returns the number of rows in vectors.f32."""
+        metadata = []
+        if self._metadata_file.exists():
+            with self._metadata_file.open(encoding="utf-8") as f:
+                metadata = [json.loads(line) for line in f if line.strip()]
+        rows = self._vectors_file.stat().st_size // (4 * self.dimension) if self._vectors_file.exists() else 0
+        # A write interrupted between the two files leaves extra rows or lines; ignore them
+        count = min(rows, len(metadata))
+        self._metadata = metadata[:count]
+        self._ids = {entry["id"]: row for row, entry in enumerate(self._metadata)}
+        self._map(count)
+        self._signature = self._files_signature()
+        return rows
+    
+    def _refresh(self):
+        """Reload if another process (or store instance) wrote since the last read; call with the file lock held."""
+        if self._files_signature() != self._signature:
+            with self._lock:
+                self._read()
+    
+    def _map(self, count: int):
+        self._matrix = np.memmap(self._vectors_file, dtype=np.float32, mode="r", shape=(count, self.dimension)) if count else None
+    
+    def _unit_rows(self, vectors: List[Dict[str, Any]]) -> np.ndarray:
+        matrix = np.asarray([v["values"] for v in vectors], dtype=np.float32).reshape(len(vectors), self.dimension)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+    
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        if not vectors:
+            return
+        rows = self._unit_rows(vectors)
+        with self._file_lock(exclusive=True), self._lock:
+            # Offsets come from the files as they are now, not from this process's last read
+            file_rows = self._read()
+            count = len(self._metadata)
+            rewrite_metadata = False
+            if file_rows != count:
+                # Drop the unpaired tail left by an interrupted write before appending
+                with self._vectors_file.open("r+b") as f:
+                    f.truncate(count * 4 * self.dimension)
+                rewrite_metadata = True
+            
+            replaced = [(self._ids[v["id"]], i) for i, v in enumerate(vectors) if v["id"] in self._ids]
+            added = [i for i, v in enumerate(vectors) if v["id"] not in self._ids]
+            
+            if replaced:
+                matrix = np.memmap(self._vectors_file, dtype=np.float32, mode="r+", shape=(count, self.dimension))
+                for row, i in replaced:
+                    matrix[row] = rows[i]
+                    self._metadata[row] = {"id": vectors[i]["id"], "metadata": vectors[i].get("metadata") or {}}
+                matrix.flush()
+                del matrix
+                rewrite_metadata = True
+            if added:
+                with self._vectors_file.open("ab") as f:
+                    f.write(rows[added].tobytes())
+                for i in added:
+                    self._ids[vectors[i]["id"]] = len(self._metadata)
+                    self._metadata.append({"id": vectors[i]["id"], "metadata": vectors[i].get("metadata") or {}})
+            
+            if rewrite_metadata:
+                with self._metadata_file.open("w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(entry) + "\n" for entry in self._metadata)
+            elif added:
+                with self._metadata_file.open("a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(self._metadata[row]) + "\n" for row in range(count, len(self._metadata)))
+            self._map(len(self._metadata))
+            self._signature = self._files_signature()
+    
+    def query(self, vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+        with self._file_lock(exclusive=False):
+            self._refresh()
+            matrix, metadata = self._matrix, self._metadata
+            if matrix is None or top_k < 1:
+                return []
+            query = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(query)
+            scores = matrix @ (query / norm if norm else query)
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        chunks = []
+        for row in best[np.argsort(-scores[best])]:
+            entry = metadata[row]["metadata"]
+            chunks.append({
+                "text": entry.get("text", ""),
+                "source": entry.get("source", ""),
+                "score": float(scores[row])
+            })
+        return chunks
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._file_lock(exclusive=False):
+            self._refresh()
+            count = len(self._metadata)
+        return {
+            "total_vector_count": count,
+            "dimension": self.dimension,
+            "index_fullness": 0.0
+        }
+
+
+def make_vector_store(dimension: int, index_name: str, pinecone_api_key: Optional[str] = None) -> VectorStore:
+    """The store selected by CHAT_VECTOR_STORE"""
+    if CHAT_VECTOR_STORE == "local":
+        return LocalVectorStore(CHAT_LOCAL_INDEX_DIR, dimension, name=index_name)
+    if CHAT_VECTOR_STORE != "pinecone":
+        raise ValueError(f"Unknown CHAT_VECTOR_STORE '{CHAT_VECTOR_STORE}', use 'pinecone' or 'local'")
+    api_key = pinecone_api_key or os.getenv("PINECONE_API_KEY")
+    if not api_key:
+        raise ValueError("PINECONE_API_KEY not found. Please set it in environment variables or pass it as parameter.")
+    return PineconeStore(api_key, index_name, dimension)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict
 
 
 class AchievementBase(BaseModel):
@@ -10,6 +10,7 @@ class AchievementBase(BaseModel):
     description: str = Field(..., min_length=10, max_length=500)
     icon: str = Field(..., pattern="^(TrophyIcon|StarIcon|AcademicCapIcon)$")
     image_url: str = Field(default=None)
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None  # format -> width -> URL (srcset)
 
 class AchievementCreate(AchievementBase):
     pass
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict
 from datetime import datetime
 
 class BlogPostBase(BaseModel):
@@ -15,6 +15,22 @@ class BlogPostCreate(BlogPostBase):
 class BlogPostInDB(BlogPostBase):
     id: str
     image_url: Optional[str]
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None  # format -> width -> URL (srcset)
+    word_count: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+    likes: Optional[int] = 0
+
+class BlogPostSummary(BaseModel):
+    """List-view fields of a post; the body is only served by /posts/{post_id}."""
+    id: str
+    title: str
+    excerpt: str
+    author: str
+    read_time: str
+    word_count: Optional[int] = None
+    image_url: Optional[str]
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None
+    likes: Optional[int] = 0
     created_at: datetime
     updated_at: datetime
-    likes: Optional[int] = 0
\ No newline at end of file
@@ -11,6 +11,7 @@ class CompetitionBase(BaseModel):
     location: str
     description: str
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None  # format -> width -> URL (srcset)
     registration_open: bool = True
     # Taakra-specific
     category_id: Optional[str] = None
@@ -11,6 +11,7 @@ class EventBase(BaseModel):
     location: str
     description: str
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None  # format -> width -> URL (srcset)
     registration_open: bool = True
     modules: Optional[List[str]] = []  # modules/competitions
     module_amounts: Optional[Dict[str, int]] = {}  # module name to amount
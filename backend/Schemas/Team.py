@@ -82,6 +82,7 @@ class TeamMemberUpdate(TeamMemberBase):
 class TeamMemberInDB(TeamMemberBase):
     id: str
     image_url: Optional[str] = None
+    image_variants: Optional[Dict[str, Dict[str, str]]] = None  # format -> width -> URL (srcset)
     order_by_tenure: Optional[Dict[str, int]] = None  # e.g., {"2024-2025": 0, "2025-2026": 1}
     has_portal_access: Optional[bool] = False  # Whether member can login to portal
     created_at: datetime
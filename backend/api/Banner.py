@@ -6,6 +6,7 @@ import logging
 from typing import Optional
 from backend.Schemas.Banner import BannerItem
 from backend.config.database.init import get_misc_db
+from backend.utils.cache import cached, invalidates
 
 
 router = APIRouter()
@@ -13,6 +14,7 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/banner", response_model=dict)
+@invalidates("banner")
 async def create_banner(
     text: str = Form(...),
     link: Optional[str] = Form(None),
@@ -61,6 +63,7 @@ async def create_banner(
 
 
 @router.get("/banner", response_model=Optional[BannerItem])
+@cached("banner", ttl=60)
 async def get_active_banner(db=Depends(get_misc_db)):
     """Get the currently active banner"""
     try:
@@ -102,6 +105,7 @@ async def get_all_banners(db=Depends(get_misc_db)):
 
 
 @router.put("/banner/{banner_id}", response_model=dict)
+@invalidates("banner")
 async def update_banner(
     banner_id: str,
     text: Optional[str] = Form(None),
@@ -167,6 +171,7 @@ async def update_banner(
 
 
 @router.delete("/banner/{banner_id}")
+@invalidates("banner")
 async def delete_banner(banner_id: str, db=Depends(get_misc_db)):
     try:
         # Delete from MongoDB
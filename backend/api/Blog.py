@@ -1,20 +1,22 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Body
-from fastapi import Request
+from fastapi import Request, Response
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, timedelta
 from bson import ObjectId
-from backend.Schemas.Blog import BlogPostInDB
+from backend.Schemas.Blog import BlogPostInDB, BlogPostSummary
 from dotenv import load_dotenv  
 load_dotenv()
 import os
-from backend.utils.CloudinaryImageUploader import save_uploaded_image
+from backend.utils.CloudinaryImageUploader import save_uploaded_image_with_variants
 from backend.config.database.init import get_blog_db, get_misc_db
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from jinja2 import Template
-import smtplib
-from pathlib import Path
+from backend.utils.email_templates import has_template, render_email
+from backend.utils.mailer import build_message, enqueue_email
+from backend.utils.campaigns import create_campaign
+from backend.utils.pagination import PageParams, paginate
+from backend.utils.blog_stats import post_stats
+from backend.utils.cache import cached
+from backend.utils.responses import model_fields, trusted_response
 
 router=APIRouter()
 
@@ -24,7 +26,6 @@ class BlogSubmissionStatus(BaseModel):
 async def send_comment_notification_email(post_title: str, commenter_name: str, commenter_email: str, comment_body: str, post_id: str, timestamp: str):
     """Send email notification to admins when a new blog comment is posted."""
     sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
     
     # Recipient emails
     recipient_emails = [
@@ -33,9 +34,7 @@ async def send_comment_notification_email(post_title: str, commenter_name: str,
     ]
     
     # Load template
-    template_path = Path("backend/templates/blog_comment_notification.html")
-    
-    if not template_path.exists():
+    if not has_template("blog_comment_notification.html"):
         # Fallback HTML if template not found
         html_content = f"""
         <html>
@@ -50,12 +49,9 @@ async def send_comment_notification_email(post_title: str, commenter_name: str,
         </html>
         """
     else:
-        with open(template_path, 'r') as file:
-            template_content = file.read()
-        
-        template = Template(template_content)
         admin_url = f"https://fdc-pucit.org/fake/blogs"  # Admin panel URL
-        html_content = template.render(
+        html_content = render_email(
+            "blog_comment_notification.html",
             post_title=post_title,
             commenter_name=commenter_name,
             commenter_email=commenter_email,
@@ -80,31 +76,24 @@ async def send_comment_notification_email(post_title: str, commenter_name: str,
     
     # Send email to each recipient
     for receiver_email in recipient_emails:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = f"New Blog Comment: {post_title} - Taakra 2026"
-        msg["From"] = sender_email
-        msg["To"] = receiver_email
-        
-        part1 = MIMEText(text, "plain")
-        part2 = MIMEText(html_content, "html")
-        msg.attach(part1)
-        msg.attach(part2)
-        
-        try:
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-                server.login(sender_email, app_password)
-                server.sendmail(sender_email, receiver_email, msg.as_string())
-            print(f"Comment notification email sent to {receiver_email}")
-        except Exception as e:
-            print(f"Error sending comment notification email to {receiver_email}: {e}")
+        msg = build_message(
+            receiver_email,
+            f"New Blog Comment: {post_title} - Taakra 2026",
+            html=html_content,
+            text=text,
+            sender=sender_email,
+        )
+        if not enqueue_email(msg):
+            print(f"Error queueing comment notification email to {receiver_email}")
 
  
 
 # Blog post endpoints
 @router.get("/posts", response_model=list[BlogPostInDB])
-async def get_blog_posts(db=Depends(get_blog_db)):
+@trusted_response
+async def get_blog_posts(response: Response, page: PageParams = Depends(), db=Depends(get_blog_db)):
     blogs = []
-    async for post in db.blogs.find().sort("created_at", -1):
+    for post in await paginate(db.blogs, {}, page, response):
         blogs.append({
             "id": str(post["_id"]),
             "title": post["title"],
@@ -112,13 +101,31 @@ async def get_blog_posts(db=Depends(get_blog_db)):
             "content":post["content"],
             "author": post["author"],
             "read_time": post["read_time"],
+            "word_count": post.get("word_count"),
             "image_url": post.get("image_url"),
+            "image_variants": post.get("image_variants"),
             "likes": post.get("likes", 0),
             "created_at": post["created_at"],
             "updated_at": post["updated_at"]
         })
     return blogs
 
+# Fields of the blog index; the post body stays in Mongo
+SUMMARY_PROJECTION = {
+    "title": 1, "excerpt": 1, "author": 1, "read_time": 1, "word_count": 1,
+    "image_url": 1, "image_variants": 1, "likes": 1, "created_at": 1, "updated_at": 1,
+}
+
+@router.get("/posts/summaries", response_model=list[BlogPostSummary])
+@trusted_response
+async def get_blog_post_summaries(response: Response, page: PageParams = Depends(), db=Depends(get_blog_db)):
+    """Blog index without post bodies; fetch a full post from /posts/{post_id}."""
+    summaries = []
+    for post in await paginate(db.blogs, {}, page, response, SUMMARY_PROJECTION):
+        post["id"] = str(post["_id"])
+        summaries.append(model_fields(BlogPostSummary, post))
+    return summaries
+
 @router.post("/posts", response_model=BlogPostInDB)
 async def create_blog_post(
     title: str = Form(...),
@@ -131,16 +138,18 @@ async def create_blog_post(
     misc_db=Depends(get_misc_db)
 ):
     now = datetime.utcnow()
-    image_url = None
+    stats = post_stats(content, read_time)
+    image_url, image_variants = None, None
     if image:
-        image_url = await save_uploaded_image(image, "blogs",'BLOGS')
+        image_url, image_variants = await save_uploaded_image_with_variants(image, "blogs",'BLOGS')
     post_data = {
         "title": title,
         "excerpt": excerpt,
         "author": author,
         "content":content,
-        "read_time": read_time,
+        **stats,
         "image_url": image_url,
+        "image_variants": image_variants,
         "likes": 0,
         "created_at": now,
         "updated_at": now
@@ -217,7 +226,9 @@ async def get_blog_post(post_id: str, db=Depends(get_blog_db)):
         "author": post["author"],
         "content":post["content"],
         "read_time": post["read_time"],
+        "word_count": post.get("word_count"),
         "image_url": post.get("image_url"),
+        "image_variants": post.get("image_variants"),
         "likes": post.get("likes", 0),
         "created_at": post["created_at"],
         "updated_at": post["updated_at"]
@@ -244,12 +255,12 @@ async def update_blog_post(
         "excerpt": excerpt,
         "content": content,
         "author": author,
-        "read_time": read_time,
+        **post_stats(content, read_time),
         "updated_at": now
     }
     
     if image:
-        update_data["image_url"] = await save_uploaded_image(image, "blogs", "BLOGS")
+        update_data["image_url"], update_data["image_variants"] = await save_uploaded_image_with_variants(image, "blogs", "BLOGS")
 
     await db.blogs.update_one(
         {"_id": ObjectId(post_id)},
@@ -264,7 +275,9 @@ async def update_blog_post(
         "content": updated_post["content"],
         "author": updated_post["author"],
         "read_time": updated_post["read_time"],
+        "word_count": updated_post.get("word_count"),
         "image_url": updated_post.get("image_url"),
+        "image_variants": updated_post.get("image_variants"),
         "likes": updated_post.get("likes", 0),
         "created_at": updated_post["created_at"],
         "updated_at": updated_post["updated_at"]
@@ -407,13 +420,13 @@ async def verify_email_for_comment(
 
 
 @router.get('/posts/{post_id}/comments')
-async def list_comments(post_id: str, db=Depends(get_blog_db)):
+async def list_comments(post_id: str, response: Response, page: PageParams = Depends(), db=Depends(get_blog_db)):
     """List comments for a blog post. Only returns approved comments for public access."""
     comments = []
-    async for c in db.blog_comments.find({
+    for c in await paginate(db.blog_comments, {
         'post_id': post_id,
         'approved': True  # Only show approved comments
-    }).sort('created_at', -1):
+    }, page, response):
         # Convert ObjectId to string and remove _id field
         c['id'] = str(c.get('_id'))
         if '_id' in c:
@@ -597,17 +610,18 @@ async def submit_blog(
         raise HTTPException(status_code=400, detail="Verification token expired. Please verify your email again.")
     
     now = datetime.utcnow()
-    image_url = None
+    image_url, image_variants = None, None
     if image:
-        image_url = await save_uploaded_image(image, "blogs", 'BLOGS')
+        image_url, image_variants = await save_uploaded_image_with_variants(image, "blogs", 'BLOGS')
     
     submission_data = {
         "title": title,
         "excerpt": excerpt,
         "author": author,
         "content": content,
-        "read_time": read_time,
+        **post_stats(content, read_time),
         "image_url": image_url,
+        "image_variants": image_variants,
         "email": email,
         "status": "pending",
         "created_at": now,
@@ -630,7 +644,9 @@ async def submit_blog(
 
 @router.get("/submissions")
 async def get_blog_submissions(
+    response: Response,
     status: Optional[str] = None,
+    page: PageParams = Depends(),
     db=Depends(get_blog_db)
 ):
     """Get blog submissions. Filter by status if provided."""
@@ -639,7 +655,7 @@ async def get_blog_submissions(
         query["status"] = status
     
     submissions = []
-    async for submission in db.blog_submissions.find(query).sort("created_at", -1):
+    for submission in await paginate(db.blog_submissions, query, page, response):
         submissions.append({
             "id": str(submission["_id"]),
             "title": submission["title"],
@@ -648,6 +664,7 @@ async def get_blog_submissions(
             "read_time": submission["read_time"],
             "content": submission["content"],
             "image_url": submission.get("image_url"),
+            "image_variants": submission.get("image_variants"),
             "email": submission.get("email"),
             "status": submission["status"],
             "created_at": submission["created_at"],
@@ -677,8 +694,9 @@ async def approve_blog_submission(
         "excerpt": submission["excerpt"],
         "author": submission["author"],
         "content": submission["content"],
-        "read_time": submission["read_time"],
+        **post_stats(submission["content"], submission["read_time"]),
         "image_url": submission.get("image_url"),
+        "image_variants": submission.get("image_variants"),
         "likes": 0,
         "created_at": now,
         "updated_at": now
@@ -693,17 +711,10 @@ async def approve_blog_submission(
         {"$set": {"status": "approved", "updated_at": now, "published_post_id": str(new_post["_id"])}}
     )
     
-    # Notify all subscribers
-    sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
-    template_path = Path(__file__).parent.parent / "templates" / "blog_notification.html"
+    # Notify all subscribers through a background campaign (sent in batches, progress
+    # at /api/admin/campaigns/{campaign_id})
     blog_id = str(new_post["_id"])
-    
-    subscribers = misc_db.subscribers.find({})
-    async for subscriber in subscribers:
-        receiver_email = subscriber["email"]
-        if not template_path.exists():
-            html_content = f"""
+    fallback_html = f"""
             <html>
             <body>
                 <h2>New Blog Published!</h2>
@@ -716,39 +727,27 @@ async def approve_blog_submission(
             </body>
             </html>
             """
-        else:
-            with open(template_path, 'r') as file:
-                template_content = file.read()
-            template = Template(template_content)
-            html_content = template.render(
-                email=receiver_email,
-                topic=submission['title'],
-                author=submission['author'],
-                description=submission['excerpt'],
-                blog_id=blog_id,
-                year=datetime.now().year
-            )
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = f"New Blog Published: {submission['title']} - Taakra 2026"
-        msg["From"] = sender_email
-        msg["To"] = receiver_email
-        text = f"New blog published: {submission['title']}\nDescription: {submission['excerpt']}\nRead: https://fdc-pucit.vercel.app/blogs/{blog_id}"
-        part1 = MIMEText(text, "plain")
-        part2 = MIMEText(html_content, "html")
-        msg.attach(part1)
-        msg.attach(part2)
-        try:
-            with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-                server.login(sender_email, app_password)
-                server.sendmail(sender_email, receiver_email, msg.as_string())
-            print(f"Blog notification sent to {receiver_email}")
-        except Exception as e:
-            print(f"Error sending blog notification to {receiver_email}: {e}")
+    campaign_id = await create_campaign(
+        misc_db,
+        kind="blog_notification",
+        subject=f"New Blog Published: {submission['title']} - Taakra 2026",
+        template="blog_notification.html",
+        context={
+            "topic": submission['title'],
+            "author": submission['author'],
+            "description": submission['excerpt'],
+            "blog_id": blog_id,
+            "year": datetime.now().year,
+        },
+        text=f"New blog published: {submission['title']}\nDescription: {submission['excerpt']}\nRead: https://fdc-pucit.vercel.app/blogs/{blog_id}",
+        fallback_html=fallback_html,
+    )
     
     return {
         "id": str(new_post["_id"]),
         "title": new_post["title"],
         "status": "approved",
+        "campaign_id": campaign_id,
         "message": "Blog submission approved and published"
     }
 
@@ -794,6 +793,7 @@ async def delete_blog_submission(
 
 # Blog submission registration status endpoints
 @router.get("/submissions/status")
+@cached("settings", ttl=30)
 async def get_blog_submission_status(misc_db=Depends(get_misc_db)):
     """Get blog submission registration status (public endpoint)."""
     settings = await misc_db.settings.find_one({'_id': 'blog_submissions'})
@@ -10,6 +10,7 @@ import datetime
 from passlib.context import CryptContext
 from backend.config.limiter import _limiter as limiter
 from backend.config.database.init import get_misc_db
+from backend.utils.cache import invalidates
 from jose import jwt
 from backend.middleware.auth.otp import send_otp_email
 
@@ -99,6 +100,7 @@ async def get_blog_submission_status_admin(request: Request, db=Depends(get_misc
 
 
 @router.post("/blogadmin/submissions/status")
+@invalidates("settings")
 async def set_blog_submission_status_admin(
     payload: BlogSubmissionStatus = Body(...),
     request: Request = None,
@@ -231,6 +233,7 @@ async def get_blog_submission_status_admin(request: Request, db=Depends(get_misc
 
 
 @router.post("/blogadmin/submissions/status")
+@invalidates("settings")
 async def set_blog_submission_status_admin(
     payload: BlogSubmissionStatus = Body(...),
     request: Request = None,
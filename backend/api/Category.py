@@ -7,6 +7,7 @@ from typing import List, Optional
 
 from backend.config.database.init import get_event_db
 from backend.Schemas.Category import CategoryInDB
+from backend.utils.cache import cached, invalidates
 from backend.middleware.auth.token import verify_token
 
 router = APIRouter()
@@ -25,6 +26,7 @@ def category_helper(cat) -> dict:
 
 
 @router.get("/categories", response_model=List[CategoryInDB])
+@cached("categories", ttl=300)
 async def list_categories(db=Depends(get_event_db)):
     """List all categories, sorted by order."""
     categories = []
@@ -34,6 +36,7 @@ async def list_categories(db=Depends(get_event_db)):
 
 
 @router.post("/categories", response_model=CategoryInDB, status_code=status.HTTP_201_CREATED)
+@invalidates("categories")
 async def create_category(
     name: str = Form(...),
     slug: Optional[str] = Form(None),
@@ -59,6 +62,7 @@ async def create_category(
 
 
 @router.put("/categories/{category_id}", response_model=CategoryInDB)
+@invalidates("categories")
 async def update_category(
     category_id: str,
     name: str = Form(...),
@@ -91,6 +95,7 @@ async def update_category(
 
 
 @router.delete("/categories/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
+@invalidates("categories")
 async def delete_category(
     category_id: str,
     db=Depends(get_event_db),
@@ -1,13 +1,27 @@
-from fastapi import APIRouter, HTTPException, status, Query
+from fastapi import APIRouter, HTTPException, status, Query, Depends
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import asyncio
 import logging
-from backend.AI.chatbot import get_chatbot, RAGChatbot
+import os
+from backend.AI.chatbot import aget_chatbot, run_blocking, ChatTimeoutError
+from backend.AI.answer_cache import answer_cache
+from backend.middleware.auth.token import verify_token
+from backend.utils.cache import invalidate
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Per worker process:
+#   CHAT_MAX_CONCURRENT   chats running the pipeline at once (default 4)
+#   CHAT_MAX_PENDING      chats running or waiting before new ones get 429 (default 2x concurrent)
+CHAT_MAX_CONCURRENT = int(os.getenv("CHAT_MAX_CONCURRENT", "4"))
+CHAT_MAX_PENDING = int(os.getenv("CHAT_MAX_PENDING") or CHAT_MAX_CONCURRENT * 2)
+
+_chat_slots = asyncio.Semaphore(CHAT_MAX_CONCURRENT)
+_pending = 0
+
 
 class ChatRequest(BaseModel):
     query: str
@@ -20,6 +34,8 @@ class ChatResponse(BaseModel):
     chunks_used: int
     relevant_chunks: Optional[List[Dict[str, Any]]] = None
     error: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None  # per-stage latency: embed_ms, search_ms, generate_ms
+    cache_hit: Optional[str] = None  # "exact" or "semantic" when answered from the answer cache
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -33,18 +49,32 @@ async def chat(request: ChatRequest):
     Returns:
         ChatResponse with answer, sources, and metadata
     """
+    global _pending
+    if not request.query or not request.query.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Query cannot be empty"
+        )
+    if _pending >= CHAT_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="The chatbot is busy, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+    
+    _pending += 1
     try:
-        if not request.query or not request.query.strip():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Query cannot be empty"
-            )
-        
-        chatbot = get_chatbot()
-        result = chatbot.chat(request.query.strip(), top_k=request.top_k or 5)
+        async with _chat_slots:
+            chatbot = await aget_chatbot()
+            result = await chatbot.achat(request.query.strip(), top_k=request.top_k or 5)
         
         return ChatResponse(**result)
     
+    except ChatTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"The chatbot took too long to answer ({e}). Please try again."
+        )
     except ValueError as e:
         logger.error(f"Configuration error: {e}")
         raise HTTPException(
@@ -63,6 +93,8 @@ async def chat(request: ChatRequest):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error processing chat request: {str(e)}"
         )
+    finally:
+        _pending -= 1
 
 
 @router.post("/process-pdfs")
@@ -77,8 +109,11 @@ async def process_pdfs(force_reload: bool = Query(False, description="If True, r
         Dictionary with processing results
     """
     try:
-        chatbot = get_chatbot()
-        result = chatbot.process_pdfs(force_reload=force_reload)
+        chatbot = await aget_chatbot()
+        result = await run_blocking(chatbot.process_pdfs, force_reload)
+        if result.get("total_chunks") and not result.get("already_indexed"):
+            # The index changed: other workers drop their cached answers too
+            await invalidate("chatbot")
         
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -108,8 +143,8 @@ async def get_collection_info():
         Dictionary with collection statistics
     """
     try:
-        chatbot = get_chatbot()
-        info = chatbot.get_collection_info()
+        chatbot = await aget_chatbot()
+        info = await run_blocking(chatbot.get_collection_info)
         
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -124,6 +159,12 @@ async def get_collection_info():
         )
 
 
+@router.get("/cache-stats")
+async def get_cache_stats(auth=Depends(verify_token)):
+    # Answer cache hit/miss counters for this worker process
+    return answer_cache.stats()
+
+
 @router.get("/health")
 async def health_check():
     """
@@ -133,8 +174,8 @@ async def health_check():
         Dictionary with service status
     """
     try:
-        chatbot = get_chatbot()
-        collection_info = chatbot.get_collection_info()
+        chatbot = await aget_chatbot()
+        collection_info = await run_blocking(chatbot.get_collection_info)
         
         return JSONResponse(
             status_code=status.HTTP_200_OK,
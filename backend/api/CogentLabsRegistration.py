@@ -4,6 +4,7 @@ from typing import Optional
 from datetime import datetime
 import re
 from backend.config.database.init import get_misc_db
+from backend.utils.cache import cached
 from backend.utils.CloudinaryFileUploader import save_uploaded_file
 import httpx
 
@@ -94,6 +95,7 @@ async def submit_registration(
 
 
 @router.get('/register/status')
+@cached("settings", ttl=30)
 async def get_registration_status(db=Depends(get_misc_db)):
     s = await db.settings.find_one({'_id': 'cogent_labs_registrations'})
     if not s:
@@ -6,6 +6,7 @@ from typing import List, Optional
 from datetime import datetime
 
 from backend.config.database.init import get_event_db
+from backend.utils.registration_stats import get_registration_totals, get_event_stats
 
 router = APIRouter()
 
@@ -19,6 +20,7 @@ def competition_helper(event, registration_count: int = 0) -> dict:
         "location": event.get("location", ""),
         "description": event.get("description", ""),
         "image_url": event.get("image_url"),
+        "image_variants": event.get("image_variants"),
         "registration_open": event.get("registration_open", True),
         "category_id": event.get("category_id"),
         "category_name": event.get("category_name"),
@@ -35,6 +37,50 @@ def competition_helper(event, registration_count: int = 0) -> dict:
     }
 
 
+async def registration_counts(db, event_ids: List[str]) -> dict:
+    """Registration count per event id.
+
+    Read from the maintained registration_stats counters; events without counters
+    yet fall back to a single $group over event_registrations.
+    """
+    if not event_ids:
+        return {}
+    counts = await get_registration_totals(db, event_ids)
+    missing = [eid for eid in event_ids if eid not in counts]
+    if not missing:
+        return counts
+    pipeline = [
+        {"$match": {"event_id": {"$in": missing}}},
+        {"$group": {"_id": "$event_id", "count": {"$sum": 1}}},
+    ]
+    async for row in db.event_registrations.aggregate(pipeline):
+        counts[row["_id"]] = row["count"]
+    return counts
+
+
+async def fill_category_names(db, events: list) -> None:
+    """Set category_name on events missing it, resolving all categories with one $in lookup."""
+    missing = {
+        e["category_id"] for e in events
+        if e.get("category_id") and not e.get("category_name") and ObjectId.is_valid(e["category_id"])
+    }
+    if not missing:
+        return
+    names = {}
+    async for cat in db.categories.find({"_id": {"$in": [ObjectId(cid) for cid in missing]}}, {"name": 1}):
+        names[str(cat["_id"])] = cat.get("name", "")
+    for e in events:
+        if e.get("category_id") in names and not e.get("category_name"):
+            e["category_name"] = names[e["category_id"]]
+
+
+async def events_with_registration_counts(db, events: list) -> list:
+    """Pair each event with its registration count and enrich category names (batched)."""
+    counts = await registration_counts(db, [str(e["_id"]) for e in events])
+    await fill_category_names(db, events)
+    return [(e, counts.get(str(e["_id"]), 0)) for e in events]
+
+
 @router.get("/competitions")
 async def list_competitions(
     sort: str = Query("new", description="new | most_registrations | trending"),
@@ -84,12 +130,8 @@ async def list_competitions(
     async for event in db.events.find(query):
         events_raw.append(event)
 
-    # Get registration count per event (event_id stored as string)
-    events_with_count = []
-    for event in events_raw:
-        eid = str(event["_id"])
-        reg_count = await db.event_registrations.count_documents({"event_id": eid})
-        events_with_count.append((event, reg_count))
+    # Registration counts and category names in two batched queries (event_id stored as string)
+    events_with_count = await events_with_registration_counts(db, events_raw)
 
     # Sort
     if sort == "most_registrations":
@@ -99,13 +141,6 @@ async def list_competitions(
     else:  # new
         events_with_count.sort(key=lambda x: str(x[0].get("created_at", "")), reverse=True)
 
-    # Enrich category_name from categories collection when missing
-    for e, _ in events_with_count:
-        if e.get("category_id") and not e.get("category_name") and ObjectId.is_valid(e["category_id"]):
-            cat = await db.categories.find_one({"_id": ObjectId(e["category_id"])})
-            if cat:
-                e["category_name"] = cat.get("name", "")
-
     events = [competition_helper(e, c) for e, c in events_with_count]
     return {"competitions": events, "total": len(events)}
 
@@ -124,10 +159,11 @@ async def competitions_calendar(
     elif year:
         query["date"] = {"$regex": f"^{year}-"}
 
-    events = []
+    events_raw = []
     async for event in db.events.find(query).sort("date", 1).sort("time", 1):
-        reg_count = await db.event_registrations.count_documents({"event_id": str(event["_id"])})
-        events.append(competition_helper(event, reg_count))
+        events_raw.append(event)
+
+    events = [competition_helper(e, c) for e, c in await events_with_registration_counts(db, events_raw)]
 
     return {"competitions": events, "total": len(events)}
 
@@ -144,7 +180,11 @@ async def get_competition_detail(competition_id: str, db=Depends(get_event_db)):
         cat = await db.categories.find_one({"_id": ObjectId(event["category_id"])})
         if cat:
             event["category_name"] = cat.get("name", "")
-    reg_count = await db.event_registrations.count_documents({"event_id": competition_id})
+    stats = await get_event_stats(db, competition_id)
+    if stats is not None:
+        reg_count = stats["total"]
+    else:
+        reg_count = await db.event_registrations.count_documents({"event_id": competition_id})
     return competition_helper(event, reg_count)
 
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter,status, Depends, Request
+from fastapi import APIRouter,status, Depends, Request, Response
 from datetime import datetime
 import logging
 from bson import ObjectId
@@ -6,11 +6,13 @@ from backend.Schemas.Contact import ContactInfo, ContactMessage, ContactReply
 from email.mime.text import MIMEText
 from fastapi import HTTPException
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Template
-import smtplib
+from backend.utils.email_templates import has_template, render_email
+from backend.utils.mailer import enqueue_email
 from pathlib import Path
 import os
 from backend.config.database.init import get_misc_db
+from backend.utils.pagination import PageParams, paginate
+from backend.utils.cache import cached, invalidates
 import os
 import asyncio
 from dotenv import load_dotenv
@@ -37,10 +39,12 @@ async def get_contact_info(db=Depends(get_misc_db)):
 
 # Contact endpoints
 @router.get("/contact", response_model=ContactInfo)
-async def get_contact_information(contact_info=Depends(get_contact_info)):
-    return contact_info
+@cached("contact", ttl=300)
+async def get_contact_information(db=Depends(get_misc_db)):
+    return await get_contact_info(db)
 
 @router.put("/contact", response_model=ContactInfo)
+@invalidates("contact")
 async def update_contact_information(info: ContactInfo, db=Depends(get_misc_db)):
     updated_info = await db.contact_info.find_one_and_update(
         {"_id": "contact_info"},
@@ -62,11 +66,8 @@ async def submit_contact_message( request: Request,message: ContactMessage, db=D
     return {"message": "Contact form submitted successfully"}
 
 @router.get("/contact/messages", response_model=list[ContactMessage])
-async def get_contact_messages(db=Depends(get_misc_db)):
-    messages = []
-    async for message in db.contact_messages.find().sort("created_at", -1):
-        messages.append(message)
-    return messages
+async def get_contact_messages(response: Response, page: PageParams = Depends(), db=Depends(get_misc_db)):
+    return await paginate(db.contact_messages, {}, page, response)
 
 
 
@@ -75,14 +76,11 @@ async def get_contact_messages(db=Depends(get_misc_db)):
 async def send_contact_reply(contact: ContactReply):
     print("Email sending")
     sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
     receiver_email = contact.email
     query=contact.query
 
     # Load and customize the HTML template
-    template_path = Path(__file__).parent.parent / "templates" / "contact_reply.html"
-    
-    if not template_path.exists():
+    if not has_template("contact_reply.html"):
         # Fallback to a simple template if file not found
         html_content = f"""
         <html>
@@ -96,14 +94,9 @@ async def send_contact_reply(contact: ContactReply):
         </html>
         """
     else:
-        with open(template_path, 'r') as file:
-            template_content = file.read()
-        
-        # Create Jinja2 template
-        template = Template(template_content)
-        
-        # Render template with variables
-        html_content = template.render(
+        # Render the cached template with variables
+        html_content = render_email(
+            "contact_reply.html",
             email=contact.email,
             query=contact.query,
             message=contact.message,
@@ -133,15 +126,7 @@ async def send_contact_reply(contact: ContactReply):
     msg.attach(part1)
     msg.attach(part2)
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, app_password)
-            server.sendmail(sender_email, receiver_email, msg.as_string())
-        print("Email sent successfully!")
-        return True
-    except Exception as e:
-        print("Error sending email:", e)
-        return False
+    return enqueue_email(msg)
 
 @router.post('/contact/reply')
 async def reply_to_contact_message(reply: ContactReply):
@@ -176,12 +161,10 @@ def get_template_path(filename):
 def send_email_notification(contact: ContactMessage):
     print("Email sending")
     sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
     receiver_email = sender_email  # Or a team email inbox
 
     # Load and customize the HTML template
-    template_path = Path(__file__).parent.parent / "templates" / "contact_notification.html"
-    if not template_path.exists():
+    if not has_template("contact_notification.html"):
         html_content = f"""
         <html>
         <body>
@@ -195,10 +178,8 @@ def send_email_notification(contact: ContactMessage):
         </html>
         """
     else:
-        with open(template_path, 'r') as file:
-            template_content = file.read()
-        template = Template(template_content)
-        html_content = template.render(
+        html_content = render_email(
+            "contact_notification.html",
             name=getattr(contact, 'name', ''),
             email=contact.email,
             subject=getattr(contact, 'subject', ''),
@@ -226,14 +207,6 @@ def send_email_notification(contact: ContactMessage):
     msg.attach(part1)
     msg.attach(part2)
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, app_password)
-            server.sendmail(sender_email, receiver_email, msg.as_string())
-        print("Contact notification email sent successfully!")
-        return True
-    except Exception as e:
-        print("Error sending contact notification email:", e)
-        return False
+    return enqueue_email(msg)
 
     # Load and customize the HTML template
\ No newline at end of file
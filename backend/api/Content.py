@@ -1,4 +1,4 @@
-from fastapi import HTTPException, Form, File, UploadFile, status, APIRouter, Depends
+from fastapi import HTTPException, Form, File, UploadFile, status, APIRouter, Depends, Response
 from fastapi.responses import JSONResponse
 import uuid
 from datetime import datetime
@@ -14,6 +14,8 @@ import logging
 from bson import ObjectId
 from backend.utils.CloudinaryImageUploader import save_uploaded_image
 from backend.config.database.init import get_misc_db
+from backend.utils.pagination import PageParams, paginate
+from backend.utils.cache import cached, invalidates
 
 
 router = APIRouter()
@@ -25,6 +27,7 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/content", response_model=dict)
+@invalidates("content")
 async def add_content(
     type: str = Form(...),
     title: str = Form(...),
@@ -88,21 +91,25 @@ async def add_content(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/content", response_model=List[ContentItem])
-async def get_content(db=Depends(get_misc_db)):
+@cached("content", ttl=300)
+async def get_content(response: Response, page: PageParams = Depends(), db=Depends(get_misc_db)):
     try:
-        # Fetch all content from MongoDB, sorted by creation date (newest first)
+        # Fetch content from MongoDB, sorted by creation date (newest first)
         content_items = []
-        async for item in db.content.find().sort("created_at", -1):
+        for item in await paginate(db.content, {}, page, response):
             # Convert ObjectId to string for JSON serialization
             item["_id"] = str(item["_id"])
             content_items.append(item)
         
         return content_items
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching content: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/content/{content_id}", response_model=ContentItem)
+@cached("content", ttl=300)
 async def get_content_by_id(content_id: str, db=Depends(get_misc_db)):
     try:
         # Find content by ID in MongoDB
@@ -122,6 +129,7 @@ async def get_content_by_id(content_id: str, db=Depends(get_misc_db)):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.put("/content/{content_id}", response_model=dict)
+@invalidates("content")
 async def update_content(
     content_id: str,
     type: Optional[str] = Form(None),
@@ -189,6 +197,7 @@ async def update_content(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.delete("/content/{content_id}")
+@invalidates("content")
 async def delete_content(content_id: str, db=Depends(get_misc_db)):
     try:
         # Delete from MongoDB
@@ -1,20 +1,32 @@
 
 # --- All imports at the top ---
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader
+from backend.utils.email_templates import render_email
 import os
 import logging
 from pymongo import ReturnDocument
 import json
-from fastapi import HTTPException, APIRouter, status,Query, Form, Depends,  UploadFile, File, BackgroundTasks,Request
+from fastapi import HTTPException, APIRouter, status,Query, Form, Depends,  UploadFile, File, BackgroundTasks,Request, Response
 from bson import ObjectId
 from datetime import datetime
 from typing import List
 from backend.Schemas.Event import  EventInDB, EventRegistration, PaymentResponse
 from backend.config.database.init import get_event_db
-from backend.utils.CloudinaryImageUploader import save_uploaded_image
+from backend.utils.CloudinaryImageUploader import save_uploaded_image, save_uploaded_image_with_variants
+from backend.utils.mailer import enqueue_email
+from backend.utils.exports import ExportParams, export_response
+from backend.utils.export_schemas import EXPORT_SCHEMAS
+from backend.utils.pagination import PageParams, paginate
+from backend.utils.cache import cached, invalidates
+from backend.utils.responses import model_fields, trusted_response
+from backend.middleware.auth.token import verify_token
+from backend.utils.registration_stats import (
+    SELF_COUNTED,
+    record_registration,
+    update_payment_status,
+    drop_event_stats,
+)
 router = APIRouter()
 from bson import ObjectId
 from backend.config.limiter import _limiter as limiter
@@ -37,10 +49,8 @@ logger = logging.getLogger(__name__)
 
 # --- Email sender implementation ---
 def send_email_notification(email_data):
-    smtp_server = os.getenv("SMTP_SERVER")  # Change to your SMTP server
-    smtp_port = os.getenv("SMTP_PORT") 
-    smtp_user = os.getenv("ADMIN_EMAIL")  # Change to your email
-    smtp_password = os.getenv("ADMIN_EMAIL_PASSWORD")  # Use app password or env var
+    """Queue an HTML email; delivery happens in the background mail workers."""
+    smtp_user = os.getenv("ADMIN_EMAIL")
 
     msg = MIMEMultipart()
     msg["From"] = smtp_user
@@ -48,22 +58,15 @@ def send_email_notification(email_data):
     msg["Subject"] = email_data["subject"]
     msg.attach(MIMEText(email_data["html"], "html"))
 
-    try:
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            server.login(smtp_user, smtp_password)
-            server.sendmail(smtp_user, email_data["to"], msg.as_string())
-    except Exception as e:
-        print(f"Failed to send email to {email_data['to']}: {e}")
+    if not enqueue_email(msg):
+        print(f"Failed to queue email to {email_data['to']}")
 
 
 
 def send_team_email(template_name, subject, registration, event_name=None):
-    template_dir = os.path.join(os.path.dirname(__file__), '../templates')
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template(template_name)
     year = datetime.utcnow().year
-    email_body = template.render(
+    email_body = render_email(
+        template_name,
         event_name=event_name,
         team_name=registration["team_name"],
         members=registration["members"],
@@ -110,7 +113,7 @@ async def approve_registration(event_id: str, team_name: str, db=Depends(get_eve
     registration = await db.event_registrations.find_one({"event_id": event_id, "team_name": team_name})
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
-    await db.event_registrations.update_one({"_id": registration["_id"]}, {"$set": {"payment_status": "approved"}})
+    await update_payment_status(db, event_id, registration["_id"], "approved")
     # Get event name
     event = await db.events.find_one({"_id": ObjectId(event_id)})
     event_name = event["title"] if event else ""
@@ -132,7 +135,7 @@ async def reject_registration(event_id: str, team_name: str, db=Depends(get_even
     registration = await db.event_registrations.find_one({"event_id": event_id, "team_name": team_name})
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
-    await db.event_registrations.update_one({"_id": registration["_id"]}, {"$set": {"payment_status": "rejected"}})
+    await update_payment_status(db, event_id, registration["_id"], "rejected")
     # Optionally send rejection email here
     return {"message": "Registration rejected."}
 def event_helper(event) -> dict:
@@ -144,6 +147,7 @@ def event_helper(event) -> dict:
         "location": event["location"],
         "description": event["description"],
         "image_url": event.get("image_url"),
+        "image_variants": event.get("image_variants"),
         "registration_open": event.get("registration_open", True),
         "modules": event.get("modules", []),
         "module_amounts": event.get("module_amounts", {}),
@@ -160,14 +164,17 @@ def event_helper(event) -> dict:
 
 
 @router.get("/events", response_model=List[EventInDB])
+@trusted_response
+@cached("events", ttl=60)
 async def get_events(db=Depends(get_event_db)):
     events = []
     async for event in db.events.find().sort("created_at", -1):
-        events.append(event_helper(event))
+        events.append(model_fields(EventInDB, event_helper(event)))
     return events
 
 
 @router.post("/events", response_model=EventInDB, status_code=status.HTTP_201_CREATED)
+@invalidates("events")
 async def create_event(
     title: str = Form(...),
     date: str = Form(...),
@@ -188,9 +195,9 @@ async def create_event(
     db=Depends(get_event_db)
 ):
     now = datetime.utcnow()
-    image_url = None
+    image_url, image_variants = None, None
     if image:
-        image_url = await save_uploaded_image(image, "events","EVENTS")
+        image_url, image_variants = await save_uploaded_image_with_variants(image, "events","EVENTS")
     # Parse modules
     modules_list = [m.strip() for m in modules.split(",") if m.strip()] if modules else []
     # Parse module_amounts
@@ -218,6 +225,7 @@ async def create_event(
         "description": description,
         "registration_open": registration_open,
         "image_url": image_url,
+        "image_variants": image_variants,
         "modules": modules_list,
         "module_amounts": module_amounts_dict,
         "discount_codes": discount_codes_list,
@@ -234,6 +242,7 @@ async def create_event(
     return event_helper(created_event)
 
 @router.put("/events/{event_id}", response_model=EventInDB)
+@invalidates("events")
 async def update_event(
     event_id: str,
     title: str = Form(...),
@@ -303,7 +312,7 @@ async def update_event(
     }
     # Handle image upload
     if image:
-        update_data["image_url"] = await save_uploaded_image(image, "events","EVENTS")
+        update_data["image_url"], update_data["image_variants"] = await save_uploaded_image_with_variants(image, "events","EVENTS")
     else:
         # If no image provided, keep existing image_url
         existing_event = await db.events.find_one({"_id": ObjectId(event_id)})
@@ -363,12 +372,14 @@ async def check_team_name_available(
 
 
 @router.delete("/events/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
+@invalidates("events")
 async def delete_event(event_id: str, db=Depends(get_event_db)):
     if not ObjectId.is_valid(event_id):
         raise HTTPException(status_code=400, detail="Invalid event ID")
     
     # Delete associated registrations first
     await db.event_registrations.delete_many({"event_id": event_id})
+    await drop_event_stats(db, event_id)
     
     delete_result = await db.events.delete_one({"_id": ObjectId(event_id)})
     
@@ -399,6 +410,7 @@ async def register_for_event(event_id: str, registration: EventRegistration, db=
     registration_data["modules"] = modules
     registration_data["event_id"] = event_id
     registration_data["created_at"] = datetime.utcnow()
+    registration_data[SELF_COUNTED] = True
     existing_registration = await db.event_registrations.find_one({
         "event_id": event_id,
         "team_name": registration.team_name
@@ -410,19 +422,16 @@ async def register_for_event(event_id: str, registration: EventRegistration, db=
         )
     await db.event_registrations.insert_one(registration_data)
 
-    # Get module registration counts
-    module_counts = {}
-    for module in modules:
-        module_counts[module] = await db.event_registrations.count_documents({"event_id": event_id, "modules": module})
+    # Module registration counts come from the maintained counters
+    stats = await record_registration(db, event_id, modules, registration_data.get("payment_status"))
+    module_counts = {module: stats["modules"].get(module, 0) for module in modules}
 
     # Pending registration email is sent after step 3 (payment submission), not here.
 
     # Send admin notification email
-    template_dir = os.path.join(os.path.dirname(__file__), '../templates')
-    env = Environment(loader=FileSystemLoader(template_dir))
     year = datetime.utcnow().year
-    admin_template = env.get_template('new_registration_admin_notification.html')
-    admin_body = admin_template.render(
+    admin_body = render_email(
+        'new_registration_admin_notification.html',
         event_name=event.get("title", ""),
         team_name=registration.team_name,
         registration_time=registration_data["created_at"].strftime('%Y-%m-%d %H:%M:%S'),
@@ -439,13 +448,25 @@ async def register_for_event(event_id: str, registration: EventRegistration, db=
 
     return {"message": "Registration successful, pending approval."}
 
+@router.get("/events/{event_id}/registrations/export")
+async def export_event_registrations(event_id: str, params: ExportParams = Depends(), db=Depends(get_event_db), auth=Depends(verify_token)):
+    """Download an event's registrations (format=csv|ndjson|xlsx|parquet|arrow, fields, from, to)."""
+    if not ObjectId.is_valid(event_id):
+        raise HTTPException(status_code=400, detail="Invalid event ID")
+    return export_response(
+        EXPORT_SCHEMAS["event_registrations"], db, params,
+        filters={"event_id": event_id}, filename=f"event_{event_id}_registrations",
+    )
+
 @router.get("/events/{event_id}/registrations", response_model=List[EventRegistration])
-async def get_event_registrations(event_id: str, db=Depends(get_event_db)):
+async def get_event_registrations(event_id: str, response: Response, page: PageParams = Depends(), db=Depends(get_event_db)):
     if not ObjectId.is_valid(event_id):
         raise HTTPException(status_code=400, detail="Invalid event ID")
     
     registrations = []
-    async for reg in db.event_registrations.find({"event_id": event_id}).sort("created_at", -1):
+    projection = {"team_name": 1, "members": 1, "modules": 1, "payment_status": 1, "transaction_id": 1,
+                  "payment_receipt_url": 1, "discount_codes_used": 1, "created_at": 1}
+    for reg in await paginate(db.event_registrations, {"event_id": event_id}, page, response, projection):
         # Ensure all relevant fields are present for admin view
         registration = {
             "team_name": reg.get("team_name", ""),
@@ -547,24 +568,18 @@ async def submit_payment_receipt(
         update_data = {
             "payment_receipt_url": receipt_url,
             "transaction_id": final_transaction_id,
-            "payment_status": "submitted",
             "payment_submitted_at": datetime.utcnow(),
             "competition": competition,
             "discount_codes_used": discount_codes_used
         }
         
-        await db.event_registrations.update_one(
-            {"_id": registration["_id"]},
-            {"$set": update_data}
-        )
+        await update_payment_status(db, event_id, registration["_id"], "submitted", update_data)
         
         # Send pending registration email after step 3 (payment submission)
-        template_dir = os.path.join(os.path.dirname(__file__), '../templates')
-        env = Environment(loader=FileSystemLoader(template_dir))
-        template = env.get_template('pending_registration.html')
         year = datetime.utcnow().year
         updated_reg = await db.event_registrations.find_one({"_id": registration["_id"]})
-        email_body = template.render(
+        email_body = render_email(
+            'pending_registration.html',
             event_name=event.get("title", ""),
             team_name=updated_reg.get("team_name", ""),
             members=updated_reg.get("members", []),
@@ -6,6 +6,7 @@ import logging
 from typing import Optional, List
 from backend.Schemas.FAQ import FAQItem
 from backend.config.database.init import get_misc_db
+from backend.utils.cache import cached, invalidates
 
 
 router = APIRouter()
@@ -13,6 +14,7 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/faq", response_model=dict)
+@invalidates("faq")
 async def create_faq(
     question: str = Form(...),
     answer: str = Form(...),
@@ -60,6 +62,7 @@ async def create_faq(
 
 
 @router.get("/faq", response_model=List[FAQItem])
+@cached("faq", ttl=300)
 async def get_active_faqs(db=Depends(get_misc_db)):
     """Get all active FAQs, sorted by order"""
     try:
@@ -98,6 +101,7 @@ async def get_all_faqs(db=Depends(get_misc_db)):
 
 
 @router.put("/faq/{faq_id}", response_model=dict)
+@invalidates("faq")
 async def update_faq(
     faq_id: str,
     question: Optional[str] = Form(None),
@@ -166,6 +170,7 @@ async def update_faq(
 
 
 @router.delete("/faq/{faq_id}")
+@invalidates("faq")
 async def delete_faq(faq_id: str, db=Depends(get_misc_db)):
     try:
         # Delete from MongoDB
@@ -6,13 +6,15 @@ from datetime import datetime
 from bson import ObjectId
 from fastapi import UploadFile, File, Form
 import logging
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Response
 from pydantic import BaseModel, Field
 from pymongo import ReturnDocument
 from enum import Enum
 from backend.Schemas.Achievement import Achievement, AchievementCreate
-from backend.utils.CloudinaryImageUploader import save_uploaded_image
+from backend.utils.CloudinaryImageUploader import save_uploaded_image_with_variants
 from backend.config.database.init import get_misc_db
+from backend.utils.pagination import PageParams, paginate
+from backend.utils.cache import cached, invalidates
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
@@ -44,11 +46,13 @@ def achievement_helper(achievement) -> dict:
         "description": achievement["description"],
         "icon": achievement["icon"],
         "image_url": achievement.get("image_url"),
+        "image_variants": achievement.get("image_variants"),
         "created_at": achievement["created_at"],
         "updated_at": achievement["updated_at"],
     }
 
 @router.get("/achievements/{achievement_id}", response_model=Achievement)
+@cached("achievements", ttl=300)
 async def get_achievement_detail(achievement_id: str, db=Depends(get_misc_db)):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
@@ -67,11 +71,14 @@ async def get_achievement_detail(achievement_id: str, db=Depends(get_misc_db)):
         achievement_dict["image_url"] = None
     return Achievement(**achievement_dict)
 @router.get("/achievements", response_model=List[Achievement])
-async def get_achievements(db=Depends(get_misc_db)):
+@cached("achievements", ttl=300)
+async def get_achievements(response: Response, page: PageParams = Depends(), db=Depends(get_misc_db)):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
     achievements = []
-    async for achievement in db.achievements.find().sort("created_at", -1):
+    # The description filter is also in the query so pages come back full
+    query = {"description": {"$regex": r"^[\s\S]{10,}"}}
+    for achievement in await paginate(db.achievements, query, page, response):
         # Only include achievements with valid description
         desc = achievement.get("description", "")
         if desc and isinstance(desc, str) and len(desc) >= 10:
@@ -81,6 +88,7 @@ async def get_achievements(db=Depends(get_misc_db)):
 
 
 @router.post("/achievements", response_model=Achievement, status_code=status.HTTP_201_CREATED)
+@invalidates("achievements")
 async def create_achievement(
     year: str = Form(...),
     month: str = Form(""),
@@ -103,13 +111,15 @@ async def create_achievement(
     }
     image_url = None
     if image:
-        image_url = await save_uploaded_image(image, "achievements", "MISC")
+        image_url, image_variants = await save_uploaded_image_with_variants(image, "achievements", "MISC")
         achievement_data["image_url"] = image_url
+        achievement_data["image_variants"] = image_variants
     new_achievement = await db.achievements.insert_one(achievement_data)
     created_achievement = await db.achievements.find_one({"_id": new_achievement.inserted_id})
     return achievement_helper(created_achievement)
 
 @router.put("/achievements/{achievement_id}", response_model=Achievement)
+@invalidates("achievements")
 async def update_achievement(
     achievement_id: str,
     year: str = Form(...),
@@ -133,7 +143,7 @@ async def update_achievement(
         "updated_at": datetime.utcnow(),
     }
     if image and image.filename:
-        achievement_data["image_url"] = await save_uploaded_image(image, "achievements", "ACHIEVEMENTS")
+        achievement_data["image_url"], achievement_data["image_variants"] = await save_uploaded_image_with_variants(image, "achievements", "ACHIEVEMENTS")
     updated_achievement = await db.achievements.find_one_and_update(
         {"_id": ObjectId(achievement_id)},
         {"$set": achievement_data},
@@ -144,6 +154,7 @@ async def update_achievement(
     return achievement_helper(updated_achievement)
 
 @router.delete("/achievements/{achievement_id}", status_code=status.HTTP_204_NO_CONTENT)
+@invalidates("achievements")
 async def delete_achievement(achievement_id: str, db=Depends(get_misc_db)):
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
@@ -1,4 +1,4 @@
-from fastapi import HTTPException, Form, status, APIRouter, Depends
+from fastapi import HTTPException, Form, status, APIRouter, Depends, Response
 from fastapi.responses import JSONResponse
 import uuid
 from datetime import datetime
@@ -6,6 +6,7 @@ import logging
 from typing import Optional, List
 from backend.Schemas.Job import JobItem
 from backend.config.database.init import get_misc_db
+from backend.utils.pagination import PageParams, paginate
 
 
 router = APIRouter()
@@ -78,8 +79,10 @@ async def create_job(
 
 @router.get("/job", response_model=List[JobItem])
 async def get_active_jobs(
+    response: Response,
     type: Optional[str] = None,
     location: Optional[str] = None,
+    page: PageParams = Depends(),
     db=Depends(get_misc_db)
 ):
     """Get all active jobs, optionally filtered by type and location"""
@@ -92,7 +95,7 @@ async def get_active_jobs(
             query["location"] = {"$regex": location, "$options": "i"}
         
         jobs = []
-        async for job in db.jobs.find(query).sort("created_at", -1):
+        for job in await paginate(db.jobs, query, page, response):
             job["_id"] = str(job["_id"])
             if isinstance(job.get("created_at"), datetime):
                 job["created_at"] = job["created_at"].isoformat()
@@ -101,17 +104,19 @@ async def get_active_jobs(
             jobs.append(job)
         
         return jobs
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching jobs: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
 @router.get("/job/all", response_model=List[JobItem])
-async def get_all_jobs(db=Depends(get_misc_db)):
+async def get_all_jobs(response: Response, page: PageParams = Depends(), db=Depends(get_misc_db)):
     """Get all jobs (for admin panel)"""
     try:
         jobs = []
-        async for job in db.jobs.find().sort("created_at", -1):
+        for job in await paginate(db.jobs, {}, page, response):
             job["_id"] = str(job["_id"])
             if isinstance(job.get("created_at"), datetime):
                 job["created_at"] = job["created_at"].isoformat()
@@ -120,6 +125,8 @@ async def get_all_jobs(db=Depends(get_misc_db)):
             jobs.append(job)
         
         return jobs
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching all jobs: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -23,6 +23,9 @@ from dotenv import load_dotenv
 
 from backend.config.database.init import get_misc_db
 from backend.config.limiter import _limiter as limiter
+from backend.utils.mailer import enqueue_email
+from backend.utils.email_templates import has_template, render_email
+from backend.utils.cache import invalidate
 from backend.Schemas.Team import (
     MemberLoginRequest,
     MemberOTPVerifyRequest,
@@ -47,24 +50,14 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 async def send_member_otp_email(otp: str, recipient_email: str, member_name: str, ip_address: str, device_info: str):
     """Send OTP email to member for portal login"""
-    import smtplib
     from email.mime.multipart import MIMEMultipart
     from email.mime.text import MIMEText
-    from jinja2 import Template
-    from pathlib import Path
 
     sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
-
-    # Load template
-    base_path = Path(__file__).parent.parent
-    template_path = base_path / "templates" / "member_portal_otp.html"
 
-    if template_path.exists():
-        with open(template_path, 'r') as file:
-            template_content = file.read()
-        template = Template(template_content)
-        html_content = template.render(
+    if has_template("member_portal_otp.html"):
+        html_content = render_email(
+            "member_portal_otp.html",
             otp=otp,
             member_name=member_name,
             timestamp=datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
@@ -133,41 +126,26 @@ async def send_member_otp_email(otp: str, recipient_email: str, member_name: str
     msg.attach(MIMEText(text, "plain"))
     msg.attach(MIMEText(html_content, "html"))
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, app_password)
-            server.sendmail(sender_email, recipient_email, msg.as_string())
-        print(f"Member OTP Email sent successfully to {recipient_email}")
-        return True
-    except Exception as e:
-        print(f"Error sending member OTP email: {e}")
+    if not enqueue_email(msg):
+        print(f"Error queueing member OTP email to {recipient_email}")
         return False
+    return True
 
 
 async def send_password_reset_email(reset_token: str, recipient_email: str, member_name: str):
     """Send password reset link to member"""
-    import smtplib
     from email.mime.multipart import MIMEMultipart
     from email.mime.text import MIMEText
-    from jinja2 import Template
-    from pathlib import Path
 
     sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
     
     # Frontend URL for password reset
     frontend_url = os.getenv("FRONTEND_URL", "https://fdc-pucit.org")
     reset_link = f"{frontend_url}/member/reset-password?token={reset_token}"
 
-    # Load template
-    base_path = Path(__file__).parent.parent
-    template_path = base_path / "templates" / "member_password_reset.html"
-
-    if template_path.exists():
-        with open(template_path, 'r') as file:
-            template_content = file.read()
-        template = Template(template_content)
-        html_content = template.render(
+    if has_template("member_password_reset.html"):
+        html_content = render_email(
+            "member_password_reset.html",
             member_name=member_name,
             reset_link=reset_link,
             year=datetime.utcnow().year
@@ -228,15 +206,10 @@ async def send_password_reset_email(reset_token: str, recipient_email: str, memb
     msg.attach(MIMEText(text, "plain"))
     msg.attach(MIMEText(html_content, "html"))
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, app_password)
-            server.sendmail(sender_email, recipient_email, msg.as_string())
-        print(f"Password reset email sent successfully to {recipient_email}")
-        return True
-    except Exception as e:
-        print(f"Error sending password reset email: {e}")
+    if not enqueue_email(msg):
+        print(f"Error queueing password reset email to {recipient_email}")
         return False
+    return True
 
 
 def create_member_token(member_id: str, email: str) -> str:
@@ -365,6 +338,7 @@ async def member_verify_otp(request: Request, data: MemberOTPVerifyRequest, db=D
         {"_id": member["_id"]},
         {"$set": {"has_portal_access": True, "updated_at": datetime.utcnow()}}
     )
+    await invalidate("members")
     
     # Create token
     token = create_member_token(str(member["_id"]), data.email.lower())
@@ -598,6 +572,7 @@ async def update_member_profile(request: Request, db=Depends(get_misc_db)):
         {"_id": member["_id"]},
         {"$set": update_data}
     )
+    await invalidate("members")
     
     # Return updated profile
     updated_member = await db.members.find_one({"_id": member["_id"]})
@@ -630,7 +605,7 @@ async def update_member_profile_image(request: Request, db=Depends(get_misc_db))
     Update member's profile image.
     """
     from fastapi import UploadFile, File
-    from backend.utils.CloudinaryImageUploader import save_uploaded_image
+    from backend.utils.CloudinaryImageUploader import save_uploaded_image_with_variants
     
     member = await get_current_member(request, db)
     
@@ -643,42 +618,35 @@ async def update_member_profile_image(request: Request, db=Depends(get_misc_db))
     
     # Upload image
     try:
-        image_url = await save_uploaded_image(image, "team")
+        image_url, image_variants = await save_uploaded_image_with_variants(image, "team")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Image upload failed: {str(e)}")
     
     # Update member
     await db.members.update_one(
         {"_id": member["_id"]},
-        {"$set": {"image_url": image_url, "updated_at": datetime.utcnow()}}
+        {"$set": {"image_url": image_url, "image_variants": image_variants, "updated_at": datetime.utcnow()}}
     )
+    await invalidate("members")
     
-    return {"message": "Profile image updated successfully", "image_url": image_url}
+    return {"message": "Profile image updated successfully", "image_url": image_url, "image_variants": image_variants}
 
 
 # ============== Admin-only endpoints for team communication ==============
 
 async def send_announcement_email(recipient_email: str, member_name: str, subject: str, message: str, include_portal_link: bool = True):
     """Send announcement email to a team member"""
-    import smtplib
     from email.mime.multipart import MIMEMultipart
     from email.mime.text import MIMEText
-    from jinja2 import Template
-    from pathlib import Path
 
     sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
     frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
-    # Load template
-    base_path = Path(__file__).parent.parent
-    template_path = base_path / "templates" / "team_announcement.html"
-    
     try:
-        with open(template_path, "r") as f:
-            template_str = f.read()
-        template = Template(template_str)
-        html_content = template.render(
+        html_content = render_email(
+            "team_announcement.html",
             member_name=member_name,
             subject=subject,
             message=message,
@@ -720,25 +688,19 @@ async def send_announcement_email(recipient_email: str, member_name: str, subjec
     msg.attach(MIMEText(text, "plain"))
     msg.attach(MIMEText(html_content, "html"))
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, app_password)
-            server.sendmail(sender_email, recipient_email, msg.as_string())
-        return True
-    except Exception as e:
-        print(f"Error sending announcement email to {recipient_email}: {e}")
+    if not enqueue_email(msg):
+        print(f"Error queueing announcement email to {recipient_email}")
         return False
+    return True
 
 
 async def send_welcome_portal_email(recipient_email: str, member_name: str, temp_password: str = None):
     """Send welcome email to member with portal access info"""
-    import smtplib
     from email.mime.multipart import MIMEMultipart
     from email.mime.text import MIMEText
     from pathlib import Path
 
     sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
     frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
 
     subject = "Welcome to FDC Member Portal - Your Account is Ready!"
@@ -855,14 +817,10 @@ async def send_welcome_portal_email(recipient_email: str, member_name: str, temp
     msg.attach(MIMEText(text, "plain"))
     msg.attach(MIMEText(html_content, "html"))
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, app_password)
-            server.sendmail(sender_email, recipient_email, msg.as_string())
-        return True
-    except Exception as e:
-        print(f"Error sending welcome email to {recipient_email}: {e}")
+    if not enqueue_email(msg):
+        print(f"Error queueing welcome email to {recipient_email}")
         return False
+    return True
 
 
 @router.post("/admin/team/send-announcement")
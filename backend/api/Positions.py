@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import List
 from bson import ObjectId
 from backend.config.database.init import get_misc_db
+from backend.utils.cache import cached, invalidates
 from backend.middleware.auth.token import verify_token
 from datetime import datetime
 
@@ -14,6 +15,7 @@ class PositionIn(BaseModel):
 
 
 @router.get('/positions')
+@cached("positions", ttl=300)
 async def list_positions(db=Depends(get_misc_db)):
     docs = []
     cursor = db.positions.find({}).sort('created_at', -1)
@@ -32,6 +34,7 @@ async def admin_list_positions(db=Depends(get_misc_db), auth=Depends(verify_toke
 
 
 @router.post('/admin/positions')
+@invalidates("positions")
 async def create_position(payload: PositionIn = Body(...), db=Depends(get_misc_db), auth=Depends(verify_token)):
     name = payload.name.strip()
     if not name:
@@ -42,6 +45,7 @@ async def create_position(payload: PositionIn = Body(...), db=Depends(get_misc_d
 
 
 @router.put('/admin/positions/{pos_id}')
+@invalidates("positions")
 async def update_position(pos_id: str, payload: PositionIn = Body(...), db=Depends(get_misc_db), auth=Depends(verify_token)):
     try:
         oid = ObjectId(pos_id)
@@ -57,6 +61,7 @@ async def update_position(pos_id: str, payload: PositionIn = Body(...), db=Depen
 
 
 @router.delete('/admin/positions/{pos_id}')
+@invalidates("positions")
 async def delete_position(pos_id: str, force: bool = Query(False), db=Depends(get_misc_db), auth=Depends(verify_token)):
     try:
         oid = ObjectId(pos_id)
@@ -7,15 +7,20 @@ import backend.config.database.init as config
 from backend.config.database.init import get_misc_db
 # from backend.config.limiter import _limiter as limiter
 # from bson import ObjectId
-import csv
-import io
 import os
 from backend.utils.CloudinaryImageUploader import save_uploaded_image
 import json
+import logging
 import httpx
 import os
 import random
-import aiosmtplib
+from backend.utils.mailer import enqueue_email
+from backend.utils.email_templates import render_email
+from backend.utils.exports import ExportParams, export_response
+from backend.utils.export_schemas import EXPORT_SCHEMAS
+from backend.utils.pagination import PageParams, paginate
+from backend.utils.cache import cached
+from backend.utils.metrics_rollups import SELF_COUNTED, record_registration
 from email.message import EmailMessage
 
 # optional google sheets sync
@@ -25,6 +30,7 @@ from backend.middleware.auth.token import verify_token
 
 router = APIRouter()
 db = config.miscDB
+logger = logging.getLogger(__name__)
 
 
 class RegistrationCreate(BaseModel):
@@ -115,6 +121,10 @@ async def create_registration( request: Request,
         try:
             # use the project's Cloudinary helper which validates and uploads
             picture_url = await save_uploaded_image(picture)
+        except HTTPException as e:
+            if e.status_code == 429:
+                raise
+            print('Picture upload failed via helper:', e.detail)
         except Exception as e:
             # log and continue; admin will see empty picture_url
             print('Picture upload failed via helper:', str(e))
@@ -149,7 +159,13 @@ async def create_registration( request: Request,
             raise HTTPException(status_code=400, detail=f'Invalid position_applied. Available positions: {", ".join(avail)}')
 
     data['created_at'] = datetime.utcnow()
+    data[SELF_COUNTED] = True
     res = await db.registrations.insert_one(data)
+    try:
+        await record_registration(db, data)
+    except Exception as e:
+        # Not fatal for the application; python -m backend.utils.metrics_rollups recounts
+        logger.warning('Metrics rollup update failed: %s', e)
     # mark verification as used
     try:
         await db.registration_verifications.update_one({'_id': vdoc['_id']}, {'$set': {'used': True, 'used_at': datetime.utcnow()}})
@@ -189,19 +205,12 @@ async def request_registration_verification( request: Request,payload: dict = Bo
     # send email with code
     try:
         ADMIN_EMAIL = os.getenv('ADMIN_EMAIL') or 'contact@taakra2026.com'
-        ADMIN_EMAIL_PASSWORD = os.getenv('ADMIN_EMAIL_PASSWORD') or os.getenv('ADMIN_EMAIL_PASSWORD') or ''
-        SMTP_SERVER = os.getenv('SMTP_SERVER') or 'smtp.gmail.com'
-        SMTP_PORT = int(os.getenv('SMTP_PORT') or 587)
         msg = EmailMessage()
         msg['From'] = ADMIN_EMAIL
         msg['To'] = email
         msg['Subject'] = 'Your verification code for Taakra 2026 Application'
         # Try to use HTML template if available in backend/templates
         try:
-            tpl_path = os.path.join(os.path.dirname(__file__), '..', 'templates', 'team_registration_template.html')
-            tpl_path = os.path.abspath(tpl_path)
-            with open(tpl_path, 'r', encoding='utf-8') as f:
-                html_tpl = f.read()
             timestamp = datetime.utcnow().isoformat()
             ip_addr = 'unknown'
             try:
@@ -209,7 +218,14 @@ async def request_registration_verification( request: Request,payload: dict = Bo
                     ip_addr = request.client.host or 'otpunknown'
             except Exception:
                 ip_addr = 'unknown'
-            html = html_tpl.replace('{{otp}}', code).replace('{{timestamp}}', timestamp).replace('{{ip_address}}', ip_addr).replace('{{year}}', str(datetime.utcnow().year)).replace('{{device_info}}', '')
+            html = render_email(
+                'team_registration_template.html',
+                otp=code,
+                timestamp=timestamp,
+                ip_address=ip_addr,
+                year=datetime.utcnow().year,
+                device_info='',
+            )
             msg.set_content(f'Your verification code is: {code}\nThis code will expire in 24 hours.')
             msg.add_alternative(html, subtype='html')
         except Exception as e:
@@ -217,7 +233,7 @@ async def request_registration_verification( request: Request,payload: dict = Bo
             print('Failed to load HTML template for OTP email:', e)
             msg.set_content(f'Your verification code is: {code}\nThis code will expire in 24 hours.')
 
-        await aiosmtplib.send(msg, hostname=SMTP_SERVER, port=SMTP_PORT, start_tls=True, username=ADMIN_EMAIL, password=ADMIN_EMAIL_PASSWORD)
+        enqueue_email(msg)
     except Exception as e:
         # log and continue; verification still stored
         print('Failed to send verification email:', e)
@@ -263,6 +279,7 @@ async def verify_registration_code( request: Request,payload: dict = Body(...),
 
 @router.get('/registrations/status')
 # @limiter.limit("20/day")
+@cached("settings", ttl=30)
 async def get_registrations_status( request: Request,db=Depends(get_misc_db)):
     # Read status from settings document (default open=true)
     s = await db.settings.find_one({'_id': 'registrations'})
@@ -273,42 +290,18 @@ async def get_registrations_status( request: Request,db=Depends(get_misc_db)):
 
 @router.get('/registrations/', response_model=List[RegistrationInDB])
 # @limiter.limit("20/day")
-async def list_registrations( request: Request,db=Depends(get_misc_db), auth=Depends(verify_token)):
+async def list_registrations( request: Request, response: Response, page: PageParams = Depends(), db=Depends(get_misc_db), auth=Depends(verify_token)):
     items = []
-    async for r in db.registrations.find().sort('created_at', -1):
+    for r in await paginate(db.registrations, {}, page, response):
         r['id'] = str(r['_id'])
         items.append(RegistrationInDB(**r))
     return items
 
 
 @router.get('/registrations/export')
-async def export_registrations_csv(db=Depends(get_misc_db), auth=Depends(verify_token)):
-    # Export registrations as CSV
-    cursor = db.registrations.find().sort('created_at', -1)
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['id', 'name', 'roll_no', 'campus', 'email', 'phone', 'position_applied', 'portfolio', 'linkedin', 'picture_url', 'experience_alignment', 'other_society', 'why_join', 'expertise', 'best_thing', 'improve', 'created_at'])
-    async for r in cursor:
-        writer.writerow([
-            str(r.get('_id')),
-            r.get('name', ''),
-            r.get('roll_no', ''),
-            r.get('campus', ''),
-            r.get('email', ''),
-            r.get('phone', ''),
-            r.get('position_applied', ''),
-            r.get('portfolio', ''),
-            r.get('linkedin', ''),
-            r.get('picture_url', ''),
-            r.get('experience_alignment', ''),
-            r.get('other_society', ''),
-            r.get('why_join', ''),
-            r.get('expertise', ''),
-            r.get('best_thing', ''),
-            r.get('improve', ''),
-            r.get('created_at').isoformat() if r.get('created_at') else ''
-        ])
-    return Response(content=output.getvalue(), media_type='text/csv')
+async def export_registrations_csv(params: ExportParams = Depends(), db=Depends(get_misc_db), auth=Depends(verify_token)):
+    # Export registrations (CSV by default), streamed from the cursor
+    return export_response(EXPORT_SCHEMAS['registrations'], db, params)
 
 
 class SheetsSyncRequest(BaseModel):
@@ -6,8 +6,8 @@ import backend.config.database.init as config
 from backend.config.database.init import get_misc_db
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Template
-import smtplib
+from backend.utils.email_templates import has_template, render_email
+from backend.utils.mailer import enqueue_email
 
 from backend.config.limiter import _limiter as limiter
 from pathlib import Path
@@ -42,10 +42,8 @@ async def subscribe(request:Request,subscriber: Subscriber, db=Depends(get_misc_
 
     # Send subscription confirmation email
     sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
     receiver_email = subscriber.email
-    template_path = Path(__file__).parent.parent / "templates" / "subscribe_notification.html"
-    if not template_path.exists():
+    if not has_template("subscribe_notification.html"):
         html_content = f"""
         <html>
         <body>
@@ -59,10 +57,8 @@ async def subscribe(request:Request,subscriber: Subscriber, db=Depends(get_misc_
         </html>
         """
     else:
-        with open(template_path, 'r') as file:
-            template_content = file.read()
-        template = Template(template_content)
-        html_content = template.render(
+        html_content = render_email(
+            "subscribe_notification.html",
             email=subscriber.email,
             year=datetime.now().year
         )
@@ -80,12 +76,7 @@ async def subscribe(request:Request,subscriber: Subscriber, db=Depends(get_misc_
     part2 = MIMEText(html_content, "html")
     msg.attach(part1)
     msg.attach(part2)
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, app_password)
-            server.sendmail(sender_email, receiver_email, msg.as_string())
-        print("Subscription email sent successfully!")
-    except Exception as e:
-        print("Error sending subscription email:", e)
+    if not enqueue_email(msg):
+        print("Error queueing subscription email")
 
     return {"message": "Subscription successful", "email": subscriber.email}
\ No newline at end of file
@@ -7,7 +7,7 @@ from fastapi import Body
 from enum import Enum
 from typing import Optional, List
 from bson import ObjectId
-from fastapi import HTTPException, UploadFile, File, Form, status, APIRouter, Depends
+from fastapi import HTTPException, UploadFile, File, Form, status, APIRouter, Depends, Response
 from PIL import Image, UnidentifiedImageError
 from pydantic import BaseModel, Field
 import cloudinary
@@ -18,9 +18,12 @@ import logging
 from datetime import datetime
 from backend.Schemas.Team import TeamMemberInDB, TeamMemberCreate, TeamMemberUpdate, SocialLinks, MemberType
 import json
-from backend.utils.CloudinaryImageUploader import save_uploaded_image
+from backend.utils.CloudinaryImageUploader import save_uploaded_image_with_variants
 import backend.config.database.init as config
 from backend.config.database.init import get_misc_db
+from backend.utils.pagination import PageParams, paginate
+from backend.utils.cache import cached, invalidates
+from backend.utils.responses import model_fields, trusted_response
 from typing import List
 
 
@@ -132,6 +135,7 @@ def get_current_tenure():
 
 # Member endpoints
 @router.post("/members/", response_model=TeamMemberInDB, status_code=201)
+@invalidates("members")
 async def create_member(
     name: str = Form(...),
     role: Optional[str] = Form(None),  # Deprecated: kept for backward compatibility
@@ -170,9 +174,9 @@ async def create_member(
         )
         
         # Upload image if provided
-        image_url = None
+        image_url, image_variants = None, None
         if image:
-            image_url = await save_uploaded_image(image,"team")
+            image_url, image_variants = await save_uploaded_image_with_variants(image,"team")
 
         # Parse tenure - support both JSON array and comma-separated string, or single string
         member_tenures = []
@@ -228,6 +232,7 @@ async def create_member(
             "experience": json.loads(experience) if experience else [],
             "education": json.loads(education) if education else [],
             "image_url": image_url,
+            "image_variants": image_variants,
             "email": email.lower().strip() if email else None,  # Email for member portal
             "has_portal_access": False,  # Will be set to True when member logs in
             "order_by_tenure": {},  # Initialize empty order_by_tenure dict
@@ -247,11 +252,20 @@ async def create_member(
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/members/", response_model=List[TeamMemberInDB])
+@trusted_response
+@cached("members", ttl=300)
 async def get_all_members(
+    response: Response,
     member_type: Optional[MemberType] = None, 
     tenure: Optional[str] = None,
+    page: PageParams = Depends(),
     db=Depends(get_misc_db)
 ):
+    """Members newest first, or in roster order for a tenure.
+
+    Cursor pagination applies to the newest-first listing only; a tenure's
+    roster is ordered by order_by_tenure and always returned whole.
+    """
     if db is None:
         raise HTTPException(status_code=500, detail="Database not initialized")
         
@@ -266,8 +280,16 @@ async def get_all_members(
         ]
         
     members = []
-    # Fetch all members first
-    async for member in db.members.find(query):
+    if tenure:
+        # Fetch the whole roster first, it is sorted below
+        docs = await db.members.find(query).to_list(length=None)
+    else:
+        docs = await paginate(db.members, query, page, response)
+        if not page.paged:
+            # The full listing keeps its old order: members without created_at
+            # come first, the rest stay newest first (sort is stable)
+            docs.sort(key=lambda m: m.get("created_at") is not None)
+    for member in docs:
         member["id"] = str(member["_id"])
         # Convert old string tenure format to array format for backward compatibility
         if "tenure" in member and isinstance(member["tenure"], str):
@@ -303,15 +325,13 @@ async def get_all_members(
             return 9999
         
         members.sort(key=get_tenure_order)
-    else:
-        # If no tenure filter, sort by created_at
-        members.sort(key=lambda m: m.get("created_at", datetime.utcnow()), reverse=True)
     
-    # Convert to Pydantic models after sorting
-    return [TeamMemberInDB(**member) for member in members]
+    # Keep only the response fields; password_hash and the portal bookkeeping stay in Mongo
+    return [model_fields(TeamMemberInDB, member) for member in members]
 
 
 @router.get("/members/tenures/", response_model=List[str])
+@cached("members", ttl=300)
 async def get_all_tenures(member_type: Optional[MemberType] = None, db=Depends(get_misc_db)):
     """Get all unique tenures for filtering. Always includes current tenure."""
     if db is None:
@@ -339,10 +359,12 @@ async def get_all_tenures(member_type: Optional[MemberType] = None, db=Depends(g
     return sorted_tenures
 
 @router.get("/members/{member_id}", response_model=TeamMemberInDB)
+@cached("members", ttl=300)
 async def get_member(member_id: str, db=Depends(get_misc_db)):
     return await get_member_or_404(member_id, db)
 
 @router.put("/members/{member_id}", response_model=TeamMemberInDB)
+@invalidates("members")
 async def update_member(
     member_id: str,
     name: str = Form(...),
@@ -376,8 +398,9 @@ async def update_member(
     
     # Upload new image if provided
     image_url = existing_member.get("image_url")
+    image_variants = existing_member.get("image_variants")
     if image:
-        image_url = await save_uploaded_image(image,"team")
+        image_url, image_variants = await save_uploaded_image_with_variants(image,"team")
     
     # Create social links object
     socials = SocialLinks(
@@ -461,6 +484,7 @@ async def update_member(
         "experience": json.loads(experience) if experience else existing_member.get('experience', []),
         "education": json.loads(education) if education else existing_member.get('education', []),
         "image_url": image_url,
+        "image_variants": image_variants,
         "email": email.lower().strip() if email else existing_member.get('email'),  # Email for member portal
         "order_by_tenure": existing_order_by_tenure,  # Preserve existing order_by_tenure
         "updated_at": datetime.utcnow()
@@ -477,6 +501,7 @@ async def update_member(
     return TeamMemberInDB(**updated_member)
 
 @router.delete("/members/{member_id}", status_code=204)
+@invalidates("members")
 async def delete_member(member_id: str, db=Depends(get_misc_db)):
     result = await db.members.delete_one({"_id": ObjectId(member_id)})
     if result.deleted_count == 0:
@@ -484,16 +509,17 @@ async def delete_member(member_id: str, db=Depends(get_misc_db)):
     return None
 
 @router.get("/team-members/", response_model=List[TeamMemberInDB])
-async def get_team_members(db=Depends(get_misc_db)):
-    return await get_all_members(member_type=MemberType.TEAM, db=db)
+async def get_team_members(response: Response, page: PageParams = Depends(), db=Depends(get_misc_db)):
+    return await get_all_members(response=response, member_type=MemberType.TEAM, tenure=None, page=page, db=db)
 
 @router.get("/advisors/", response_model=List[TeamMemberInDB])
-async def get_advisors(db=Depends(get_misc_db)):
-    return await get_all_members(member_type=MemberType.ADVISOR, db=db)
+async def get_advisors(response: Response, page: PageParams = Depends(), db=Depends(get_misc_db)):
+    return await get_all_members(response=response, member_type=MemberType.ADVISOR, tenure=None, page=page, db=db)
 
 
 
 @router.post("/team-members/reorder")
+@invalidates("members")
 async def reorder_team_members(payload: TeamOrderRequest, db=Depends(get_misc_db)):
     """
     Update the order of team members by saving their new positions in the database per tenure.
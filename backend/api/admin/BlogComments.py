@@ -1,17 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from bson import ObjectId
 from datetime import datetime
 from backend.config.database.init import get_blog_db
 from backend.middleware.auth.token import verify_token
+from backend.utils.pagination import PageParams, paginate
 
 router = APIRouter()
 
 
 @router.get('/posts/{post_id}/comments/all')
-async def list_all_comments(post_id: str, db=Depends(get_blog_db), auth=Depends(verify_token)):
+async def list_all_comments(post_id: str, response: Response, page: PageParams = Depends(), db=Depends(get_blog_db), auth=Depends(verify_token)):
     """List all comments (including unapproved) for admin. Requires authentication."""
     comments = []
-    async for c in db.blog_comments.find({'post_id': post_id}).sort('created_at', -1):
+    for c in await paginate(db.blog_comments, {'post_id': post_id}, page, response):
         # Convert ObjectId to string and remove _id field
         c['id'] = str(c.get('_id'))
         if '_id' in c:
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException, Depends, Query
+from bson import ObjectId
+from datetime import datetime
+from typing import Optional
+from backend.config.database.init import get_misc_db
+from backend.middleware.auth.token import verify_token
+from backend.utils.campaigns import CAMPAIGNS, RECIPIENTS, _claim, campaign_helper, start_campaign
+
+router = APIRouter()
+
+
+@router.get('/campaigns')
+async def list_campaigns(limit: int = Query(20, ge=1, le=100), db=Depends(get_misc_db), auth=Depends(verify_token)):
+    """Recent email campaigns with their progress counters."""
+    campaigns = []
+    async for c in db[CAMPAIGNS].find({}, {'context': 0, 'fallback_html': 0}).sort('created_at', -1).limit(limit):
+        campaigns.append(campaign_helper(c))
+    return campaigns
+
+
+@router.get('/campaigns/{campaign_id}')
+async def get_campaign(campaign_id: str, failed: bool = Query(False, description="Include failed recipients"), db=Depends(get_misc_db), auth=Depends(verify_token)):
+    """Progress of one campaign; optionally the recipients that failed and why."""
+    if not ObjectId.is_valid(campaign_id):
+        raise HTTPException(status_code=400, detail='Invalid campaign ID')
+    doc = await db[CAMPAIGNS].find_one({'_id': ObjectId(campaign_id)}, {'context': 0, 'fallback_html': 0})
+    if not doc:
+        raise HTTPException(status_code=404, detail='Campaign not found')
+    result = campaign_helper(doc)
+    if failed:
+        result['failed_recipients'] = [
+            {'email': r['email'], 'error': r.get('error'), 'attempts': r.get('attempts', 0)}
+            async for r in db[RECIPIENTS].find({'campaign_id': doc['_id'], 'status': 'failed'}).limit(500)
+        ]
+    return result
+
+
+@router.post('/campaigns/{campaign_id}/resume')
+async def resume_campaign(campaign_id: str, retry_failed: bool = Query(False), db=Depends(get_misc_db), auth=Depends(verify_token)):
+    """Resume an interrupted campaign; with retry_failed, failed recipients are queued again."""
+    if not ObjectId.is_valid(campaign_id):
+        raise HTTPException(status_code=400, detail='Invalid campaign ID')
+    oid = ObjectId(campaign_id)
+    doc = await db[CAMPAIGNS].find_one({'_id': oid})
+    if not doc:
+        raise HTTPException(status_code=404, detail='Campaign not found')
+    if retry_failed:
+        reset = await db[RECIPIENTS].update_many({'campaign_id': oid, 'status': 'failed'}, {'$set': {'status': 'pending'}, '$unset': {'error': ''}})
+        if reset.modified_count:
+            await db[CAMPAIGNS].update_one({'_id': oid}, {'$inc': {'failed': -reset.modified_count}})
+    if doc.get('status') == 'completed':
+        pending = await db[RECIPIENTS].count_documents({'campaign_id': oid, 'status': 'pending'})
+        if not pending:
+            return {'status': 'completed', 'message': 'Nothing left to send'}
+        await db[CAMPAIGNS].update_one({'_id': oid}, {'$set': {'status': 'pending', 'updated_at': datetime.utcnow()}})
+    elif doc.get('status') == 'failed':
+        # Stopped after repeated errors: start over with a fresh error budget
+        await db[CAMPAIGNS].update_one(
+            {'_id': oid},
+            {'$set': {'status': 'pending', 'error_count': 0, 'lease_expires_at': None, 'updated_at': datetime.utcnow()}},
+        )
+    # Take the lease here so the response reflects who is actually sending
+    if await _claim(db, campaign_id) is None:
+        doc = await db[CAMPAIGNS].find_one({'_id': oid}, {'status': 1, 'lease_owner': 1})
+        if doc.get('status') in ('pending', 'running'):
+            return {'status': doc['status'], 'message': 'Campaign is being sent by another worker'}
+        return {'status': doc.get('status'), 'message': 'Campaign cannot be resumed'}
+    started = start_campaign(db, campaign_id)
+    return {'status': 'running', 'message': 'Campaign resumed' if started else 'Campaign already running in this worker'}
@@ -6,16 +6,19 @@ from typing import List
 from bson import ObjectId
 from pydantic import BaseModel
 from datetime import datetime
-import io, csv
 import httpx
 import logging
-import cloudinary.uploader
+from backend.utils import cloudinary_client
+from backend.utils.exports import ExportParams, export_response
+from backend.utils.export_schemas import EXPORT_SCHEMAS
+from backend.utils.pagination import PageParams, paginate
+from backend.utils.cache import invalidates
 import os
-import smtplib
+from backend.utils.mailer import enqueue_email
+from backend.utils.email_templates import has_template, render_email
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
-from jinja2 import Template
 
 router = APIRouter()
 
@@ -24,7 +27,7 @@ class RegistrationStatus(BaseModel):
 
 
 @router.get('/registrations/export')
-async def export_registrations_csv(request: Request, db=Depends(get_misc_db), auth=Depends(verify_cogentlabs_token)):
+async def export_registrations_csv(request: Request, params: ExportParams = Depends(), db=Depends(get_misc_db), auth=Depends(verify_cogentlabs_token)):
     try:
         logger = logging.getLogger(__name__)
         try:
@@ -32,46 +35,20 @@ async def export_registrations_csv(request: Request, db=Depends(get_misc_db), au
             logger.info(f"Export requested from {request.client.host} hdr_admin_token_present={bool(hdr_token)} cookies_present={len(request.cookies)>0}")
         except Exception:
             logger.exception('Failed to log request auth info')
-        # Build CSV in-memory
-        cursor = db.cogent_labs_registrations.find().sort('created_at', -1)
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['id', 'name', 'cnic', 'email', 'phone', 'batch', 'campus', 'why_join', 'comments', 'resume_filename', 'resume_url', 'feedback', 'created_at'])
-        async for r in cursor:
-            # Format CNIC and phone as text to prevent Excel scientific notation
-            # Prefix with apostrophe to force Excel to treat as text (apostrophe is not displayed)
-            cnic = r.get('cnic', '')
-            phone = r.get('phone', '')
-            # Add apostrophe prefix to force Excel to treat as text
-            cnic_text = f"'{cnic}" if cnic else ''
-            phone_text = f"'{phone}" if phone else ''
-            
-            writer.writerow([
-                str(r.get('_id')),
-                r.get('name', ''),
-                cnic_text,
-                r.get('email', ''),
-                phone_text,
-                r.get('batch', ''),
-                r.get('campus', ''),
-                r.get('why_join', ''),
-                r.get('comments', ''),
-                r.get('resume_filename', ''),
-                r.get('resume_url', ''),
-                r.get('feedback', ''),
-                r.get('created_at').isoformat() if r.get('created_at') else ''
-            ])
         logging.getLogger(__name__).info('Admin CSV export requested')
-        return Response(content=output.getvalue(), media_type='text/csv')
+        return export_response(EXPORT_SCHEMAS['cogent_labs_registrations'], db, params)
+    except HTTPException:
+        raise
     except Exception:
         logging.exception('Failed to generate registrations CSV')
         raise HTTPException(status_code=500, detail='Failed to generate CSV')
 
 
 @router.get('/registrations')
-async def list_registrations(db=Depends(get_misc_db), auth=Depends(verify_cogentlabs_token)):
+async def list_registrations(response: Response, page: PageParams = Depends(), db=Depends(get_misc_db), auth=Depends(verify_cogentlabs_token)):
     items = []
-    async for d in db.cogent_labs_registrations.find().sort('created_at', -1):
+    projection = {'name': 1, 'email': 1, 'phone': 1, 'batch': 1, 'campus': 1, 'created_at': 1, 'feedback': 1}
+    for d in await paginate(db.cogent_labs_registrations, {}, page, response, projection):
         items.append({
             'id': str(d.get('_id')),
             'name': d.get('name'),
@@ -151,7 +128,7 @@ async def delete_registration(item_id: str, db=Depends(get_misc_db), auth=Depend
     # Attempt to delete Cloudinary resource if we have a public_id
     if public_id:
         try:
-            res = cloudinary.uploader.destroy(public_id, resource_type='raw')
+            res = await cloudinary_client.destroy(public_id, account='MISC', resource_type='raw')
             logging.getLogger(__name__).info(f'Deleted Cloudinary resource {public_id} -> {res}')
         except Exception:
             logging.getLogger(__name__).exception(f'Failed to delete Cloudinary resource {public_id} (continuing with DB delete)')
@@ -256,6 +233,7 @@ async def get_registrations_status(db=Depends(get_misc_db), auth=Depends(verify_
 
 
 @router.post('/cogent-labs/registrations/status')
+@invalidates("settings")
 async def set_registrations_status(payload: RegistrationStatus = Body(...), db=Depends(get_misc_db), auth=Depends(verify_cogentlabs_token)):
     await db.settings.update_one({'_id': 'cogent_labs_registrations'}, {'$set': {'open': bool(payload.open)}}, upsert=True)
     return {'open': bool(payload.open)}
@@ -291,9 +269,7 @@ async def send_feedback_email(item_id: str, db=Depends(get_misc_db), auth=Depend
         raise HTTPException(status_code=400, detail='Student email not found')
     
     # Load and customize the HTML template
-    template_path = Path(__file__).parent.parent.parent / "templates" / "cogent_labs_feedback.html"
-    
-    if not template_path.exists():
+    if not has_template("cogent_labs_feedback.html"):
         # Fallback to a simple template if file not found
         html_content = f"""
         <html>
@@ -309,14 +285,9 @@ async def send_feedback_email(item_id: str, db=Depends(get_misc_db), auth=Depend
         </html>
         """
     else:
-        with open(template_path, 'r', encoding='utf-8') as file:
-            template_content = file.read()
-        
-        # Create Jinja2 template
-        template = Template(template_content)
-        
-        # Render template with variables
-        html_content = template.render(
+        # Render the cached template with variables
+        html_content = render_email(
+            "cogent_labs_feedback.html",
             name=registration.get('name', 'Student'),
             batch=registration.get('batch', ''),
             campus=registration.get('campus', ''),
@@ -356,20 +327,15 @@ async def send_feedback_email(item_id: str, db=Depends(get_misc_db), auth=Depend
     msg.attach(part1)
     msg.attach(part2)
     
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, app_password)
-            server.sendmail(sender_email, receiver_email, msg.as_string())
-        
-        # Update registration to mark feedback as sent
-        await db.cogent_labs_registrations.update_one(
-            {'_id': oid},
-            {'$set': {'feedback_sent_at': datetime.utcnow()}}
-        )
-        
-        logging.getLogger(__name__).info(f'Feedback email sent to {receiver_email} for registration {item_id}')
-        return {'ok': True, 'message': 'Feedback email sent successfully'}
-    except Exception as e:
-        logging.getLogger(__name__).exception(f'Failed to send feedback email to {receiver_email}: {e}')
-        raise HTTPException(status_code=500, detail=f'Failed to send email: {str(e)}')
+    if not enqueue_email(msg):
+        raise HTTPException(status_code=503, detail='Email queue is full, please try again shortly')
+
+    # Delivery happens in the mail queue; record when the feedback was queued
+    await db.cogent_labs_registrations.update_one(
+        {'_id': oid},
+        {'$set': {'feedback_queued_at': datetime.utcnow()}}
+    )
+
+    logging.getLogger(__name__).info(f'Feedback email queued for {receiver_email} for registration {item_id}')
+    return {'ok': True, 'message': 'Feedback email queued for delivery'}
 
@@ -7,15 +7,19 @@ from bson import ObjectId
 import io, csv
 import httpx
 import logging
-import cloudinary.uploader
+from backend.utils import cloudinary_client
+from backend.utils.exports import ExportParams, export_response
+from backend.utils.export_schemas import EXPORT_SCHEMAS
+from backend.utils.pagination import PageParams, paginate
 
 router = APIRouter()
 
 
 @router.get('/delegations')
-async def list_delegations(db=Depends(get_misc_db), auth=Depends(verify_token)):
+async def list_delegations(response: Response, page: PageParams = Depends(), db=Depends(get_misc_db), auth=Depends(verify_token)):
     items = []
-    async for d in db.delegations.find().sort('created_at', -1):
+    projection = {'name': 1, 'email': 1, 'phone': 1, 'batch': 1, 'campus': 1, 'created_at': 1}
+    for d in await paginate(db.delegations, {}, page, response, projection):
         items.append({
             'id': str(d.get('_id')),
             'name': d.get('name'),
@@ -29,7 +33,7 @@ async def list_delegations(db=Depends(get_misc_db), auth=Depends(verify_token)):
 
 
 @router.get('/delegations/export')
-async def export_delegations_csv(request: Request, db=Depends(get_misc_db), auth=Depends(verify_token)):
+async def export_delegations_csv(request: Request, params: ExportParams = Depends(), db=Depends(get_misc_db), auth=Depends(verify_token)):
     # Log incoming request metadata for debugging when export fails with 400
     try:
         logger = logging.getLogger(__name__)
@@ -38,28 +42,10 @@ async def export_delegations_csv(request: Request, db=Depends(get_misc_db), auth
             logger.info(f"Export requested from {request.client.host} hdr_admin_token_present={bool(hdr_token)} cookies_present={len(request.cookies)>0}")
         except Exception:
             logger.exception('Failed to log request auth info')
-        # Build CSV in-memory similarly to registrations export for compatibility
-        cursor = db.delegations.find().sort('created_at', -1)
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['id', 'name', 'cnic', 'email', 'phone', 'batch', 'campus', 'why_join', 'comments', 'resume_filename', 'resume_url', 'created_at'])
-        async for r in cursor:
-            writer.writerow([
-                str(r.get('_id')),
-                r.get('name', ''),
-                r.get('cnic', ''),
-                r.get('email', ''),
-                r.get('phone', ''),
-                r.get('batch', ''),
-                r.get('campus', ''),
-                r.get('why_join', ''),
-                r.get('comments', ''),
-                r.get('resume_filename', ''),
-                r.get('resume_url', ''),
-                r.get('created_at').isoformat() if r.get('created_at') else ''
-            ])
         logging.getLogger(__name__).info('Admin CSV export requested')
-        return Response(content=output.getvalue(), media_type='text/csv')
+        return export_response(EXPORT_SCHEMAS['delegations'], db, params)
+    except HTTPException:
+        raise
     except Exception:
         logging.exception('Failed to generate delegations CSV')
         raise HTTPException(status_code=500, detail='Failed to generate CSV')
@@ -159,7 +145,7 @@ async def delete_delegation(item_id: str, db=Depends(get_misc_db), auth=Depends(
     # Attempt to delete Cloudinary resource if we have a public_id
     if public_id:
         try:
-            res = cloudinary.uploader.destroy(public_id, resource_type='raw')
+            res = await cloudinary_client.destroy(public_id, account='MISC', resource_type='raw')
             logging.getLogger(__name__).info(f'Deleted Cloudinary resource {public_id} -> {res}')
         except Exception:
             logging.getLogger(__name__).exception(f'Failed to delete Cloudinary resource {public_id} (continuing with DB delete)')
@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from typing import Optional
+from backend.config.database.init import get_blog_db, get_event_db, get_misc_db
+from backend.middleware.auth.token import verify_token
+from backend.utils.exports import ExportParams, export_response
+from backend.utils.export_schemas import EXPORT_SCHEMAS
+
+router = APIRouter()
+
+_DATABASES = {"blog": get_blog_db, "event": get_event_db, "misc": get_misc_db}
+
+
+@router.get('/exports')
+async def list_exports(auth=Depends(verify_token)):
+    """Exportable datasets with their fields and supported filters."""
+    return [schema.describe() for schema in EXPORT_SCHEMAS.values()]
+
+
+@router.get('/exports/{dataset}')
+async def export_dataset(
+    dataset: str,
+    request: Request,
+    params: ExportParams = Depends(),
+    auth=Depends(verify_token),
+):
+    """Stream a dataset as csv, ndjson, xlsx, parquet or arrow.
+
+    Equality filters declared by the dataset (e.g. ?event_id=...) are passed
+    as query parameters alongside format / fields / from / to.
+    """
+    schema = EXPORT_SCHEMAS.get(dataset)
+    if schema is None:
+        raise HTTPException(status_code=404, detail='Unknown dataset')
+    filters = {key: request.query_params.get(key) for key in schema.filters if key in request.query_params}
+    return export_response(schema, _DATABASES[schema.db](), params, filters=filters)
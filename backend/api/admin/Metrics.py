@@ -1,46 +1,28 @@
-from fastapi import APIRouter, Depends
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query
 from backend.config.database.init import get_misc_db
 from backend.middleware.auth.token import verify_token
+from backend.utils.cache import cache_stats
+from backend.utils.metrics_rollups import TREND_WINDOWS, get_registration_metrics
 
 router = APIRouter()
 
 
 @router.get('/metrics')
-async def get_admin_metrics(db=Depends(get_misc_db), auth=Depends(verify_token)):
-    now = datetime.utcnow()
-    seven_days_ago = now - timedelta(days=7)
+async def get_admin_metrics(days: int = Query(7, description=f"Trend window, one of {TREND_WINDOWS}"), db=Depends(get_misc_db), auth=Depends(verify_token)):
+    if days not in TREND_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"days must be one of {', '.join(map(str, TREND_WINDOWS))}")
 
-    # total registrations
-    total_regs = await db.registrations.count_documents({})
-
-    # registrations in last 7 days
-    recent_cnt = await db.registrations.count_documents({'created_at': {'$gte': seven_days_ago}})
-
-    # registrations without picture
-    no_picture = await db.registrations.count_documents({'$or': [{'picture_url': {'$exists': False}}, {'picture_url': None}, {'picture_url': ''}]})
-
-    # registrations by position (group)
-    pipeline = [
-        {'$group': {'_id': '$position_applied', 'count': {'$sum': 1}}},
-        {'$sort': {'count': -1}}
-    ]
-    ag = db.registrations.aggregate(pipeline)
-    by_position = []
-    async for doc in ag:
-        name = doc['_id'] or 'Unspecified'
-        by_position.append({'position': name, 'count': doc['count']})
+    # Counters come from the rollup document (utils/metrics_rollups.py)
+    metrics = await get_registration_metrics(db, days)
 
     # total positions configured
     try:
-        positions_count = await db.positions.count_documents({})
+        positions_count = await db.positions.estimated_document_count()
     except Exception:
         positions_count = 0
 
-    # recent registrations (last 5)
     recent_regs = []
-    cursor = db.registrations.find().sort('created_at', -1).limit(5)
-    async for r in cursor:
+    for r in metrics['recent']:
         recent_regs.append({
             'id': str(r.get('_id')),
             'name': r.get('name'),
@@ -49,21 +31,20 @@ async def get_admin_metrics(db=Depends(get_misc_db), auth=Depends(verify_token))
             'created_at': r.get('created_at').isoformat() if r.get('created_at') else None
         })
 
-    # registrations per day for last 7 days (simple trend)
-    days = []
-    for i in range(7):
-        d = now - timedelta(days=i)
-        start = datetime(d.year, d.month, d.day)
-        end = start + timedelta(days=1)
-        count = await db.registrations.count_documents({'created_at': {'$gte': start, '$lt': end}})
-        days.append({'date': start.isoformat(), 'count': count})
-
     return {
-        'total_registrations': total_regs,
-        'registrations_last_7_days': recent_cnt,
-        'registrations_without_picture': no_picture,
+        'total_registrations': metrics['total'],
+        'registrations_last_7_days': metrics['last_7_days'],
+        'registrations_without_picture': metrics['no_picture'],
         'positions_count': positions_count,
-        'registrations_by_position': by_position,
+        'registrations_by_position': metrics['by_position'],
         'recent_registrations': recent_regs,
-        'daily_trend_last_7_days': list(reversed(days))  # oldest first
+        'daily_trend_last_7_days': metrics['trend'][-7:],  # oldest first
+        'trend_days': days,
+        'daily_trend': metrics['trend'],
     }
+
+
+@router.get('/metrics/cache')
+async def get_cache_metrics(auth=Depends(verify_token)):
+    # Read-cache hit/miss counters for this worker process
+    return cache_stats()
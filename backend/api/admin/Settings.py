@@ -5,6 +5,7 @@ from pydantic import BaseModel
 from passlib.context import CryptContext
 from typing import Optional
 from backend.config.database.init import get_misc_db
+from backend.utils.cache import invalidates
 from datetime import datetime
 from backend.middleware.auth.token import verify_token
 
@@ -90,6 +91,7 @@ async def get_registrations_status(db=Depends(get_misc_db), auth=Depends(verify_
 
 
 @router.post('/registrations/status')
+@invalidates("settings")
 async def set_registrations_status(payload: RegistrationStatus, db=Depends(get_misc_db), auth=Depends(verify_token)):
     await db.settings.update_one({'_id': 'registrations'}, {'$set': {'open': bool(payload.open), 'updated_at': datetime.utcnow()}}, upsert=True)
     return {'open': bool(payload.open)}
@@ -109,6 +111,7 @@ async def get_registrations_spreadsheet(db=Depends(get_misc_db), auth=Depends(ve
 
 
 @router.post('/registrations/spreadsheet')
+@invalidates("settings")
 async def set_registrations_spreadsheet(payload: SpreadsheetPayload = Body(...), db=Depends(get_misc_db), auth=Depends(verify_token)):
     # extract id if url provided
     sid = payload.spreadsheet_id
@@ -138,6 +141,7 @@ async def get_delegations_status(db=Depends(get_misc_db), auth=Depends(verify_to
 
 
 @router.post('/delegations/status')
+@invalidates("settings")
 async def set_delegations_status(payload: RegistrationStatus = Body(...), db=Depends(get_misc_db), auth=Depends(verify_token)):
     await db.settings.update_one({'_id': 'delegations'}, {'$set': {'open': bool(payload.open), 'updated_at': datetime.utcnow()}}, upsert=True)
     return {'open': bool(payload.open)}
@@ -151,6 +155,7 @@ async def get_blog_submission_status(db=Depends(get_misc_db), auth=Depends(verif
 
 
 @router.post('/blog-submissions/status')
+@invalidates("settings")
 async def set_blog_submission_status(payload: RegistrationStatus, db=Depends(get_misc_db), auth=Depends(verify_token)):
     await db.settings.update_one({'_id': 'blog_submissions'}, {'$set': {'open': bool(payload.open), 'updated_at': datetime.utcnow()}}, upsert=True)
     return {'open': bool(payload.open)}
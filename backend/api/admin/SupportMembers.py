@@ -1,10 +1,8 @@
 """Taakra - Admin-only API to add support members (as admins) with invitation email."""
 import os
 import secrets
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader
 
 from fastapi import APIRouter, HTTPException, Depends, Form
 from fastapi import status
@@ -15,6 +13,8 @@ from typing import List, Optional
 from backend.config.database.init import get_misc_db
 from backend.middleware.auth.token import verify_token, pwd_context
 from backend.api.admin.Me import ALL_PERMISSIONS
+from backend.utils.mailer import enqueue_email
+from backend.utils.email_templates import render_email
 
 router = APIRouter(prefix="/support-members", tags=["admin-support-members"])
 
@@ -32,36 +32,24 @@ def _parse_permissions(permissions_str: Optional[str]) -> List[str]:
 
 def _send_invitation_email(to_email: str, name: str, email: str, password: str, login_url: str) -> None:
     """Send invitation email with login credentials."""
-    template_dir = os.path.join(os.path.dirname(__file__), "../../templates")
-    env = Environment(loader=FileSystemLoader(template_dir))
-    template = env.get_template("support_member_invitation.html")
     year = datetime.utcnow().year
-    html = template.render(
+    html = render_email(
+        "support_member_invitation.html",
         name=name,
         email=email,
         password=password,
         login_url=login_url,
         year=year,
     )
-    smtp_server = os.getenv("SMTP_SERVER", "smtp.gmail.com")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
     smtp_user = os.getenv("ADMIN_EMAIL", "contact@taakra2026.com")
-    smtp_password = os.getenv("ADMIN_EMAIL_PASSWORD", "")
     msg = MIMEMultipart()
     msg["From"] = smtp_user
     msg["To"] = to_email
     msg["Subject"] = "Taakra 2026 – Admin Portal Invitation"
     msg.attach(MIMEText(html, "html"))
-    try:
-        with smtplib.SMTP(smtp_server, smtp_port) as server:
-            server.starttls()
-            if smtp_password:
-                server.login(smtp_user, smtp_password)
-            server.sendmail(smtp_user, to_email, msg.as_string())
-    except Exception as e:
-        # Log but don't fail the request; admin can resend or share credentials manually
-        import logging
-        logging.getLogger(__name__).exception("Failed to send support member invitation email: %s", e)
+    # Queued, not sent inline; a failed delivery is logged and dead-lettered by the mailer,
+    # the admin can resend or share credentials manually
+    enqueue_email(msg)
 
 
 def support_member_helper(doc) -> dict:
@@ -0,0 +1,246 @@
+"""
+Declarative index registry for the blog, event and misc MongoDB databases.
+
+INDEXES maps database -> collection -> list of pymongo IndexModel. They are
+applied idempotently at startup by init_db (create_indexes is a no-op for an
+index that already exists with the same spec) and the result is printed as a
+report of missing and unused indexes.
+
+Run the report on its own with:
+    python -m backend.config.database.indexes
+"""
+import asyncio
+import logging
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# OTP documents are checked against created_at by the handlers (60s - 5 min);
+# the TTL only has to be longer than the longest window so Mongo cleans up.
+OTP_TTL_SECONDS = 10 * 60
+PASSWORD_RESET_TTL_SECONDS = 2 * 60 * 60
+# Undeliverable mail is kept long enough to investigate an SMTP outage.
+DEAD_LETTER_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+def _ttl(field: str, seconds: int, name: str) -> IndexModel:
+    return IndexModel([(field, ASCENDING)], name=name, expireAfterSeconds=seconds)
+
+
+# List endpoints page on (created_at, _id) (backend/utils/pagination.py), so
+# their sort indexes carry _id as the tie-breaker.
+INDEXES = {
+    "blog": {
+        "blogs": [
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+        ],
+        "blog_comments": [
+            IndexModel([("post_id", ASCENDING), ("approved", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="post_approved_created_id"),
+        ],
+        "blog_submissions": [
+            IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="status_created_id"),
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+        ],
+    },
+    "event": {
+        "events": [
+            IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+            IndexModel([("date", ASCENDING)], name="date"),
+            IndexModel([("category_id", ASCENDING)], name="category_id"),
+        ],
+        "event_registrations": [
+            IndexModel([("event_id", ASCENDING), ("team_name", ASCENDING)], name="event_team"),
+            IndexModel([("event_id", ASCENDING), ("members.email", ASCENDING)], name="event_member_email"),
+            IndexModel([("event_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="event_created_id"),
+            IndexModel([("members.email", ASCENDING), ("created_at", DESCENDING)], name="member_email_created"),
+        ],
+        "categories": [
+            IndexModel([("slug", ASCENDING)], name="slug"),
+            IndexModel([("order", ASCENDING), ("name", ASCENDING)], name="order_name"),
+        ],
+    },
+    "misc": {
+        "otps": [
+            IndexModel([("email", ASCENDING)], name="email"),
+            _ttl("created_at", OTP_TTL_SECONDS, "created_at_ttl"),
+        ],
+        "member_otps": [
+            IndexModel([("email", ASCENDING)], name="email"),
+            _ttl("created_at", OTP_TTL_SECONDS, "created_at_ttl"),
+        ],
+        "blog_admin_otps": [
+            _ttl("created_at", OTP_TTL_SECONDS, "created_at_ttl"),
+        ],
+        "cogent_labs_otps": [
+            _ttl("created_at", OTP_TTL_SECONDS, "created_at_ttl"),
+        ],
+        "member_password_resets": [
+            IndexModel([("token", ASCENDING)], name="token"),
+            IndexModel([("email", ASCENDING)], name="email"),
+            _ttl("created_at", PASSWORD_RESET_TTL_SECONDS, "created_at_ttl"),
+        ],
+        # Verification documents carry their own expires_at: expire exactly then.
+        "registration_verifications": [
+            IndexModel([("email", ASCENDING), ("created_at", DESCENDING)], name="email_created"),
+            _ttl("expires_at", 0, "expires_at_ttl"),
+        ],
+        "blog_comment_verifications": [
+            IndexModel([("email", ASCENDING), ("token", ASCENDING)], name="email_token"),
+            _ttl("expires_at", 0, "expires_at_ttl"),
+        ],
+        "blog_submission_verifications": [
+            IndexModel([("token", ASCENDING)], name="token"),
+            IndexModel([("email", ASCENDING), ("token", ASCENDING)], name="email_token"),
+            _ttl("expires_at", 0, "expires_at_ttl"),
+        ],
+        "blog_likes": [
+            IndexModel([("post_id", ASCENDING), ("identifier", ASCENDING)], name="post_identifier"),
+        ],
+        "registrations": [
+            IndexModel([("email", ASCENDING)], name="email"),
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+            IndexModel([("position_applied", ASCENDING)], name="position_applied"),
+        ],
+        "members": [
+            IndexModel([("email", ASCENDING)], name="email"),
+            IndexModel([("tenure", ASCENDING)], name="tenure"),
+            IndexModel([("member_type", ASCENDING)], name="member_type"),
+        ],
+        "admin": [
+            IndexModel([("username", ASCENDING)], name="username"),
+            IndexModel([("email", ASCENDING)], name="email"),
+            IndexModel([("role", ASCENDING), ("created_at", DESCENDING)], name="role_created"),
+        ],
+        "subscribers": [
+            IndexModel([("email", ASCENDING)], name="email"),
+        ],
+        "positions": [
+            IndexModel([("name", ASCENDING)], name="name"),
+            IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+        ],
+        "faqs": [
+            IndexModel([("is_active", ASCENDING), ("order", ASCENDING)], name="active_order"),
+            IndexModel([("order", ASCENDING), ("created_at", DESCENDING)], name="order_created"),
+        ],
+        "banners": [
+            IndexModel([("id", ASCENDING)], name="id"),
+            IndexModel([("is_active", ASCENDING)], name="is_active"),
+            IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+        ],
+        "content": [
+            IndexModel([("id", ASCENDING)], name="id"),
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+        ],
+        "jobs": [
+            IndexModel([("id", ASCENDING)], name="id"),
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+        ],
+        "contact_messages": [
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+        ],
+        "achievements": [
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+        ],
+        "delegations": [
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+        ],
+        "email_campaigns": [
+            IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease"),
+            IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+        ],
+        "email_campaign_recipients": [
+            IndexModel([("campaign_id", ASCENDING), ("email", ASCENDING)], name="campaign_email", unique=True),
+            IndexModel([("campaign_id", ASCENDING), ("status", ASCENDING)], name="campaign_status"),
+        ],
+        "cogent_labs_registrations": [
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+        ],
+        "email_dead_letters": [
+            _ttl("created_at", DEAD_LETTER_TTL_SECONDS, "created_at_ttl"),
+        ],
+    },
+}
+
+
+async def ensure_indexes(dbs: dict) -> dict:
+    """Create every registered index. dbs maps "blog"/"event"/"misc" to a Motor database.
+
+    Returns {"created": [...], "failed": [...]} with "db.collection.index" names.
+    Failures (e.g. an existing index with the same keys but other options) are
+    logged and do not stop startup.
+    """
+    result = {"created": [], "failed": []}
+    for db_key, collections in INDEXES.items():
+        db = dbs.get(db_key)
+        if db is None:
+            continue
+        for collection, models in collections.items():
+            try:
+                names = await db[collection].create_indexes(models)
+                result["created"].extend(f"{db_key}.{collection}.{n}" for n in names)
+            except OperationFailure as e:
+                # Fall back to one-by-one so a single conflict doesn't skip the rest.
+                for model in models:
+                    name = model.document["name"]
+                    try:
+                        await db[collection].create_indexes([model])
+                        result["created"].append(f"{db_key}.{collection}.{name}")
+                    except OperationFailure as inner:
+                        logger.warning(f"Index {db_key}.{collection}.{name} not created: {inner}")
+                        result["failed"].append(f"{db_key}.{collection}.{name}")
+    return result
+
+
+async def index_report(dbs: dict) -> dict:
+    """Compare registered indexes with what the databases actually have.
+
+    - missing: registered but not present on the collection
+    - unmanaged: present on the collection but not in the registry
+    - unused: present with zero accesses in $indexStats since the server started
+    """
+    report = {"missing": [], "unmanaged": [], "unused": []}
+    for db_key, collections in INDEXES.items():
+        db = dbs.get(db_key)
+        if db is None:
+            continue
+        for collection, models in collections.items():
+            expected = {m.document["name"] for m in models}
+            try:
+                existing = set((await db[collection].index_information()).keys())
+            except OperationFailure:
+                existing = set()
+            existing.discard("_id_")
+            report["missing"].extend(f"{db_key}.{collection}.{n}" for n in sorted(expected - existing))
+            report["unmanaged"].extend(f"{db_key}.{collection}.{n}" for n in sorted(existing - expected))
+            try:
+                async for stat in db[collection].aggregate([{"$indexStats": {}}]):
+                    if stat["name"] != "_id_" and stat.get("accesses", {}).get("ops", 0) == 0:
+                        report["unused"].append(f"{db_key}.{collection}.{stat['name']}")
+            except OperationFailure:
+                # $indexStats needs clusterMonitor-like privileges on some hosted tiers
+                pass
+    return report
+
+
+def print_index_report(report: dict) -> None:
+    for label, key in (("Missing", "missing"), ("Unmanaged", "unmanaged"), ("Unused since server start", "unused")):
+        names = report.get(key, [])
+        if names:
+            print(f"⚠️ {label} indexes ({len(names)}):")
+            for name in names:
+                print(f"   - {name}")
+    if not any(report.get(k) for k in ("missing", "unmanaged", "unused")):
+        print("✅ All registered MongoDB indexes present")
+
+
+async def _main():
+    from backend.config.database import init
+
+    await init.init_db()
+    print_index_report(await index_report({"blog": init.blogDB, "event": init.eventDB, "misc": init.miscDB}))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,6 +1,7 @@
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
+from backend.config.database.indexes import ensure_indexes, index_report, print_index_report
 load_dotenv()
 
 def get_misc_db():
@@ -69,30 +70,70 @@ blogDB = None
 eventDB = None
 miscDB = None
 
+# Connection pool settings (per worker process). All three databases usually live
+# on the same cluster, so clients are shared by URI: one pool and one set of
+# monitoring threads per cluster instead of one per database.
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")  # e.g. "zstd,snappy,zlib"
+MONGO_ZLIB_COMPRESSION_LEVEL = os.getenv("MONGO_ZLIB_COMPRESSION_LEVEL")
+
+_clients = {}
+
+
+def _client_options() -> dict:
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+        if MONGO_ZLIB_COMPRESSION_LEVEL:
+            options["zlibCompressionLevel"] = int(MONGO_ZLIB_COMPRESSION_LEVEL)
+    return options
+
+
+def get_client(uri: str) -> AsyncIOMotorClient:
+    """Return the shared client for a URI, creating it on first use."""
+    client = _clients.get(uri)
+    if client is None:
+        client = AsyncIOMotorClient(uri, **_client_options())
+        _clients[uri] = client
+    return client
+
+
 async def  init_db():
     """Initialize all MongoDB connections once."""
     global blogDB, eventDB, miscDB
-    print(BLOGS_MONGO_DB_URI)
     print(BLOGS_MONGO_DB_NAME)
-    print(EVENTS_MONGO_DB_URI)
     print(EVENTS_MONGO_DB_NAME)
-    print(MISC_MONGO_DB_URI)
     print(MISC_MONGO_DB_NAME)
 
-    blog_client = AsyncIOMotorClient(BLOGS_MONGO_DB_URI)
-    blogDB = blog_client[BLOGS_MONGO_DB_NAME]
-
-    event_client = AsyncIOMotorClient(EVENTS_MONGO_DB_URI)
-    eventDB = event_client[EVENTS_MONGO_DB_NAME]
+    blogDB = get_client(BLOGS_MONGO_DB_URI)[BLOGS_MONGO_DB_NAME]
+    eventDB = get_client(EVENTS_MONGO_DB_URI)[EVENTS_MONGO_DB_NAME]
+    miscDB = get_client(MISC_MONGO_DB_URI)[MISC_MONGO_DB_NAME]
 
-    misc_client = AsyncIOMotorClient(MISC_MONGO_DB_URI)
-    miscDB = misc_client[MISC_MONGO_DB_NAME]
-    print(blogDB)
-    print(eventDB)
-    print(miscDB)
-
-    print("✅ MongoDB connections initialized")
+    # Warm the pools: the first ping runs server selection and opens a connection
+    # (minPoolSize more are opened in the background), so the first request doesn't pay for it.
+    for client in _clients.values():
+        await client.admin.command("ping")
 
+    print(f"✅ MongoDB connections initialized ({len(_clients)} client(s), maxPoolSize={MONGO_MAX_POOL_SIZE})")
 
+    if os.getenv("MONGO_ENSURE_INDEXES", "true").lower() != "false":
+        dbs = {"blog": blogDB, "event": eventDB, "misc": miscDB}
+        result = await ensure_indexes(dbs)
+        print(f"✅ MongoDB indexes ensured ({len(result['created'])} ok, {len(result['failed'])} failed)")
+        print_index_report(await index_report(dbs))
 
 
+async def close_db():
+    """Close every shared client (called from the shutdown hook)."""
+    global blogDB, eventDB, miscDB
+    for client in _clients.values():
+        client.close()
+    _clients.clear()
+    blogDB = eventDB = miscDB = None
+    print("🛑 MongoDB clients closed")
@@ -1,8 +1,15 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-# Define global limiter
+from backend.config.shared_state import RATE_LIMIT_STRATEGY, SHARED_STATE_URL
+
+# Define global limiter. Counters live in the shared-state backend, so with a
+# Redis URL a "2/day" limit holds across all gunicorn workers; if Redis is
+# unreachable the limiter falls back to per-worker memory instead of failing.
 _limiter = Limiter(
     key_func=get_remote_address,
     default_limits=["100/hour"],  # global default
+    storage_uri=SHARED_STATE_URL,
+    strategy=RATE_LIMIT_STRATEGY,
+    in_memory_fallback_enabled=not SHARED_STATE_URL.startswith("memory://"),
 )
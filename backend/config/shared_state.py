@@ -0,0 +1,125 @@
+"""
+Shared state for the gunicorn workers, selected by SHARED_STATE_URL:
+
+    memory://               default; state is per worker process
+    redis://host:6379/0     any Redis-protocol server (Redis, Valkey, KeyDB or a
+    rediss://...            local stand-in); state is shared by all workers
+
+The rate limiter (config/limiter.py) hands the URL to slowapi/limits, which
+keeps its counters there with atomic operations and the RATE_LIMIT_STRATEGY
+algorithm (default sliding-window-counter). The read cache
+(utils/cache.py) stores its entries and namespace versions through
+get_backend().
+
+The Redis backend needs the redis package (pip install redis).
+"""
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+try:
+    import redis.asyncio as aioredis
+except Exception:
+    # If the package is not installed, the Redis backend raises on use.
+    aioredis = None
+
+SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "memory://")
+RATE_LIMIT_STRATEGY = os.getenv("RATE_LIMIT_STRATEGY", "sliding-window-counter")
+MEMORY_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+
+class MemoryBackend:
+    """Process-local backend: an LRU-bounded dict with per-key expiry. Values are stored as-is."""
+    shared = False
+
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._counters: dict = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return entry[1]
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def delete_prefix(self, prefix: str):
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+    def keys(self):
+        return list(self._data)
+
+    async def close(self):
+        self._data.clear()
+
+
+class RedisBackend:
+    """Redis-protocol backend. Values are bytes; callers serialize."""
+    shared = True
+
+    def __init__(self, url: str):
+        if aioredis is None:
+            raise RuntimeError("SHARED_STATE_URL is a Redis URL but the redis package is not installed")
+        self.url = url
+        self._client = aioredis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def counter(self, key: str) -> int:
+        return int(await self._client.get(key) or 0)
+
+    async def delete_prefix(self, prefix: str):
+        # Entries are keyed by namespace version and expire on their own
+        return None
+
+    def keys(self):
+        return None
+
+    async def close(self):
+        await self._client.aclose()
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if SHARED_STATE_URL.startswith(("redis://", "rediss://")):
+            _backend = RedisBackend(SHARED_STATE_URL)
+        else:
+            _backend = MemoryBackend()
+    return _backend
+
+
+async def close_backend():
+    global _backend
+    if _backend is not None:
+        await _backend.close()
+        _backend = None
@@ -11,11 +11,11 @@ import datetime
 from dotenv import load_dotenv
 import user_agents
 from pathlib import Path
-import smtplib
-from jinja2 import Template
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from backend.config.limiter import _limiter as limiter
+from backend.utils.mailer import enqueue_email
+from backend.utils.email_templates import has_template, render_email
 
 from fastapi import Depends
 load_dotenv()
@@ -33,8 +33,6 @@ import user_agents
 from pathlib import Path
 import os
 from backend.Schemas.OTP import OTPAdmin
-import smtplib
-from jinja2 import Template
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
@@ -72,30 +70,25 @@ router = APIRouter()
 async def send_otp_email(otp: str, recipient_email: str, ip_address: str, device_info: str, template_type: str = "admin"):
     print("OTP Email sending")
     sender_email = os.getenv("ADMIN_EMAIL")
-    app_password = os.getenv("ADMIN_EMAIL_PASSWORD")
     receiver_email = recipient_email
 
     # Choose template based on type
-    # Use __file__ to get the correct path relative to this file
-    # File is at: backend/middleware/auth/otp.py
-    # Need to go up 3 levels to get to backend/, then into templates/
-    base_path = Path(__file__).parent.parent.parent
     if template_type == "comment":
-        template_path = base_path / "templates" / "otp_comment_template.html"
+        template_name = "otp_comment_template.html"
         subject = "Your Comment Verification Code - Taakra 2026"
         expiry_time = "5 minutes"
     elif template_type == "blog_submission":
-        template_path = base_path / "templates" / "otp_blog_submission_template.html"
+        template_name = "otp_blog_submission_template.html"
         subject = "Blog Submission Verification Code - Taakra 2026"
         expiry_time = "5 minutes"
     else:  # admin
-        template_path = base_path / "templates" / "otp_admin_template.html"
+        template_name = "otp_admin_template.html"
         subject = "Your OTP Verification Code - Taakra 2026"
         expiry_time = "1 minute"
     
-    if not template_path.exists():
+    if not has_template(template_name):
         # Fallback to a simple template if file not found
-        print(f"[WARNING] Template not found at: {template_path.absolute()}")
+        print(f"[WARNING] Template not found: {template_name}")
         html_content = f"""
         <html>
         <body>
@@ -109,15 +102,9 @@ async def send_otp_email(otp: str, recipient_email: str, ip_address: str, device
         </html>
         """
     else:
-        print(f"[INFO] Loading template from: {template_path.absolute()}")
-        with open(template_path, 'r') as file:
-            template_content = file.read()
-        
-        # Create Jinja2 template
-        template = Template(template_content)
-        
-        # Render template with variables
-        html_content = template.render(
+        # Render the cached template with variables
+        html_content = render_email(
+            template_name,
             otp=otp,
             timestamp=datetime.datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
             ip_address=ip_address,
@@ -158,15 +145,10 @@ async def send_otp_email(otp: str, recipient_email: str, ip_address: str, device
     msg.attach(part1)
     msg.attach(part2)
 
-    try:
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
-            server.login(sender_email, app_password)
-            server.sendmail(sender_email, receiver_email, msg.as_string())
-        print("OTP Email sent successfully!")
-        return True
-    except Exception as e:
-        print("Error sending OTP email:", e)
-        return False
+    # Delivered by the background mail queue
+    queued = enqueue_email(msg)
+    print("OTP Email queued" if queued else "Error queueing OTP email")
+    return queued
 
 
 
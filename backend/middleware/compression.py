@@ -0,0 +1,230 @@
+"""
+Response compression with Brotli and gzip.
+
+The encoding is negotiated from Accept-Encoding (br preferred when the
+brotli package is installed, then gzip). Compressed are:
+
+- responses whose content type is text-like (JSON, NDJSON, CSV, HTML, ...)
+- single-body responses of at least COMPRESSION_MIN_SIZE bytes; streamed
+  responses (StreamingResponse, e.g. the CSV/NDJSON exports) are compressed
+  chunk by chunk and flushed per chunk, so they keep streaming
+
+Left alone are images, PDFs, xlsx/parquet/arrow and other binary types,
+responses that already carry a Content-Encoding, and 204/304s. The level
+follows the content type (COMPRESSION_LEVELS): small API JSON gets a higher
+level, bulk exports a faster one.
+
+A compressed response's ETag is made weak (the bytes differ from the
+identity body it was computed from), and Vary: Accept-Encoding is added.
+
+Settings (env):
+    COMPRESSION_MIN_SIZE    bytes, default 1024
+
+Benchmark (bytes and time per encoder on API-shaped payloads):
+    python -m backend.middleware.compression
+"""
+import os
+import re
+import zlib
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    # Without the package only gzip is offered.
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# content type -> (brotli quality, gzip level)
+COMPRESSION_LEVELS: Dict[str, Tuple[int, int]] = {
+    "application/json": (5, 6),
+    "text/html": (5, 6),
+    "text/plain": (5, 6),
+    "text/csv": (4, 5),
+    "application/x-ndjson": (4, 5),
+}
+DEFAULT_LEVELS = (4, 6)
+
+_COMPRESSIBLE = re.compile(r"^(text/|application/(json|x-ndjson|javascript|xml)|image/svg\+xml)")
+
+
+def _accepted(accept_encoding: str) -> Optional[str]:
+    """br or gzip if the client accepts it (q > 0), else None."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    for encoding in (("br",) if brotli is not None else ()) + ("gzip",):
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class _Encoder:
+    def __init__(self, encoding: str, content_type: str):
+        quality, level = COMPRESSION_LEVELS.get(content_type, DEFAULT_LEVELS)
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=quality)
+        else:
+            self._gz = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._br.process(data)
+            return out + self._br.flush() if flush else out
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        encoding = _accepted(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        encoder: Optional[_Encoder] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, encoder, passthrough
+            if passthrough:
+                return await send(message)
+            if message["type"] == "http.response.start":
+                response_headers = {k.lower(): v for k, v in message["headers"]}
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1").split(";")[0].strip().lower()
+                if (
+                    message["status"] in (204, 304)
+                    or b"content-encoding" in response_headers
+                    or not _COMPRESSIBLE.match(content_type)
+                ):
+                    passthrough = True
+                    return await send(message)
+                start = message
+                encoder = _Encoder(encoding, content_type)
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+            if start is not None:
+                first, start = start, None
+                if not more and len(body) < self.min_size:
+                    passthrough = True
+                    await send(first)
+                    return await send(message)
+                await send({**first, "headers": self._headers(first["headers"], encoding)})
+            if more:
+                data = encoder.compress(body, flush=True)
+                if data:
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+                return
+            await send({"type": "http.response.body", "body": encoder.finish(body), "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _headers(raw, encoding: str):
+        headers = []
+        vary = None
+        for key, value in raw:
+            lower = key.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            if lower == b"vary":
+                vary = value
+                continue
+            headers.append((key, value))
+        if vary is None:
+            vary = b"Accept-Encoding"
+        elif b"accept-encoding" not in vary.lower():
+            vary += b", Accept-Encoding"
+        headers += [(b"content-encoding", encoding.encode()), (b"vary", vary)]
+        return headers
+
+
+def _benchmark(iterations: int = 20):
+    import csv
+    import io
+    import json
+    import random
+    import time
+    from datetime import datetime
+
+    # Seeded random prose so payloads compress like real posts, not like one repeated sentence
+    rng = random.Random(0)
+    vocabulary = (
+        "taakra students campus coding design robotics team event society members workshop hackathon "
+        "python react mongodb cloud deploy api frontend backend mentor project competition prize week "
+        "learn build share community lahore pucit faculty developers data model network security game"
+    ).split()
+
+    def text(words: int) -> str:
+        return " ".join(rng.choice(vocabulary) for _ in range(words))
+
+    now = datetime(2026, 1, 1).isoformat()
+    payloads = {
+        "blog list with bodies (50 posts)": json.dumps([
+            {"id": f"{i:024x}", "title": f"Post {i}", "excerpt": text(25), "content": "".join(f"<p>{text(80)}</p>" for _ in range(15)),
+             "author": "FDC", "read_time": "6 min read", "word_count": 1200, "likes": i, "created_at": now, "updated_at": now}
+            for i in range(50)
+        ]).encode(),
+        "team members with projects (80)": json.dumps([
+            {"id": f"{i:024x}", "name": f"Member {i}", "role": "Developer", "member_type": "team", "tenure": ["2025-2026"],
+             "bio": text(50), "skills": ["Python", "React", "MongoDB"],
+             "projects": [{"title": f"Project {j}", "description": text(30), "link": "https://github.com/fdc"} for j in range(3)],
+             "experience": [{"company": "FDC", "role": "Lead", "duration": "2024-2025"}], "created_at": now, "updated_at": now}
+            for i in range(80)
+        ]).encode(),
+        "event registrations (300 teams)": json.dumps([
+            {"team_name": f"Team {i}", "members": [{"name": f"Student {i}-{j}", "email": f"s{i}{j}@pucit.edu.pk", "phone": "03001234567"} for j in range(3)],
+             "modules": ["Speed Programming"], "payment_status": "pending", "transaction_id": f"TX{i:08d}",
+             "payment_receipt_url": f"https://res.cloudinary.com/fdc/image/upload/receipt_{i}.jpg", "discount_codes_used": []}
+            for i in range(300)
+        ]).encode(),
+    }
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(["id", "name", "email", "phone", "batch", "campus", "why_join", "created_at"])
+    for i in range(5000):
+        writer.writerow([f"{i:024x}", f"Student {i}", f"s{i}@pucit.edu.pk", "03001234567", "F22", "New Campus", text(20), now])
+    payloads["registrations CSV export (5000 rows)"] = out.getvalue().encode()
+
+    content_types = {"registrations CSV export (5000 rows)": "text/csv"}
+    for name, body in payloads.items():
+        content_type = content_types.get(name, "application/json")
+        print(f"{name}: {len(body):,} bytes")
+        for encoding in (["br"] if brotli is not None else []) + ["gzip"]:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                size = len(_Encoder(encoding, content_type).finish(body))
+            elapsed = (time.perf_counter() - start) / iterations
+            print(f"  {encoding:5} {size:>10,} bytes ({size / len(body):6.1%})  {elapsed * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,137 @@
+"""
+Conditional GET for the public JSON endpoints.
+
+For GET requests on the routes in CACHE_POLICIES the response body is hashed
+into a strong ETag and the route's Cache-Control policy is added. A request
+whose If-None-Match matches gets 304 Not Modified with no body, so browsers
+and the Vercel edge revalidate instead of downloading the same JSON again.
+
+The ETag is a hash of the body rather than the read cache's namespace
+version (backend/utils/cache.py): with the default memory:// backend each
+gunicorn worker has its own versions, so only the body gives validators that
+agree across workers and never go stale. Handler cost on a revalidation is
+small anyway since these routes are served from the read cache.
+
+Only 200 responses without Set-Cookie or Content-Encoding are tagged;
+requests carrying credentials get "private, no-cache" instead of the
+public policy: an Authorization header, or an adminAuthToken/masterAuthToken
+header or cookie (see backend/middleware/auth/token.py). Bodies larger than HTTP_CACHE_MAX_BODY bytes are passed
+through untouched.
+"""
+import hashlib
+import os
+import re
+from typing import List, Optional, Tuple
+
+HTTP_CACHE_MAX_BODY = int(os.getenv("HTTP_CACHE_MAX_BODY", str(4 * 1024 * 1024)))
+
+SHORT = "public, max-age=60, stale-while-revalidate=600"
+LONG = "public, max-age=300, stale-while-revalidate=3600"
+FLAGS = "public, max-age=30, stale-while-revalidate=60"
+
+# Request headers, and cookie names, that mark a request as authenticated
+AUTH_HEADERS = (b"authorization", b"adminauthtoken", b"masterauthtoken")
+AUTH_COOKIES = ("adminAuthToken", "masterAuthToken")
+
+# (path regex, Cache-Control), first full match wins
+CACHE_POLICIES: List[Tuple[str, str]] = [
+    (r"/api/posts(/summaries)?", SHORT),
+    (r"/api/posts/[^/]+", SHORT),
+    (r"/api/posts/[^/]+/comments", SHORT),
+    (r"/api/events", SHORT),
+    (r"/api/competitions(/calendar)?", SHORT),
+    (r"/api/competitions/[^/]+", SHORT),
+    (r"/api/(members|team-members|advisors)/", LONG),
+    (r"/api/members/tenures/", LONG),
+    (r"/api/members/[^/]+", LONG),
+    (r"/api/(faq|banner|content|categories|achievements|positions|contact|about)", LONG),
+    (r"/api/(content|achievements)/[^/]+", LONG),
+    (r"/api/(registrations|submissions|delegation|register)/status", FLAGS),
+]
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _has_credentials(request_headers: dict) -> bool:
+    if any(name in request_headers for name in AUTH_HEADERS):
+        return True
+    cookie = request_headers.get(b"cookie", b"").decode("latin-1")
+    names = {part.split("=", 1)[0].strip() for part in cookie.split(";")}
+    return any(name in names for name in AUTH_COOKIES)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class HTTPCacheMiddleware:
+    def __init__(self, app, policies: Optional[List[Tuple[str, str]]] = None, max_body: int = HTTP_CACHE_MAX_BODY):
+        self.app = app
+        self.policies = [(re.compile(pattern), policy) for pattern, policy in (policies or CACHE_POLICIES)]
+        self.max_body = max_body
+
+    def _policy(self, path: str) -> Optional[str]:
+        for pattern, policy in self.policies:
+            if pattern.fullmatch(path):
+                return policy
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        policy = self._policy(scope["path"])
+        if policy is None:
+            return await self.app(scope, receive, send)
+
+        request_headers = dict(scope["headers"])
+        if_none_match = request_headers.get(b"if-none-match", b"").decode("latin-1")
+        if _has_credentials(request_headers):
+            policy = "private, no-cache"
+
+        start = None
+        chunks: List[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start, size, passthrough
+            if passthrough:
+                return await send(message)
+            if message["type"] == "http.response.start":
+                headers = {k.lower() for k, _ in message["headers"]}
+                if message["status"] != 200 or b"set-cookie" in headers or b"content-encoding" in headers:
+                    passthrough = True
+                    return await send(message)
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more = message.get("more_body", False)
+            if size > self.max_body:
+                # Too large to buffer: send what we have and stream the rest
+                passthrough = True
+                await send(start)
+                return await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": more})
+            if more:
+                return
+
+            body = b"".join(chunks)
+            etag = _etag(body)
+            headers = [(k, v) for k, v in start["headers"] if k.lower() not in (b"etag", b"cache-control")]
+            headers += [(b"etag", etag.encode()), (b"cache-control", policy.encode())]
+            if if_none_match and _matches(if_none_match, etag):
+                headers = [(k, v) for k, v in headers if k.lower() not in (b"content-length", b"content-type")]
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                return await send({"type": "http.response.body", "body": b""})
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -21,7 +21,18 @@ from email.mime.multipart import MIMEMultipart
 import random
 from pydantic import BaseModel, HttpUrl, Field
 from datetime import datetime
-from backend.config.database.init import init_db
+from backend.config.database.init import init_db, close_db, get_misc_db, get_blog_db
+from backend.utils.mailer import start_mailer, stop_mailer
+from backend.utils.campaigns import start_campaign_worker, stop_campaign_worker
+from backend.utils.email_templates import warm_templates
+from backend.utils.CloudinaryImageUploader import shutdown_image_pool
+from backend.utils.cloudinary_client import close_cloudinary_client
+from backend.utils.pagination import PAGE_HEADERS
+from backend.utils.blog_stats import backfill_word_counts
+from backend.utils.responses import MongoJSONResponse
+from backend.middleware.http_cache import HTTPCacheMiddleware
+from backend.middleware.compression import CompressionMiddleware
+from backend.config.shared_state import close_backend
 from fastapi.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
@@ -86,7 +97,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# orjson rendering with ObjectId/datetime support for every JSON response
+app = FastAPI(default_response_class=MongoJSONResponse)
 
 # Keep-alive scheduler to prevent Azure free tier from sleeping
 # scheduler = AsyncIOScheduler()
@@ -111,11 +123,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=PAGE_HEADERS,
 )
 
 
 app.state.limiter = limiter
 app.add_middleware(SlowAPIMiddleware)
+# ETag / Cache-Control and 304s for the public JSON routes
+app.add_middleware(HTTPCacheMiddleware)
+# br / gzip; added last so it is outermost and compresses the final body
+app.add_middleware(CompressionMiddleware)
 
 
 
@@ -242,11 +259,22 @@ from backend.api.admin.CogentLabsRegistrations import router as cogent_labs_regi
 app.include_router(cogent_labs_registrations_admin_router, prefix="/api/admin")
 from backend.api.admin.BlogComments import router as blog_comments_admin_router
 app.include_router(blog_comments_admin_router, prefix="/api/admin")
+from backend.api.admin.Campaigns import router as campaigns_admin_router
+app.include_router(campaigns_admin_router, prefix="/api/admin")
+from backend.api.admin.Exports import router as exports_admin_router
+app.include_router(exports_admin_router, prefix="/api/admin")
 from backend.api.Chatbot import router as chatbot_router
+from backend.AI.chatbot import shutdown_chat_pools
 app.include_router(chatbot_router, prefix="/api/chatbot", tags=["chatbot"])
 @app.on_event("startup")
 async def startup_db_client():
     await init_db()
+    await start_mailer()
+    await start_campaign_worker(get_misc_db())
+    print(f"✅ Compiled {warm_templates()} email templates")
+    backfilled = await backfill_word_counts(get_blog_db())
+    if backfilled:
+        print(f"✅ Stored word_count for {backfilled} blog posts")
     
     # Start the keep-alive scheduler
     # scheduler.add_job(
@@ -265,8 +293,14 @@ async def shutdown_db_client():
     # if scheduler.running:
         # scheduler.shutdown()
         # logger.info("🛑 Keep-alive scheduler stopped")
-    # Close connections if needed
+    await stop_campaign_worker()
+    await stop_mailer()
+    shutdown_image_pool()
+    shutdown_chat_pools()
+    await close_cloudinary_client()
+    await close_backend()
     print("🛑 Shutting down DB clients")
+    await close_db()
 import uvicorn
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -1,9 +1,8 @@
-import cloudinary
 import os
 import logging
 import secrets
 from fastapi import UploadFile, HTTPException, status
-import cloudinary.uploader
+from backend.utils import cloudinary_client
 
 logger = logging.getLogger(__name__)
 
@@ -14,21 +13,19 @@ async def save_uploaded_file(file: UploadFile, file_type: str = "resumes", cloud
     Expects environment variables like MISC_CLOUDINARY_CLOUD_NAME, MISC_CLOUDINARY_API_KEY, MISC_CLOUDINARY_API_SECRET
     """
     UPLOAD_PRESET = os.getenv('CLOUDINARY_UPLOAD_PRESET', '') or 'fdc-website'
-    cloudinary.config(
-        cloud_name=os.getenv(f"{cloudinary_type}_CLOUDINARY_CLOUD_NAME"),
-        api_key=os.getenv(f"{cloudinary_type}_CLOUDINARY_API_KEY"),
-        api_secret=os.getenv(f"{cloudinary_type}_CLOUDINARY_API_SECRET")
-    )
 
     try:
         if not file.filename:
             raise ValueError("No filename provided")
 
-        contents = await file.read()
-        if not contents:
+        # Size from the spooled upload itself; the body is streamed to Cloudinary, not read into memory
+        file.file.seek(0, os.SEEK_END)
+        size = file.file.tell()
+        file.file.seek(0)
+        if not size:
             raise ValueError("Empty file received")
         # 10MB limit for resumes by default
-        if len(contents) > 10 * 1024 * 1024:
+        if size > 10 * 1024 * 1024:
             raise ValueError("File exceeds 10MB size limit")
 
         # Accept only PDF resumes
@@ -36,21 +33,20 @@ async def save_uploaded_file(file: UploadFile, file_type: str = "resumes", cloud
         if file.content_type not in allowed:
             raise ValueError(f"Unsupported resume file type: {file.content_type}. Only PDF is allowed.")
 
-        # Upload as raw resource
-        # cloudinary.uploader.upload accepts file-like objects; pass bytes via temporary buffer
-        import io
-        buffer = io.BytesIO(contents)
-        buffer.seek(0)
-
         # Build a safe public_id from filename (without extension) + short random suffix
         orig_name = os.path.splitext(file.filename)[0]
         safe_base = ''.join(c for c in orig_name if c.isalnum() or c in ('-', '_'))[:80]
         unique_suffix = secrets.token_hex(4)
         public_id = f"{safe_base}_{unique_suffix}"
 
-        result = cloudinary.uploader.upload(
-            buffer,
+        # Upload as raw resource (signed, like cloudinary.uploader.upload)
+        result = await cloudinary_client.upload(
+            file.file,
+            account=cloudinary_type,
             resource_type='raw',
+            filename=file.filename,
+            content_type=file.content_type,
+            signed=True,
             folder=f"{file_type}",
             public_id=public_id,
             upload_preset=UPLOAD_PRESET
@@ -1,22 +1,149 @@
-import cloudinary
 import secrets
 import io
 import os
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 from fastapi import UploadFile, HTTPException, status
-from PIL import Image, UnidentifiedImageError
-import cloudinary.uploader
+from PIL import Image, UnidentifiedImageError, features
 import logging
+from backend.utils import cloudinary_client
 
 logger = logging.getLogger(__name__)
 
+# Pillow work runs in a bounded pool so a large upload never blocks the event loop.
+#   IMAGE_POOL          "thread" (default; Pillow releases the GIL while decoding/encoding) or "process"
+#   IMAGE_WORKERS       pool size (default: CPU count, at most 4)
+#   IMAGE_MAX_PENDING   images processing or waiting per worker process before uploads get 429 (default 2x workers)
+# Responsive variants (save_uploaded_image_with_variants):
+#   IMAGE_VARIANT_WIDTHS    comma-separated widths (default 320,640,1200)
+#   IMAGE_VARIANT_FORMATS   comma-separated formats (default webp,avif; avif is skipped if Pillow lacks it)
+IMAGE_POOL = os.getenv("IMAGE_POOL", "thread").lower()
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS") or min(4, os.cpu_count() or 1))
+IMAGE_MAX_PENDING = int(os.getenv("IMAGE_MAX_PENDING") or IMAGE_WORKERS * 2)
+IMAGE_MAX_SIZE = (1200, 800)
+IMAGE_VARIANT_WIDTHS = sorted({int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1200").split(",") if w.strip()})
+IMAGE_VARIANT_FORMATS = [
+    f for f in (x.strip().lower() for x in os.getenv("IMAGE_VARIANT_FORMATS", "webp,avif").split(","))
+    if f and features.check(f)
+]
+# Encoder settings per variant format (AVIF at speed 8 keeps encode time close to WebP)
+VARIANT_ENCODERS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "avif": {"format": "AVIF", "quality": 55, "speed": 8},
+}
+VARIANT_CONTENT_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+UPLOAD_PRESET = "fdc-website"
 
-async def save_uploaded_image(file: UploadFile, image_type: str = "misc",cloudinary_type:str="MISC") -> str:
-    UPLOAD_PRESET = "fdc-website"
-    cloudinary.config(
-    cloud_name=os.getenv(f"{cloudinary_type}_CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv(f"{cloudinary_type}_CLOUDINARY_API_KEY"),
-    api_secret=os.getenv(f"{cloudinary_type}_CLOUDINARY_API_SECRET")
+_pool: Optional[Executor] = None
+_pending = 0
+
+
+def _get_pool() -> Executor:
+    global _pool
+    if _pool is None:
+        if IMAGE_POOL == "process":
+            _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+        else:
+            _pool = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+    return _pool
+
+
+def shutdown_image_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _decode(contents: bytes) -> Image.Image:
+    """Decode once and downscale to fit IMAGE_MAX_SIZE."""
+    try:
+        with Image.open(io.BytesIO(contents)) as img:
+            # JPEG: let libjpeg decode at 1/2, 1/4 or 1/8 scale when the image is much larger
+            # than the target; other formats ignore the draft request.
+            img.draft("RGB", IMAGE_MAX_SIZE)
+            img.load()  # Full decode; raises on truncated or corrupt data (replaces verify())
+            if img.mode in ('RGBA', 'P'):
+                img = img.convert('RGB')
+            else:
+                img = img.copy()
+            img.thumbnail(IMAGE_MAX_SIZE)  # Resize while maintaining aspect ratio
+            return img
+
+    except UnidentifiedImageError:
+        raise ValueError("Invalid image file (cannot identify)")
+    except Exception as img_error:
+        raise ValueError(f"Image processing failed: {str(img_error)}")
+
+
+def _encode(img: Image.Image, **options) -> bytes:
+    try:
+        buffer = io.BytesIO()
+        img.save(buffer, **options)
+        return buffer.getvalue()
+    except Exception as img_error:
+        raise ValueError(f"Image processing failed: {str(img_error)}")
+
+
+def process_image(contents: bytes) -> bytes:
+    """Decode, downscale and re-encode as JPEG. Runs in the pool."""
+    return _encode(_decode(contents), format="JPEG", quality=85, optimize=True)
+
+
+def process_image_variants(contents: bytes) -> Tuple[bytes, Dict[str, Dict[int, bytes]]]:
+    """Like process_image, plus one encoded image per variant format and width. Runs in the pool.
+
+    Widths wider than the (downscaled) image are collapsed into a single
+    variant at the image's own width, so small images aren't upscaled.
+    """
+    img = _decode(contents)
+    jpeg = _encode(img, format="JPEG", quality=85, optimize=True)
+    widths = sorted({min(w, img.width) for w in IMAGE_VARIANT_WIDTHS})
+    resized = {
+        w: img if w == img.width else img.resize((w, max(1, round(img.height * w / img.width))), Image.LANCZOS)
+        for w in widths
+    }
+    variants = {
+        fmt: {w: _encode(resized[w], **VARIANT_ENCODERS[fmt]) for w in widths}
+        for fmt in IMAGE_VARIANT_FORMATS if fmt in VARIANT_ENCODERS
+    }
+    return jpeg, variants
+
+
+async def run_image_job(contents: bytes, job=process_image):
+    """Run an image job in the pool, or raise 429 if this worker already has too many in flight."""
+    global _pending
+    if _pending >= IMAGE_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many images are being processed, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_pool(), job, contents)
+    finally:
+        _pending -= 1
+
+
+async def _upload_bytes(data: bytes, filename: str, content_type: str, folder: str, cloudinary_type: str) -> str:
+    result = await cloudinary_client.upload(
+        data,
+        account=cloudinary_type,
+        filename=filename,
+        content_type=content_type,
+        upload_preset=UPLOAD_PRESET,
+        folder=folder
     )
+    image_url = result.get("secure_url")
+    if not image_url:
+        raise ValueError("Cloudinary upload returned no URL")
+    return image_url
+
+
+async def _save_image(file: UploadFile, image_type: str, cloudinary_type: str, with_variants: bool):
     """Validate, process, and upload an image to Cloudinary using unsigned upload."""
     try:
         logger.info(f"Processing {image_type} image upload: {file.filename}")   
@@ -37,39 +164,38 @@ async def save_uploaded_image(file: UploadFile, image_type: str = "misc",cloudin
         if file_ext not in ['jpg', 'jpeg', 'png', 'webp']:
             raise ValueError("Only JPG, PNG, or WEBP images are allowed")
 
-        # --- Step 2: Process image ---
-        try:
-            with Image.open(io.BytesIO(contents)) as img:
-                img.verify()  # Confirm it's a real image
-
-            with Image.open(io.BytesIO(contents)) as img:
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                img.thumbnail((1200, 800))  # Resize while maintaining aspect ratio
-
-                buffer = io.BytesIO()
-                img.save(buffer, format="JPEG", quality=85, optimize=True)
-                buffer.seek(0)
-
-        except UnidentifiedImageError:
-            raise ValueError("Invalid image file (cannot identify)")
-        except Exception as img_error:
-            raise ValueError(f"Image processing failed: {str(img_error)}")
+        # --- Step 2: Process image (off the event loop) ---
+        if with_variants:
+            processed, encoded = await run_image_job(contents, process_image_variants)
+        else:
+            processed, encoded = await run_image_job(contents), {}
 
         # --- Step 3: Upload to Cloudinary (unsigned) ---
-        result = cloudinary.uploader.unsigned_upload(
-            buffer,
-            upload_preset=UPLOAD_PRESET,
-            folder=f"{image_type}_images"
-        )
-
-        image_url = result.get("secure_url")
-        if not image_url:
-            raise ValueError("Cloudinary upload returned no URL")
-
+        base_name = os.path.splitext(file.filename)[0]
+        folder = f"{image_type}_images"
+        image_url = await _upload_bytes(processed, f"{base_name}.jpg", "image/jpeg", folder, cloudinary_type)
         logger.info(f"Successfully uploaded image to Cloudinary: {image_url}")
-        return image_url
 
+        image_variants = {}
+        if encoded:
+            jobs = [(fmt, width, data) for fmt, by_width in encoded.items() for width, data in by_width.items()]
+            results = await asyncio.gather(
+                *[
+                    _upload_bytes(data, f"{base_name}_{width}w.{fmt}", VARIANT_CONTENT_TYPES[fmt], f"{folder}/variants", cloudinary_type)
+                    for fmt, width, data in jobs
+                ],
+                return_exceptions=True,
+            )
+            # A failed variant only loses that size; the JPEG above is always the fallback.
+            for (fmt, width, _), result in zip(jobs, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Image variant {fmt} {width}w upload failed: {result}")
+                    continue
+                image_variants.setdefault(fmt, {})[str(width)] = result
+        return image_url, image_variants
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Image upload failed: {str(e)}")
         raise HTTPException(
@@ -77,4 +203,20 @@ async def save_uploaded_image(file: UploadFile, image_type: str = "misc",cloudin
             detail=f"Image validation failed: {str(e)}"
         )
     finally:
-        await file.close()
\ No newline at end of file
+        await file.close()
+
+
+async def save_uploaded_image(file: UploadFile, image_type: str = "misc",cloudinary_type:str="MISC") -> str:
+    """Validate, process, and upload an image to Cloudinary using unsigned upload."""
+    image_url, _ = await _save_image(file, image_type, cloudinary_type, with_variants=False)
+    return image_url
+
+
+async def save_uploaded_image_with_variants(file: UploadFile, image_type: str = "misc", cloudinary_type: str = "MISC") -> Tuple[str, Dict[str, Dict[str, str]]]:
+    """Like save_uploaded_image, and also upload responsive variants.
+
+    Returns (image_url, image_variants) where image_variants maps format ->
+    width -> URL, e.g. {"webp": {"320": url, "640": url, "1200": url}, "avif": {...}},
+    ready to build a srcset from. Store it on the document as `image_variants`.
+    """
+    return await _save_image(file, image_type, cloudinary_type, with_variants=True)
@@ -0,0 +1,34 @@
+"""
+Word count and read time for blog posts, computed when a post is written so
+list views (/posts/summaries) never need the post body.
+"""
+import re
+
+WORDS_PER_MINUTE = 200
+
+_TAG = re.compile(r"<[^>]+>")
+_WORD = re.compile(r"\w+(?:['’-]\w+)*")
+
+
+def word_count(content: str) -> int:
+    """Words in a post body; HTML tags (the editor stores HTML) are not counted."""
+    return len(_WORD.findall(_TAG.sub(" ", content or "")))
+
+
+def estimate_read_time(words: int) -> str:
+    return f"{max(1, round(words / WORDS_PER_MINUTE))} min read"
+
+
+def post_stats(content: str, read_time: str = "") -> dict:
+    """word_count plus read_time, keeping the author's read_time when one was given."""
+    words = word_count(content)
+    return {"word_count": words, "read_time": (read_time or "").strip() or estimate_read_time(words)}
+
+
+async def backfill_word_counts(db) -> int:
+    """Set word_count on posts written before it was stored. Returns the number updated."""
+    updated = 0
+    async for post in db.blogs.find({"word_count": {"$exists": False}}, {"content": 1}):
+        await db.blogs.update_one({"_id": post["_id"]}, {"$set": {"word_count": word_count(post.get("content", ""))}})
+        updated += 1
+    return updated
@@ -0,0 +1,207 @@
+"""
+TTL read cache for public endpoints, stored in the shared-state backend
+(config/shared_state.py): per worker with memory:// (LRU-bounded), shared by
+all workers with a Redis URL.
+
+Read handlers are wrapped with @cached(namespace, ttl); admin write handlers
+drop the namespace with @invalidates(namespace) (or invalidate(namespace)
+where the write happens outside a handler of that resource):
+
+    @router.get("/faq", response_model=List[FAQItem])
+    @cached("faq", ttl=300)
+    async def get_active_faqs(db=Depends(get_misc_db)): ...
+
+    @router.put("/faq/{faq_id}")
+    @invalidates("faq")
+    async def update_faq(...): ...
+
+- The key is the namespace, its version, the handler and the handler's plain
+  (str/int/bool/enum) arguments, so /members/?tenure=2025 and /members/ are
+  cached separately. Dependencies such as the database handle are not part
+  of the key.
+- Invalidating bumps the namespace version (an atomic INCR on Redis, so every
+  worker sees it); entries under the old version are never read again and
+  expire with their TTL. A fill that started before an invalidation is
+  stored under the old version, so it can't bring stale data back.
+- Concurrent misses for the same key in a worker share one fill (no stampede
+  on expiry).
+- Paged requests (?limit= / ?cursor=) bypass the cache: their cursors travel
+  in response headers that a cached body can't carry.
+- With a shared backend values are stored as JSON (jsonable_encoder), which
+  the handlers' response_model turns back into the same response.
+- If the backend is unreachable, requests go straight to the handler.
+
+Settings (env):
+    CACHE_ENABLED       "false" to turn caching off
+    CACHE_MAX_ENTRIES   LRU bound for memory://, default 1024
+    CACHE_DEFAULT_TTL   seconds, default 60
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+from enum import Enum
+from typing import Dict, Optional
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+
+from backend.config.shared_state import SHARED_STATE_URL, get_backend
+from backend.utils.pagination import PageParams
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() != "false"
+CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "60"))
+
+_KEY_TYPES = (str, int, float, bool, Enum, type(None))
+_PREFIX = "cache:"
+_MISS = object()
+
+
+def _dumps(value) -> bytes:
+    return json.dumps(jsonable_encoder(value, custom_encoder={ObjectId: str}), separators=(",", ":")).encode()
+
+
+class SharedCache:
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, namespace: str, what: str):
+        stats = self._stats.setdefault(namespace, {"hits": 0, "misses": 0, "invalidations": 0, "errors": 0})
+        stats[what] += 1
+
+    async def _lookup(self, backend, key: str):
+        # Values are stored in a 1-tuple so a cached None is still a hit
+        stored = await backend.get(key)
+        if stored is None:
+            return _MISS
+        return (json.loads(stored) if backend.shared else stored)[0]
+
+    async def get_or_fill(self, namespace: str, key: str, ttl: float, fill):
+        backend = get_backend()
+        try:
+            version = await backend.counter(f"{_PREFIX}version:{namespace}")
+            key = f"{_PREFIX}{namespace}:{version}:{key}"
+            value = await self._lookup(backend, key)
+        except Exception as e:
+            logger.warning(f"Cache backend unavailable, bypassing: {e}")
+            self._count(namespace, "errors")
+            return await fill()
+        if value is not _MISS:
+            self._count(namespace, "hits")
+            return value
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._count(namespace, "hits")
+            return await asyncio.shield(pending)
+
+        self._count(namespace, "misses")
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fill()
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # waiters get it; don't log "never retrieved"
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            self._inflight.pop(key, None)
+        try:
+            await backend.set(key, _dumps([value]) if backend.shared else (value,), ttl)
+        except Exception as e:
+            logger.warning(f"Cache store failed for {namespace}: {e}")
+            self._count(namespace, "errors")
+        return value
+
+    async def invalidate(self, *namespaces: str):
+        backend = get_backend()
+        for namespace in namespaces:
+            self._count(namespace, "invalidations")
+            try:
+                await backend.incr(f"{_PREFIX}version:{namespace}")
+                await backend.delete_prefix(f"{_PREFIX}{namespace}:")
+            except Exception as e:
+                logger.error(f"Cache invalidation of {namespace} failed: {e}")
+                self._count(namespace, "errors")
+
+    def stats(self) -> dict:
+        backend = get_backend()
+        keys = backend.keys()
+        sizes: Dict[str, int] = {}
+        for key in keys or []:
+            if not key.startswith(f"{_PREFIX}version:"):
+                namespace = key[len(_PREFIX):].split(":", 1)[0]
+                sizes[namespace] = sizes.get(namespace, 0) + 1
+        namespaces = {}
+        for namespace in sorted(set(self._stats) | set(sizes)):
+            stats = dict(self._stats.get(namespace, {"hits": 0, "misses": 0, "invalidations": 0, "errors": 0}))
+            lookups = stats["hits"] + stats["misses"]
+            stats["entries"] = sizes.get(namespace, 0) if keys is not None else None
+            stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else None
+            namespaces[namespace] = stats
+        return {
+            "enabled": CACHE_ENABLED,
+            "backend": SHARED_STATE_URL.split("://", 1)[0],
+            "entries": len(keys) if keys is not None else None,
+            "max_entries": getattr(backend, "max_entries", None),
+            "namespaces": namespaces,
+        }
+
+
+cache = SharedCache()
+
+
+def _key(func, kwargs: dict) -> Optional[str]:
+    parts = []
+    for name, value in sorted(kwargs.items()):
+        if isinstance(value, PageParams):
+            if value.paged:
+                return None
+            continue
+        if isinstance(value, _KEY_TYPES):
+            parts.append([name, value.value if isinstance(value, Enum) else value])
+    return f"{func.__module__}.{func.__qualname__}:{json.dumps(parts, separators=(',', ':'))}"
+
+
+def cached(namespace: str, ttl: Optional[float] = None):
+    """Cache an async route handler's return value under namespace for ttl seconds."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = _key(func, kwargs) if CACHE_ENABLED and not args else None
+            if key is None:
+                return await func(*args, **kwargs)
+            return await cache.get_or_fill(namespace, key, ttl or CACHE_DEFAULT_TTL, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+async def invalidate(*namespaces: str):
+    await cache.invalidate(*namespaces)
+
+
+async def namespace_version(namespace: str) -> int:
+    """Current version of namespace; every invalidate(namespace) bumps it."""
+    return await get_backend().counter(f"{_PREFIX}version:{namespace}")
+
+
+def invalidates(*namespaces: str):
+    """Drop the namespaces after the handler runs (also when it fails part-way)."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                await cache.invalidate(*namespaces)
+        return wrapper
+    return decorator
+
+
+def cache_stats() -> dict:
+    return cache.stats()
@@ -0,0 +1,353 @@
+"""
+Persisted bulk email campaigns (newsletter fan-out).
+
+A campaign is created in the request (one insert) and sent by a background
+task: recipients are snapshotted into `email_campaign_recipients`, the
+template is rendered once, and messages go out in batches over a single
+reused SMTP connection at CAMPAIGN_RATE_PER_MINUTE. Every recipient row
+records its own status as soon as its message is handled, so progress can be
+polled and a crashed or restarted worker resumes with the rows still pending.
+A row is marked "sending" before its message goes out; a row left in that
+state by a crash may or may not have been delivered, so on resume it is
+marked failed (retry it with the resume endpoint's retry_failed) rather
+than sent twice.
+
+Only one process sends a given campaign: the sender holds a lease on the
+campaign document and renews it on a timer (every quarter of the lease),
+independent of how long sends and retries take. When a renewal fails the
+sender stops before its next message. A campaign whose lease has expired
+(its worker died) is picked up again by the sweeper in any worker.
+
+A run that stops on an unexpected error (a broken template, bad SMTP
+settings) keeps the lease for an increasing backoff, so the sweeper does
+not restart it right away; after CAMPAIGN_MAX_ERRORS such runs the
+campaign is marked "failed" until an admin resumes it.
+
+Settings (env):
+    CAMPAIGN_BATCH_SIZE         recipients per batch (default 50)
+    CAMPAIGN_RATE_PER_MINUTE    max messages per minute (default 120)
+    CAMPAIGN_MAX_ERRORS         failed runs before the campaign is marked failed (default 3)
+"""
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from backend.utils.email_templates import has_template, render_email
+from backend.utils.mailer import SMTPConnection, build_message, MAIL_MAX_RETRIES
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGNS = "email_campaigns"
+RECIPIENTS = "email_campaign_recipients"
+
+CAMPAIGN_BATCH_SIZE = int(os.getenv("CAMPAIGN_BATCH_SIZE", "50"))
+CAMPAIGN_RATE_PER_MINUTE = float(os.getenv("CAMPAIGN_RATE_PER_MINUTE", "120"))
+CAMPAIGN_MAX_ERRORS = int(os.getenv("CAMPAIGN_MAX_ERRORS", "3"))
+CAMPAIGN_LEASE_SECONDS = 120
+CAMPAIGN_LEASE_RENEW_SECONDS = CAMPAIGN_LEASE_SECONDS / 4
+INTERRUPTED_ERROR = "Interrupted while sending; delivery unknown"
+
+_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+_tasks: Dict[str, asyncio.Task] = {}
+_sweeper: Optional[asyncio.Task] = None
+
+
+def campaign_helper(doc) -> dict:
+    return {
+        "id": str(doc["_id"]),
+        "kind": doc.get("kind"),
+        "subject": doc.get("subject"),
+        "status": doc.get("status"),
+        "total": doc.get("total", 0),
+        "sent": doc.get("sent", 0),
+        "failed": doc.get("failed", 0),
+        "pending": max(doc.get("total", 0) - doc.get("sent", 0) - doc.get("failed", 0), 0),
+        "created_at": doc.get("created_at"),
+        "started_at": doc.get("started_at"),
+        "finished_at": doc.get("finished_at"),
+        "last_error": doc.get("last_error"),
+        "error_count": doc.get("error_count", 0),
+    }
+
+
+async def create_campaign(db, kind: str, subject: str, template: str, context: dict,
+                          text: str = "", fallback_html: str = "", audience: str = "subscribers") -> str:
+    """Persist a campaign and start sending it in the background. Returns the campaign id."""
+    now = datetime.utcnow()
+    result = await db[CAMPAIGNS].insert_one({
+        "kind": kind,
+        "subject": subject,
+        "template": template,
+        "context": context,
+        "text": text,
+        "fallback_html": fallback_html,
+        "audience": audience,
+        "status": "pending",
+        "recipients_loaded": False,
+        "total": 0,
+        "sent": 0,
+        "failed": 0,
+        "created_at": now,
+        "updated_at": now,
+    })
+    campaign_id = str(result.inserted_id)
+    start_campaign(db, campaign_id)
+    return campaign_id
+
+
+def start_campaign(db, campaign_id: str) -> bool:
+    """Schedule the sender task for a campaign in this process (no-op if already running here)."""
+    task = _tasks.get(campaign_id)
+    if task is not None and not task.done():
+        return False
+    _tasks[campaign_id] = asyncio.get_running_loop().create_task(_run_campaign(db, campaign_id))
+    return True
+
+
+async def _claim(db, campaign_id: str):
+    """Take or renew the sending lease. Returns the campaign doc, or None if someone else holds it."""
+    now = datetime.utcnow()
+    return await db[CAMPAIGNS].find_one_and_update(
+        {
+            "_id": ObjectId(campaign_id),
+            "status": {"$in": ["pending", "running"]},
+            "$or": [
+                {"lease_owner": _OWNER},
+                {"lease_expires_at": None},
+                {"lease_expires_at": {"$lt": now}},
+            ],
+        },
+        {"$set": {
+            "status": "running",
+            "lease_owner": _OWNER,
+            "lease_expires_at": now + timedelta(seconds=CAMPAIGN_LEASE_SECONDS),
+            "updated_at": now,
+        }},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+async def _load_recipients(db, campaign: dict):
+    """Snapshot the audience into per-recipient rows (idempotent on resume)."""
+    oid = campaign["_id"]
+    batch = []
+
+    async def flush():
+        if not batch:
+            return
+        try:
+            await db[RECIPIENTS].insert_many(list(batch), ordered=False)
+        except BulkWriteError:
+            # Rows already copied by an earlier, interrupted run (unique campaign_id+email)
+            pass
+        batch.clear()
+
+    async for sub in db[campaign.get("audience", "subscribers")].find({}, {"email": 1}):
+        if not sub.get("email"):
+            continue
+        batch.append({"campaign_id": oid, "email": sub["email"], "status": "pending", "attempts": 0})
+        if len(batch) >= 1000:
+            await flush()
+    await flush()
+    total = await db[RECIPIENTS].count_documents({"campaign_id": oid})
+    await db[CAMPAIGNS].update_one(
+        {"_id": oid},
+        {"$set": {"recipients_loaded": True, "total": total, "started_at": datetime.utcnow()}},
+    )
+
+
+def _render(campaign: dict) -> str:
+    if not has_template(campaign["template"]):
+        return campaign.get("fallback_html") or ""
+    return render_email(campaign["template"], **campaign.get("context", {}))
+
+
+async def _send_with_retry(conn: SMTPConnection, msg) -> Optional[str]:
+    """Send one message; returns None on success or the last error message."""
+    error = None
+    for attempt in range(1, MAIL_MAX_RETRIES + 1):
+        try:
+            await conn.send(msg)
+            return None
+        except Exception as e:
+            error = str(e)
+            await conn.close()
+            if attempt < MAIL_MAX_RETRIES:
+                await asyncio.sleep(min(2 ** attempt, 30))
+    return error
+
+
+async def _keep_lease(db, campaign_id: str, lost: asyncio.Event):
+    """Renew the lease until cancelled; set `lost` and stop if it cannot be renewed."""
+    while True:
+        await asyncio.sleep(CAMPAIGN_LEASE_RENEW_SECONDS)
+        try:
+            renewed = await _claim(db, campaign_id) is not None
+        except Exception as e:
+            logger.warning(f"Campaign {campaign_id}: lease renewal failed: {e}")
+            renewed = False
+        if not renewed:
+            lost.set()
+            return
+
+
+async def _fail_interrupted(db, oid: ObjectId):
+    """Rows a dead sender left in "sending" may have been delivered; fail them instead of resending."""
+    result = await db[RECIPIENTS].update_many(
+        {"campaign_id": oid, "status": "sending"},
+        {"$set": {"status": "failed", "error": INTERRUPTED_ERROR, "failed_at": datetime.utcnow()}},
+    )
+    if result.modified_count:
+        await db[CAMPAIGNS].update_one(
+            {"_id": oid},
+            {"$inc": {"failed": result.modified_count}, "$set": {"last_error": INTERRUPTED_ERROR}},
+        )
+
+
+async def _record(db, oid: ObjectId, recipient_id, error: Optional[str]):
+    """Store the outcome of one send on its row and in the campaign counters."""
+    now = datetime.utcnow()
+    if error is None:
+        fields, counter = {"status": "sent", "sent_at": now}, "sent"
+    else:
+        fields, counter = {"status": "failed", "error": error, "failed_at": now}, "failed"
+    # Only count the row if it is still ours (not failed as interrupted by a new lease holder)
+    result = await db[RECIPIENTS].update_one({"_id": recipient_id, "status": "sending"}, {"$set": fields})
+    if result.modified_count:
+        update = {"$inc": {counter: 1}, "$set": {"updated_at": now}}
+        if error is not None:
+            update["$set"]["last_error"] = error
+        await db[CAMPAIGNS].update_one({"_id": oid}, update)
+
+
+async def _record_run_error(db, oid: ObjectId, error: str):
+    """Count a run that stopped on an error: back off through the lease, then give up."""
+    now = datetime.utcnow()
+    doc = await db[CAMPAIGNS].find_one_and_update(
+        {"_id": oid, "lease_owner": _OWNER},
+        {"$inc": {"error_count": 1}, "$set": {"last_error": error, "updated_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if doc is None:
+        return  # lease already taken over by another worker
+    errors = doc["error_count"]
+    if errors >= CAMPAIGN_MAX_ERRORS:
+        fields = {"status": "failed", "finished_at": now, "lease_expires_at": None}
+        logger.error(f"Campaign {oid} marked failed after {errors} failed runs")
+    else:
+        # Hold the lease so the sweeper retries after 1, 2, 4, ... lease periods
+        fields = {"lease_expires_at": now + timedelta(seconds=CAMPAIGN_LEASE_SECONDS * 2 ** (errors - 1))}
+    await db[CAMPAIGNS].update_one({"_id": oid, "lease_owner": _OWNER}, {"$set": fields})
+
+
+async def _run_campaign(db, campaign_id: str):
+    campaign = await _claim(db, campaign_id)
+    if campaign is None:
+        return
+    oid = campaign["_id"]
+    conn = SMTPConnection()
+    interval = 60.0 / CAMPAIGN_RATE_PER_MINUTE if CAMPAIGN_RATE_PER_MINUTE > 0 else 0
+    lost = asyncio.Event()
+    keeper = asyncio.get_running_loop().create_task(_keep_lease(db, campaign_id, lost))
+    try:
+        if not campaign.get("recipients_loaded"):
+            await _load_recipients(db, campaign)
+        await _fail_interrupted(db, oid)
+        html = _render(campaign)
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await db[RECIPIENTS].find(
+                {"campaign_id": oid, "status": "pending"}, {"email": 1}
+            ).limit(CAMPAIGN_BATCH_SIZE).to_list(length=CAMPAIGN_BATCH_SIZE)
+            if not batch:
+                break
+            for recipient in batch:
+                if lost.is_set():
+                    # Lease lost (another worker took over) or the campaign left pending/running
+                    logger.warning(f"Campaign {campaign_id}: lease lost, stopping")
+                    return
+                started = loop.time()
+                marked = await db[RECIPIENTS].update_one(
+                    {"_id": recipient["_id"], "status": "pending"},
+                    {"$set": {"status": "sending", "sending_at": datetime.utcnow()}, "$inc": {"attempts": 1}},
+                )
+                if not marked.modified_count:
+                    continue
+                msg = build_message(recipient["email"], campaign["subject"], html=html, text=campaign.get("text"))
+                error = await _send_with_retry(conn, msg)
+                await _record(db, oid, recipient["_id"], error)
+                if error is not None:
+                    logger.warning(f"Campaign {campaign_id}: failed to send to {recipient['email']}: {error}")
+                wait = interval - (loop.time() - started)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+        await db[CAMPAIGNS].update_one(
+            {"_id": oid, "lease_owner": _OWNER},
+            {"$set": {"status": "completed", "finished_at": datetime.utcnow(), "lease_expires_at": None}},
+        )
+        logger.info(f"Campaign {campaign_id} completed")
+    except asyncio.CancelledError:
+        # Shutdown: release the lease so another worker can resume immediately
+        await db[CAMPAIGNS].update_one({"_id": oid, "lease_owner": _OWNER}, {"$set": {"lease_expires_at": None}})
+        raise
+    except Exception as e:
+        logger.exception(f"Campaign {campaign_id} stopped: {e}")
+        await _record_run_error(db, oid, str(e))
+    finally:
+        keeper.cancel()
+        await conn.close()
+        _tasks.pop(campaign_id, None)
+
+
+async def resume_campaigns(db) -> int:
+    """Start sender tasks for unfinished campaigns whose lease is free. Returns how many were scheduled."""
+    count = 0
+    now = datetime.utcnow()
+    cursor = db[CAMPAIGNS].find(
+        {
+            "status": {"$in": ["pending", "running"]},
+            "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": now}}],
+        },
+        {"_id": 1},
+    )
+    async for doc in cursor:
+        if start_campaign(db, str(doc["_id"])):
+            count += 1
+    return count
+
+
+async def _sweep(db):
+    while True:
+        try:
+            resumed = await resume_campaigns(db)
+            if resumed:
+                logger.info(f"Resumed {resumed} email campaign(s)")
+        except Exception as e:
+            logger.warning(f"Campaign sweeper error: {e}")
+        await asyncio.sleep(CAMPAIGN_LEASE_SECONDS)
+
+
+async def start_campaign_worker(db):
+    """Resume unfinished campaigns now and keep checking for orphaned ones."""
+    global _sweeper
+    if _sweeper is None or _sweeper.done():
+        _sweeper = asyncio.get_running_loop().create_task(_sweep(db))
+
+
+async def stop_campaign_worker():
+    global _sweeper
+    tasks = list(_tasks.values())
+    if _sweeper is not None:
+        tasks.append(_sweeper)
+        _sweeper = None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,151 @@
+"""
+Async Cloudinary upload client.
+
+The Cloudinary SDK's uploader is synchronous and reads credentials from a
+process-global config, which the upload helpers used to overwrite on every
+request (racing between the BLOGS / EVENTS / MISC accounts). This client
+talks to the upload API directly:
+
+- one CloudinaryAccount per account prefix, read from the environment once
+  (<PREFIX>_CLOUDINARY_CLOUD_NAME / _API_KEY / _API_SECRET)
+- one pooled httpx.AsyncClient shared by every upload and destroy
+- at most CLOUDINARY_MAX_CONCURRENT_UPLOADS uploads in flight per worker
+  process; further uploads wait for a slot
+- request bodies are streamed as multipart from the file object (e.g. the
+  UploadFile's spooled temp file), so nothing is copied into a BytesIO
+
+Settings (env):
+    CLOUDINARY_MAX_CONCURRENT_UPLOADS   default 4
+    CLOUDINARY_TIMEOUT                  seconds per request, default 60
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import IO, Dict, Optional, Union
+
+import httpx
+from cloudinary.utils import api_sign_request
+
+logger = logging.getLogger(__name__)
+
+CLOUDINARY_API_URL = "https://api.cloudinary.com/v1_1"
+CLOUDINARY_MAX_CONCURRENT_UPLOADS = int(os.getenv("CLOUDINARY_MAX_CONCURRENT_UPLOADS", "4"))
+CLOUDINARY_TIMEOUT = float(os.getenv("CLOUDINARY_TIMEOUT", "60"))
+
+
+class CloudinaryError(Exception):
+    pass
+
+
+class CloudinaryAccount:
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.cloud_name = os.getenv(f"{prefix}_CLOUDINARY_CLOUD_NAME")
+        self.api_key = os.getenv(f"{prefix}_CLOUDINARY_API_KEY")
+        self.api_secret = os.getenv(f"{prefix}_CLOUDINARY_API_SECRET")
+
+    @property
+    def can_sign(self) -> bool:
+        return bool(self.api_key and self.api_secret)
+
+    def url(self, resource_type: str, action: str) -> str:
+        if not self.cloud_name:
+            raise CloudinaryError(f"{self.prefix}_CLOUDINARY_CLOUD_NAME is not configured")
+        return f"{CLOUDINARY_API_URL}/{self.cloud_name}/{resource_type}/{action}"
+
+    def signed(self, params: Dict[str, str]) -> Dict[str, str]:
+        """Add api_key, timestamp and signature the same way cloudinary.uploader does."""
+        params = {k: v for k, v in params.items() if v is not None and v != ""}
+        params["timestamp"] = str(int(time.time()))
+        params["signature"] = api_sign_request(params, self.api_secret)
+        params["api_key"] = self.api_key
+        return params
+
+
+_accounts: Dict[str, CloudinaryAccount] = {}
+_http: Optional[httpx.AsyncClient] = None
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def get_account(prefix: str = "MISC") -> CloudinaryAccount:
+    account = _accounts.get(prefix)
+    if account is None:
+        account = _accounts[prefix] = CloudinaryAccount(prefix)
+    return account
+
+
+def _client() -> httpx.AsyncClient:
+    global _http
+    if _http is None or _http.is_closed:
+        _http = httpx.AsyncClient(
+            timeout=CLOUDINARY_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=max(CLOUDINARY_MAX_CONCURRENT_UPLOADS, 1) + 2,
+                max_keepalive_connections=max(CLOUDINARY_MAX_CONCURRENT_UPLOADS, 1),
+            ),
+        )
+    return _http
+
+
+def _upload_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(CLOUDINARY_MAX_CONCURRENT_UPLOADS, 1))
+    return _slots
+
+
+async def _post(url: str, data: dict, files: Optional[dict] = None) -> dict:
+    response = await _client().post(url, data=data, files=files)
+    try:
+        result = response.json()
+    except ValueError:
+        result = {}
+    if response.status_code >= 400 or "error" in result:
+        message = (result.get("error") or {}).get("message") or response.text[:200]
+        raise CloudinaryError(f"Cloudinary {response.status_code}: {message}")
+    return result
+
+
+async def upload(
+    file: Union[bytes, IO[bytes]],
+    account: str = "MISC",
+    resource_type: str = "image",
+    filename: str = "file",
+    content_type: str = "application/octet-stream",
+    signed: bool = False,
+    **params,
+) -> dict:
+    """Upload bytes or a file object; returns Cloudinary's response (secure_url, public_id, ...).
+
+    Unsigned uploads need an upload_preset in params. With signed=True the
+    request is signed with the account's API secret (like cloudinary.uploader.upload).
+    """
+    acct = get_account(account)
+    fields = {k: str(v) for k, v in params.items() if v is not None}
+    if signed:
+        if not acct.can_sign:
+            raise CloudinaryError(f"{account} Cloudinary API key/secret are not configured")
+        fields = acct.signed(fields)
+    if hasattr(file, "seek"):
+        file.seek(0)
+    async with _upload_slots():
+        return await _post(
+            acct.url(resource_type, "upload"),
+            data=fields,
+            files={"file": (filename, file, content_type)},
+        )
+
+
+async def destroy(public_id: str, account: str = "MISC", resource_type: str = "image") -> dict:
+    acct = get_account(account)
+    if not acct.can_sign:
+        raise CloudinaryError(f"{account} Cloudinary API key/secret are not configured")
+    return await _post(acct.url(resource_type, "destroy"), data=acct.signed({"public_id": public_id}))
+
+
+async def close_cloudinary_client():
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
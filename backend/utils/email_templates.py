@@ -0,0 +1,88 @@
+"""
+Process-wide Jinja2 environment for the email templates in backend/templates.
+
+Templates are compiled once per process (warm_templates() at startup compiles
+all of them) and kept in the environment's cache, so sending an email only
+renders. Compiled bytecode is also cached on disk, so the other gunicorn
+workers and later restarts skip parsing too.
+
+Settings (env):
+    TEMPLATES_AUTO_RELOAD       "true" in development to pick up edits without a restart
+    JINJA_BYTECODE_CACHE_DIR    bytecode cache directory (default: <tmp>/takra-jinja-cache)
+
+Benchmark (per-send render cost, before vs after):
+    python -m backend.utils.email_templates
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
+TEMPLATES_AUTO_RELOAD = os.getenv("TEMPLATES_AUTO_RELOAD", "false").lower() == "true"
+JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "takra-jinja-cache")
+
+
+def _bytecode_cache():
+    try:
+        os.makedirs(JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+        return FileSystemBytecodeCache(JINJA_BYTECODE_CACHE_DIR)
+    except OSError:
+        return None
+
+
+# autoescape stays off: the routers have always rendered with a bare Template(...)
+env = Environment(
+    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+    auto_reload=TEMPLATES_AUTO_RELOAD,
+    bytecode_cache=_bytecode_cache(),
+    cache_size=-1,
+)
+
+
+def has_template(name: str) -> bool:
+    return (TEMPLATE_DIR / name).exists()
+
+
+def render_email(name: str, **ctx) -> str:
+    """Render backend/templates/<name> with the shared, cached environment."""
+    return env.get_template(name).render(**ctx)
+
+
+def warm_templates() -> int:
+    """Compile every template up front so no request pays for parsing. Returns the count."""
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def _benchmark(iterations: int = 200):
+    ctx = {
+        "otp": "123456", "timestamp": "2026-01-01 00:00:00", "ip_address": "127.0.0.1",
+        "device_info": "Chrome on Linux", "year": 2026, "member_name": "Member",
+        "event_name": "Taakra", "team_name": "Team", "members": [{"name": "A", "email": "a@x.com"}],
+        "modules": ["Coding"], "module_registration_count": {"Coding": 1}, "registration_time": "now",
+    }
+    names = env.list_templates(extensions=["html"])
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for name in names:
+            with open(TEMPLATE_DIR / name, "r") as file:
+                Template(file.read()).render(**ctx)
+    before = (time.perf_counter() - start) / (iterations * len(names))
+    warm_templates()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for name in names:
+            render_email(name, **ctx)
+    after = (time.perf_counter() - start) / (iterations * len(names))
+    print(f"{len(names)} templates, {iterations} sends each")
+    print(f"open + Template(): {before * 1e6:8.1f} µs/send")
+    print(f"render_email():    {after * 1e6:8.1f} µs/send  ({before / after:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,96 @@
+"""
+Export schemas for the admin datasets, keyed by dataset name.
+
+Each entry declares the database and collection, the exported fields and
+the equality filters an export may push down (e.g. event_id). Used by the
+export endpoints in the owning routers and by /api/admin/exports/{dataset}.
+"""
+from backend.utils.exports import ExportField, ExportSchema
+
+
+def _id(doc: dict):
+    return doc.get("_id")
+
+
+def _member_values(key: str):
+    def values(doc: dict):
+        return [m.get(key) or "" for m in doc.get("members") or [] if isinstance(m, dict)]
+    return values
+
+
+ID = ExportField("id", _id, fields=("_id",))
+CREATED_AT = ExportField("created_at", kind="datetime")
+
+
+EXPORT_SCHEMAS = {
+    schema.name: schema
+    for schema in [
+        ExportSchema("registrations", db="misc", collection="registrations", filters=("position_applied",), fields=[
+            ID,
+            ExportField("name"),
+            ExportField("roll_no"),
+            ExportField("campus"),
+            ExportField("email"),
+            ExportField("phone"),
+            ExportField("position_applied"),
+            ExportField("portfolio"),
+            ExportField("linkedin"),
+            ExportField("picture_url"),
+            ExportField("experience_alignment"),
+            ExportField("other_society"),
+            ExportField("why_join"),
+            ExportField("expertise"),
+            ExportField("best_thing"),
+            ExportField("improve"),
+            CREATED_AT,
+        ]),
+        ExportSchema("delegations", db="misc", collection="delegations", fields=[
+            ID,
+            ExportField("name"),
+            ExportField("cnic"),
+            ExportField("email"),
+            ExportField("phone"),
+            ExportField("batch"),
+            ExportField("campus"),
+            ExportField("why_join"),
+            ExportField("comments"),
+            ExportField("resume_filename"),
+            ExportField("resume_url"),
+            CREATED_AT,
+        ]),
+        # CNIC and phone get an apostrophe prefix in CSV so Excel keeps them as
+        # text instead of switching to scientific notation.
+        ExportSchema("cogent_labs_registrations", db="misc", collection="cogent_labs_registrations", fields=[
+            ID,
+            ExportField("name"),
+            ExportField("cnic", csv_text=True),
+            ExportField("email"),
+            ExportField("phone", csv_text=True),
+            ExportField("batch"),
+            ExportField("campus"),
+            ExportField("why_join"),
+            ExportField("comments"),
+            ExportField("resume_filename"),
+            ExportField("resume_url"),
+            ExportField("feedback"),
+            CREATED_AT,
+        ]),
+        ExportSchema("event_registrations", db="event", collection="event_registrations",
+                     filters=("event_id", "payment_status"), fields=[
+            ID,
+            ExportField("event_id"),
+            ExportField("team_name"),
+            ExportField("modules", kind="list"),
+            ExportField("payment_status"),
+            ExportField("transaction_id"),
+            ExportField("payment_receipt_url"),
+            ExportField("member_names", _member_values("name"), kind="list", fields=("members",)),
+            ExportField("member_emails", _member_values("email"), kind="list", fields=("members",)),
+            ExportField("member_phones", _member_values("phone"), kind="list", fields=("members",)),
+            ExportField("members", kind="json"),
+            ExportField("discount_codes_used", kind="json"),
+            ExportField("payment_submitted_at", kind="datetime"),
+            CREATED_AT,
+        ]),
+    ]
+}
@@ -0,0 +1,383 @@
+"""
+Streaming exports of admin datasets in CSV, NDJSON, XLSX, Parquet and Arrow.
+
+A dataset is declared once as an ExportSchema (see export_schemas.py): the
+collection it reads and its fields. Every export is a single Motor cursor
+with the field projection, the date range and any equality filters pushed
+down into the query. Rows are read in batches and written incrementally:
+
+- csv / ndjson are streamed as they are produced, in EXPORT_CHUNK_SIZE
+  chunks (compressed on the way out by middleware/compression.py)
+- xlsx is written with openpyxl's write-only workbook, parquet / arrow with
+  pyarrow one record batch at a time; both go to a spooled temp file that is
+  then streamed back (the formats need their footer written first)
+
+openpyxl (xlsx) and pyarrow (parquet, arrow) are optional; without them
+those formats answer 501.
+
+Settings (env):
+    EXPORT_BATCH_SIZE   documents per cursor / record batch (default 1000)
+    EXPORT_CHUNK_SIZE   bytes per flushed chunk (default 64 KiB)
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from fastapi import HTTPException, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+except ImportError:
+    Workbook = None
+    WriteOnlyCell = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", str(64 * 1024)))
+
+
+class ExportField:
+    """One exported column.
+
+    source is the document field to read (defaults to name) or a callable
+    taking the document; a callable must list the fields it reads in
+    `fields` so they are projected. kind is one of string, int, datetime,
+    list (of strings) or json (nested value). A datetime field also passes
+    strings through, since legacy documents store some dates as ISO text. csv_text prefixes CSV cells
+    with an apostrophe so Excel keeps long digit strings (CNIC, phone) as text.
+    """
+
+    def __init__(self, name: str, source: Union[str, Callable[[dict], object], None] = None,
+                 kind: str = "string", fields: Iterable[str] = (), csv_text: bool = False):
+        self.name = name
+        self.source = source or name
+        self.kind = kind
+        self.csv_text = csv_text
+        self.fields = tuple(fields) if callable(self.source) else (self.source,)
+
+    def value(self, doc: dict):
+        v = self.source(doc) if callable(self.source) else doc.get(self.source)
+        if v is None or v == "":
+            return None
+        if self.kind == "string":
+            return v if isinstance(v, str) else str(v)
+        if self.kind == "datetime":
+            return v if isinstance(v, (datetime, str)) else None
+        if self.kind == "int":
+            try:
+                return int(v)
+            except (TypeError, ValueError):
+                return None
+        if self.kind == "list":
+            return [str(x) for x in v] if isinstance(v, (list, tuple)) else [str(v)]
+        return v  # json
+
+
+class ExportSchema:
+    def __init__(self, name: str, db: str, collection: str, fields: List[ExportField],
+                 filters: Sequence[str] = (), date_field: str = "created_at",
+                 sort: Optional[list] = None, filename: Optional[str] = None):
+        self.name = name
+        self.db = db
+        self.collection = collection
+        self.fields = fields
+        self.filters = tuple(filters)
+        self.date_field = date_field
+        self.sort = sort or [(date_field, -1)]
+        self.filename = filename or name
+
+    def select(self, names: Optional[Iterable[str]] = None) -> List[ExportField]:
+        """The requested fields in schema order (all of them when names is empty)."""
+        wanted = {n.strip() for n in (names or []) if n and n.strip()}
+        if not wanted:
+            return self.fields
+        unknown = wanted - {f.name for f in self.fields}
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown export fields: {', '.join(sorted(unknown))}")
+        return [f for f in self.fields if f.name in wanted]
+
+    def describe(self) -> dict:
+        return {
+            "name": self.name,
+            "fields": [{"name": f.name, "kind": f.kind} for f in self.fields],
+            "filters": list(self.filters),
+            "date_field": self.date_field,
+        }
+
+
+def _projection(fields: Sequence[ExportField]) -> dict:
+    projection = {}
+    for f in fields:
+        projection.update({name: 1 for name in f.fields})
+    return projection
+
+
+def _parse_date(value: Optional[str], end: bool = False) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {value} (use YYYY-MM-DD or ISO 8601)")
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)  # a bare end date includes that whole day
+    return parsed
+
+
+def build_query(schema: ExportSchema, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                filters: Optional[Dict[str, str]] = None) -> dict:
+    query = {}
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        if key not in schema.filters:
+            raise HTTPException(status_code=400, detail=f"Unsupported filter: {key}")
+        query[key] = value
+    start, end = _parse_date(date_from), _parse_date(date_to, end=True)
+    if start or end:
+        dates, strings = {}, {}
+        if start:
+            dates["$gte"], strings["$gte"] = start, start.isoformat()
+        if end:
+            dates["$lt"], strings["$lt"] = end, end.isoformat()
+        # Legacy documents store the date as ISO text, which only compares with string bounds
+        query["$or"] = [{schema.date_field: dates}, {schema.date_field: strings}]
+    return query
+
+
+async def _batches(cursor) -> AsyncIterator[List[dict]]:
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---- text formats (streamed) ----
+
+def _csv_cell(field: ExportField, v):
+    if v is None:
+        return ""
+    if field.kind == "datetime":
+        return v.isoformat() if isinstance(v, datetime) else v
+    if field.kind == "list":
+        return ", ".join(v)
+    if field.kind == "json":
+        return json.dumps(v, default=str)
+    if field.csv_text:
+        return f"'{v}"
+    return v
+
+
+def _json_value(v):
+    return v.isoformat() if isinstance(v, datetime) else v
+
+
+class _TextBuffer:
+    def __init__(self):
+        self.buffer = io.StringIO()
+
+    def ready(self) -> bool:
+        return self.buffer.tell() >= EXPORT_CHUNK_SIZE
+
+    def take(self) -> bytes:
+        data = self.buffer.getvalue().encode("utf-8")
+        self.buffer.seek(0)
+        self.buffer.truncate(0)
+        return data
+
+
+async def iter_csv(cursor, fields: Sequence[ExportField]) -> AsyncIterator[bytes]:
+    out = _TextBuffer()
+    writer = csv.writer(out.buffer)
+    writer.writerow([f.name for f in fields])
+    async for doc in cursor:
+        writer.writerow([_csv_cell(f, f.value(doc)) for f in fields])
+        if out.ready():
+            yield out.take()
+    if out.buffer.tell():
+        yield out.take()
+
+
+async def iter_ndjson(cursor, fields: Sequence[ExportField]) -> AsyncIterator[bytes]:
+    out = _TextBuffer()
+    async for doc in cursor:
+        row = {f.name: _json_value(f.value(doc)) for f in fields}
+        out.buffer.write(json.dumps(row, default=str, ensure_ascii=False))
+        out.buffer.write("\n")
+        if out.ready():
+            yield out.take()
+    if out.buffer.tell():
+        yield out.take()
+
+
+# ---- binary formats (built in a spooled temp file, then streamed) ----
+
+def _xlsx_cell(ws, field: ExportField, v):
+    if v is None:
+        return None
+    if field.kind == "list":
+        v = ", ".join(v)
+    elif field.kind == "json":
+        v = json.dumps(v, default=str)
+    if isinstance(v, str) and v.startswith("="):
+        # Submitted text must never be evaluated as a formula
+        cell = WriteOnlyCell(ws, value=v)
+        cell.data_type = "s"
+        return cell
+    return v
+
+
+async def _write_xlsx(cursor, fields: Sequence[ExportField], sink) -> None:
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("export")
+    ws.append([f.name for f in fields])
+
+    def write(batch):
+        for doc in batch:
+            ws.append([_xlsx_cell(ws, f, f.value(doc)) for f in fields])
+
+    async for batch in _batches(cursor):
+        await run_in_threadpool(write, batch)
+    await run_in_threadpool(wb.save, sink)
+
+
+def _arrow_schema(fields: Sequence[ExportField]):
+    types = {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "datetime": pa.timestamp("ms"),
+        "list": pa.list_(pa.string()),
+        "json": pa.string(),
+    }
+    return pa.schema([(f.name, types.get(f.kind, pa.string())) for f in fields])
+
+
+def _timestamp(v) -> Optional[datetime]:
+    """A datetime for a timestamp column; legacy ISO strings are parsed, anything else is null."""
+    if isinstance(v, str):
+        try:
+            return datetime.fromisoformat(v.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return v
+
+
+def _record_batch(schema, fields: Sequence[ExportField], batch: List[dict]):
+    columns = []
+    for f in fields:
+        values = [f.value(doc) for doc in batch]
+        if f.kind == "json":
+            values = [None if v is None else json.dumps(v, default=str) for v in values]
+        elif f.kind == "datetime":
+            values = [_timestamp(v) for v in values]
+        columns.append(values)
+    return pa.RecordBatch.from_arrays(
+        [pa.array(col, type=schema.field(i).type) for i, col in enumerate(columns)],
+        schema=schema,
+    )
+
+
+async def _write_arrow(cursor, fields: Sequence[ExportField], sink, parquet: bool) -> None:
+    schema = _arrow_schema(fields)
+    writer = pq.ParquetWriter(sink, schema, compression="zstd") if parquet else pa.ipc.new_stream(sink, schema)
+    try:
+        async for batch in _batches(cursor):
+            await run_in_threadpool(lambda b=batch: writer.write_batch(_record_batch(schema, fields, b)))
+    finally:
+        writer.close()
+
+
+async def _iter_file(build) -> AsyncIterator[bytes]:
+    with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024) as sink:
+        await build(sink)
+        sink.seek(0)
+        while True:
+            chunk = await run_in_threadpool(sink.read, EXPORT_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+EXPORT_FORMATS = {
+    "csv": {"media_type": "text/csv", "ext": "csv"},
+    "ndjson": {"media_type": "application/x-ndjson", "ext": "ndjson"},
+    "xlsx": {"media_type": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "ext": "xlsx"},
+    "parquet": {"media_type": "application/vnd.apache.parquet", "ext": "parquet"},
+    "arrow": {"media_type": "application/vnd.apache.arrow.stream", "ext": "arrows"},
+}
+
+
+def _body(fmt: str, cursor, fields: Sequence[ExportField]) -> AsyncIterator[bytes]:
+    if fmt == "csv":
+        return iter_csv(cursor, fields)
+    if fmt == "ndjson":
+        return iter_ndjson(cursor, fields)
+    if fmt == "xlsx":
+        if Workbook is None:
+            raise HTTPException(status_code=501, detail="XLSX export requires openpyxl")
+        return _iter_file(lambda sink: _write_xlsx(cursor, fields, sink))
+    if pa is None:
+        raise HTTPException(status_code=501, detail=f"{fmt} export requires pyarrow")
+    return _iter_file(lambda sink: _write_arrow(cursor, fields, sink, parquet=(fmt == "parquet")))
+
+
+class ExportParams:
+    """Query parameters shared by every export endpoint."""
+
+    def __init__(
+        self,
+        format: str = Query("csv", description="csv, ndjson, xlsx, parquet or arrow"),
+        fields: Optional[str] = Query(None, description="Comma-separated subset of fields"),
+        date_from: Optional[str] = Query(None, alias="from", description="Created on/after (YYYY-MM-DD or ISO 8601)"),
+        date_to: Optional[str] = Query(None, alias="to", description="Created on/before (YYYY-MM-DD or ISO 8601)"),
+    ):
+        self.format = format.lower()
+        self.fields = fields.split(",") if fields else None
+        self.date_from = date_from
+        self.date_to = date_to
+
+
+def export_response(
+    schema: ExportSchema,
+    db,
+    params: Optional[ExportParams] = None,
+    filters: Optional[Dict[str, str]] = None,
+    filename: Optional[str] = None,
+) -> StreamingResponse:
+    """StreamingResponse exporting `schema` from `db` in the requested format."""
+    fmt = params.format if params else "csv"
+    spec = EXPORT_FORMATS.get(fmt)
+    if spec is None:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {fmt}")
+    fields = schema.select(params.fields if params else None)
+    query = build_query(
+        schema,
+        params.date_from if params else None,
+        params.date_to if params else None,
+        filters,
+    )
+    cursor = db[schema.collection].find(
+        query,
+        _projection(fields),
+        batch_size=EXPORT_BATCH_SIZE,
+    ).sort(schema.sort)
+    body = _body(fmt, cursor, fields)
+    headers = {"Content-Disposition": f'attachment; filename="{filename or schema.filename}.{spec["ext"]}"'}
+    return StreamingResponse(body, media_type=spec["media_type"], headers=headers)
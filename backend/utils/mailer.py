@@ -0,0 +1,262 @@
+"""
+Outbound email queue.
+
+Request handlers build a message and call enqueue_email(msg); it returns
+immediately. A few background workers drain the queue, each over its own
+persistent, authenticated aiosmtplib connection (so the pool size is the
+worker count). A failed send is put back on the queue after an exponential
+backoff (the worker moves on to the next message meanwhile); after
+MAIL_MAX_RETRIES attempts its recipient, subject and error (not the body,
+which may hold OTPs or passwords) are written to the `email_dead_letters`
+collection in the misc database, which expires them after 30 days.
+
+Settings (env):
+    SMTP_SERVER / SMTP_PORT     default smtp.gmail.com:465
+    SMTP_TLS                    "ssl" (implicit TLS), "starttls" or "none";
+                                default ssl on port 465, starttls on any other port
+    ADMIN_EMAIL / ADMIN_EMAIL_PASSWORD   login and default From address
+    MAIL_WORKERS                number of workers / SMTP connections (default 2)
+    MAIL_QUEUE_SIZE             max queued messages (default 1000)
+    MAIL_MAX_RETRIES            attempts before dead-lettering (default 3)
+    MAIL_RETRY_BACKOFF          base backoff in seconds (default 2)
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import List, Optional, Set, Union
+
+import aiosmtplib
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+SMTP_SERVER = os.getenv("SMTP_SERVER") or "smtp.gmail.com"
+SMTP_PORT = int(os.getenv("SMTP_PORT") or 465)
+SMTP_USER = os.getenv("ADMIN_EMAIL")
+SMTP_PASSWORD = os.getenv("ADMIN_EMAIL_PASSWORD")
+SMTP_TLS = (os.getenv("SMTP_TLS") or ("ssl" if SMTP_PORT == 465 else "starttls")).lower()
+
+MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", "2"))
+MAIL_QUEUE_SIZE = int(os.getenv("MAIL_QUEUE_SIZE", "1000"))
+MAIL_MAX_RETRIES = int(os.getenv("MAIL_MAX_RETRIES", "3"))
+MAIL_RETRY_BACKOFF = float(os.getenv("MAIL_RETRY_BACKOFF", "2"))
+# Servers drop idle sessions; probe with NOOP before reusing one idle this long.
+MAIL_IDLE_CHECK_SECONDS = 60
+DEAD_LETTER_COLLECTION = "email_dead_letters"
+
+
+def build_message(to: Union[str, List[str]], subject: str, html: Optional[str] = None,
+                  text: Optional[str] = None, sender: Optional[str] = None) -> MIMEMultipart:
+    """Build a plain/html alternative message the way the routers always have."""
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = sender or SMTP_USER
+    msg["To"] = ", ".join(to) if isinstance(to, list) else to
+    if text:
+        msg.attach(MIMEText(text, "plain"))
+    if html:
+        msg.attach(MIMEText(html, "html"))
+    return msg
+
+
+class SMTPConnection:
+    """One persistent SMTP session, reconnected lazily."""
+
+    def __init__(self):
+        self.smtp: Optional[aiosmtplib.SMTP] = None
+        self.last_used = 0.0
+
+    async def _connect(self):
+        if SMTP_TLS not in ("ssl", "starttls", "none"):
+            raise ValueError(f"Unknown SMTP_TLS '{SMTP_TLS}', use 'ssl', 'starttls' or 'none'")
+        self.smtp = aiosmtplib.SMTP(
+            hostname=SMTP_SERVER,
+            port=SMTP_PORT,
+            use_tls=SMTP_TLS == "ssl",
+            start_tls=SMTP_TLS == "starttls",
+            timeout=30,
+        )
+        await self.smtp.connect()
+        if SMTP_USER and SMTP_PASSWORD:
+            await self.smtp.login(SMTP_USER, SMTP_PASSWORD)
+
+    async def _ensure(self):
+        if self.smtp is None or not self.smtp.is_connected:
+            await self._connect()
+        elif time.monotonic() - self.last_used > MAIL_IDLE_CHECK_SECONDS:
+            try:
+                await self.smtp.noop()
+            except aiosmtplib.SMTPException:
+                await self.close()
+                await self._connect()
+
+    async def send(self, msg: Message):
+        await self._ensure()
+        try:
+            await self.smtp.send_message(msg)
+        except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError):
+            # Stale session: reconnect once and let any further error reach the retry loop.
+            await self.close()
+            await self._connect()
+            await self.smtp.send_message(msg)
+        self.last_used = time.monotonic()
+
+    async def close(self):
+        if self.smtp is not None:
+            try:
+                await self.smtp.quit()
+            except Exception:
+                self.smtp.close()
+        self.smtp = None
+
+
+class MailQueue:
+    def __init__(self, workers: int = MAIL_WORKERS, maxsize: int = MAIL_QUEUE_SIZE):
+        self.worker_count = max(1, workers)
+        self.maxsize = maxsize
+        self.queue: Optional[asyncio.Queue] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.workers: List[asyncio.Task] = []
+        # Timers that put a failed message back on the queue after its backoff
+        self.retries: Set[asyncio.TimerHandle] = set()
+        self.stats = {"queued": 0, "sent": 0, "retried": 0, "dead_lettered": 0}
+
+    @property
+    def running(self) -> bool:
+        return bool(self.workers)
+
+    def start(self):
+        if self.running:
+            return
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self.workers = [self.loop.create_task(self._worker(i)) for i in range(self.worker_count)]
+        logger.info(f"Mail queue started with {self.worker_count} worker(s)")
+
+    async def stop(self, timeout: float = 10.0):
+        """Drain what is queued (up to timeout), then close connections."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Mail queue stopped with {self.queue.qsize()} message(s) unsent")
+        if self.retries:
+            logger.warning(f"Mail queue stopped with {len(self.retries)} message(s) waiting to be retried")
+            for handle in self.retries:
+                handle.cancel()
+            self.retries.clear()
+        for task in self.workers:
+            task.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def enqueue(self, msg: Message) -> bool:
+        """Queue a message without blocking. Safe to call from worker threads."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if not self.running:
+            if running_loop is None:
+                logger.error(f"Mail queue not running; dropping email to {msg['To']}")
+                return False
+            self.start()
+        job = {"msg": msg, "attempts": 0}
+        if running_loop is self.loop:
+            return self._put(job)
+        # Called from a threadpool (sync handlers / BackgroundTasks)
+        self.loop.call_soon_threadsafe(self._put, job)
+        return True
+
+    def _put(self, job: dict) -> bool:
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            logger.error(f"Mail queue full; dropping email to {job['msg']['To']}")
+            return False
+        self.stats["queued"] += 1
+        return True
+
+    async def _worker(self, index: int):
+        conn = SMTPConnection()
+        try:
+            while True:
+                job = await self.queue.get()
+                try:
+                    await self._deliver(conn, job)
+                finally:
+                    self.queue.task_done()
+        finally:
+            await conn.close()
+
+    async def _deliver(self, conn: SMTPConnection, job: dict):
+        msg = job["msg"]
+        job["attempts"] += 1
+        try:
+            await conn.send(msg)
+            self.stats["sent"] += 1
+            logger.info(f"Email sent to {msg['To']}: {msg['Subject']}")
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await conn.close()
+            if job["attempts"] >= MAIL_MAX_RETRIES:
+                await self._dead_letter(msg, job["attempts"], e)
+                return
+            self.stats["retried"] += 1
+            delay = MAIL_RETRY_BACKOFF * (2 ** (job["attempts"] - 1))
+            logger.warning(f"Email to {msg['To']} failed (attempt {job['attempts']}): {e}; retrying in {delay:.0f}s")
+            # Re-queue later instead of sleeping here, so other mail keeps flowing
+            handle = self.loop.call_later(delay, self._retry, job)
+            self.retries.add(handle)
+            job["retry_handle"] = handle
+
+    def _retry(self, job: dict):
+        self.retries.discard(job.pop("retry_handle", None))
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.loop.create_task(self._dead_letter(job["msg"], job["attempts"], RuntimeError("mail queue full on retry")))
+
+    async def _dead_letter(self, msg: Message, attempts: int, error: Exception):
+        self.stats["dead_lettered"] += 1
+        logger.error(f"Email to {msg['To']} dead-lettered after {attempts} attempts: {error}")
+        try:
+            from backend.config.database.init import get_misc_db
+            await get_misc_db()[DEAD_LETTER_COLLECTION].insert_one({
+                "to": msg["To"],
+                "subject": msg["Subject"],
+                "attempts": attempts,
+                "error": str(error),
+                "created_at": datetime.utcnow(),
+            })
+        except Exception as e:
+            logger.error(f"Failed to store dead-lettered email: {e}")
+
+
+mail_queue = MailQueue()
+
+
+def enqueue_email(msg: Message) -> bool:
+    """Queue a message for delivery. Returns False if it could not be queued."""
+    return mail_queue.enqueue(msg)
+
+
+def send_html_email(to: str, subject: str, html: str, text: Optional[str] = None) -> bool:
+    return enqueue_email(build_message(to, subject, html=html, text=text))
+
+
+async def start_mailer():
+    mail_queue.start()
+
+
+async def stop_mailer():
+    await mail_queue.stop()
@@ -0,0 +1,204 @@
+"""
+Pre-computed counters for the admin dashboard (api/admin/Metrics.py).
+
+One document in the `metrics_rollups` collection holds the registration
+counts:
+
+    {
+        "_id": "registrations",
+        "total": 120,
+        "no_picture": 14,                             # picture_url missing or empty
+        "positions": {"Web Lead": 30, "Unspecified": 2},
+        "days": {"2026-01-01": 4, "2026-01-02": 9},   # per UTC day of created_at
+        "rolled_up_to": datetime,                     # newest created_at counted
+        "updated_at": datetime,
+    }
+
+create_registration inserts each new registration with SELF_COUNTED set
+and counts it with `$inc`, so the dashboard reads this document instead of
+counting `registrations` on every load. If the document is missing, the
+first write seeds it from the registrations that do not count themselves. Registrations newer than `rolled_up_to` (inserted but not counted
+yet) are added on read, and the daily map serves any trend window without
+further queries.
+
+Rebuild the document from `registrations` (e.g. after a migration or after
+dropping it):
+    python -m backend.utils.metrics_rollups
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from backend.utils.registration_stats import _decode_counts, _field_key
+
+ROLLUP_COLLECTION = "metrics_rollups"
+REGISTRATIONS_ROLLUP = "registrations"
+TREND_WINDOWS = (7, 30, 90)
+RECENT_LIMIT = 5
+UNSPECIFIED = "Unspecified"
+# Set on registrations whose create_registration $inc's the rollup itself
+SELF_COUNTED = "counted_in_rollup"
+
+_DAY_FORMAT = "%Y-%m-%d"
+_NO_PICTURE = {"$cond": [{"$eq": [{"$ifNull": ["$picture_url", ""]}, ""]}, 1, 0]}
+
+
+def _day(value: datetime) -> str:
+    return value.strftime(_DAY_FORMAT)
+
+
+def _has_picture(registration: dict) -> bool:
+    return bool(registration.get("picture_url"))
+
+
+def _count_facets() -> Dict[str, list]:
+    """$facet stages that count the matched registrations the way the rollup does."""
+    return {
+        "totals": [{"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "no_picture": {"$sum": _NO_PICTURE},
+            "newest": {"$max": "$created_at"},
+        }}],
+        "positions": [{"$group": {"_id": "$position_applied", "count": {"$sum": 1}}}],
+        "days": [
+            {"$match": {"created_at": {"$type": "date"}}},
+            {"$group": {"_id": {"$dateToString": {"format": _DAY_FORMAT, "date": "$created_at"}}, "count": {"$sum": 1}}},
+        ],
+    }
+
+
+def _counts_from_facets(result: dict) -> dict:
+    totals = (result.get("totals") or [{}])[0]
+    positions: Dict[str, int] = {}
+    for group in result.get("positions", []):
+        # null, missing and "" all count as UNSPECIFIED
+        key = _field_key(group["_id"] or UNSPECIFIED)
+        positions[key] = positions.get(key, 0) + group["count"]
+    return {
+        "total": totals.get("total", 0),
+        "no_picture": totals.get("no_picture", 0),
+        "positions": positions,
+        "days": {d["_id"]: d["count"] for d in result.get("days", [])},
+        "rolled_up_to": totals.get("newest"),
+    }
+
+
+async def rebuild_registration_rollup(db) -> dict:
+    """Recount the rollup from registrations and store it. Returns the stored document."""
+    result = await db.registrations.aggregate([{"$facet": _count_facets()}]).to_list(length=1)
+    doc = {**_counts_from_facets(result[0] if result else {}), "updated_at": datetime.utcnow()}
+    await db[ROLLUP_COLLECTION].replace_one({"_id": REGISTRATIONS_ROLLUP}, doc, upsert=True)
+    return {"_id": REGISTRATIONS_ROLLUP, **doc}
+
+
+async def _seed_registration_rollup(db) -> None:
+    """Create the rollup from the registrations that do not count themselves."""
+    result = await db.registrations.aggregate([
+        {"$match": {SELF_COUNTED: {"$ne": True}}},
+        {"$facet": _count_facets()},
+    ]).to_list(length=1)
+    counts = _counts_from_facets(result[0] if result else {})
+    try:
+        # A no-op if another registration created the document first
+        await db[ROLLUP_COLLECTION].update_one(
+            {"_id": REGISTRATIONS_ROLLUP},
+            {"$setOnInsert": {**counts, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        pass
+
+
+async def record_registration(db, registration: dict) -> None:
+    """Count a new (already inserted, with SELF_COUNTED set) registration in the rollup."""
+    if await db[ROLLUP_COLLECTION].find_one({"_id": REGISTRATIONS_ROLLUP}, {"_id": 1}) is None:
+        # First write since the rollup was dropped or never built
+        await _seed_registration_rollup(db)
+    created_at = registration["created_at"]
+    inc = {
+        "total": 1,
+        f"positions.{_field_key(registration.get('position_applied') or UNSPECIFIED)}": 1,
+        f"days.{_day(created_at)}": 1,
+    }
+    if not _has_picture(registration):
+        inc["no_picture"] = 1
+    await db[ROLLUP_COLLECTION].update_one(
+        {"_id": REGISTRATIONS_ROLLUP},
+        {"$inc": inc, "$max": {"rolled_up_to": created_at}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+def _merge(rollup: dict, pending: dict) -> dict:
+    merged = {
+        "total": rollup.get("total", 0) + pending["total"],
+        "no_picture": rollup.get("no_picture", 0) + pending["no_picture"],
+        "positions": dict(rollup.get("positions") or {}),
+        "days": dict(rollup.get("days") or {}),
+    }
+    for key in ("positions", "days"):
+        for name, count in pending[key].items():
+            merged[key][name] = merged[key].get(name, 0) + count
+    return merged
+
+
+def _trend(days: Dict[str, int], window: int, today: datetime) -> List[dict]:
+    """Daily counts for the last `window` days including today, oldest first."""
+    start = datetime(today.year, today.month, today.day) - timedelta(days=window - 1)
+    trend = []
+    for i in range(window):
+        day = start + timedelta(days=i)
+        trend.append({"date": day.isoformat(), "count": days.get(_day(day), 0)})
+    return trend
+
+
+async def get_registration_metrics(db, window: int = 7) -> dict:
+    """Dashboard counts: the rollup plus, in one $facet, the latest registrations and anything not rolled up yet."""
+    rollup = await db[ROLLUP_COLLECTION].find_one({"_id": REGISTRATIONS_ROLLUP})
+    if rollup is None:
+        rollup = await rebuild_registration_rollup(db)
+
+    rolled_up_to: Optional[datetime] = rollup.get("rolled_up_to")
+    pending_match = {"created_at": {"$gt": rolled_up_to}} if rolled_up_to else {}
+    facets = {
+        "recent": [
+            {"$sort": {"created_at": -1}},
+            {"$limit": RECENT_LIMIT},
+            {"$project": {"name": 1, "email": 1, "position_applied": 1, "created_at": 1}},
+        ],
+        **{name: [{"$match": pending_match}] + stages for name, stages in _count_facets().items()},
+    }
+    result = await db.registrations.aggregate([{"$facet": facets}]).to_list(length=1)
+    result = result[0] if result else {}
+    counts = _merge(rollup, _counts_from_facets(result))
+
+    now = datetime.utcnow()
+    trend = _trend(counts["days"], window, now)
+    positions = _decode_counts(counts["positions"])
+    by_position = [
+        {"position": name, "count": count}
+        for name, count in sorted(positions.items(), key=lambda item: item[1], reverse=True)
+    ]
+    return {
+        "total": counts["total"],
+        "no_picture": counts["no_picture"],
+        "by_position": by_position,
+        "last_7_days": sum(day["count"] for day in _trend(counts["days"], 7, now)),
+        "trend": trend,
+        "recent": result.get("recent", []),
+    }
+
+
+async def _main():
+    from backend.config.database.init import init_db, get_misc_db
+
+    await init_db()
+    doc = await rebuild_registration_rollup(get_misc_db())
+    print(f"✅ Rebuilt registration metrics rollup ({doc['total']} registrations)")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -0,0 +1,134 @@
+"""
+Keyset (cursor) pagination for list endpoints, ordered newest first on
+(created_at, _id).
+
+List endpoints take PageParams (?limit=, ?cursor=, ?total=) and fetch their
+documents through paginate(). Without limit or cursor the full list is
+returned exactly as before, so existing clients are unaffected. With them,
+only one page is read and the cursors for the neighbouring pages are sent as
+response headers (the body stays the same list the endpoint always returned):
+
+    X-Next-Cursor   older items; absent on the last page
+    X-Prev-Cursor   newer items; absent on the first page
+    X-Total-Count   only with ?total=true
+
+Cursors are opaque: base64url JSON of the boundary item's (created_at, _id).
+Pages are read with a range query on the sort key, so page N costs the same
+as page 1 (no skip), and items inserted meanwhile don't shift pages.
+"""
+import base64
+import json
+import os
+from datetime import datetime
+from typing import List, Optional
+
+from bson import ObjectId
+from fastapi import HTTPException, Query, Response
+
+PAGE_DEFAULT_LIMIT = int(os.getenv("PAGE_DEFAULT_LIMIT", "20"))
+PAGE_MAX_LIMIT = int(os.getenv("PAGE_MAX_LIMIT", "100"))
+PAGE_HEADERS = ["X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count"]
+SORT_FIELD = "created_at"
+
+
+class PageParams:
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=PAGE_MAX_LIMIT, description="Page size; omit (with cursor) for the full list"),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor / X-Prev-Cursor from the previous page"),
+        total: bool = Query(False, description="Send X-Total-Count"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.total = total
+
+    @property
+    def paged(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+
+def _encode(direction: str, doc: dict) -> str:
+    value = doc.get(SORT_FIELD)
+    _id = doc["_id"]
+    payload = {
+        "d": direction,
+        "v": value.isoformat() if isinstance(value, datetime) else value,
+        "t": isinstance(value, datetime),
+        "i": str(_id),
+        "o": isinstance(_id, ObjectId),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        value = datetime.fromisoformat(payload["v"]) if payload.get("t") else payload.get("v")
+        _id = ObjectId(payload["i"]) if payload.get("o") else payload["i"]
+        if payload["d"] not in ("n", "p"):
+            raise ValueError(payload["d"])
+        return payload["d"], value, _id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _keyset(value, _id, older: bool) -> dict:
+    """Items strictly after (older=True: below) the boundary in (created_at desc, _id desc) order."""
+    lt = "$lt" if older else "$gt"
+    if value is None:
+        # Items without created_at sort last; past a null boundary only _id decides.
+        tail = {SORT_FIELD: None, "_id": {lt: _id}}
+        return tail if older else {"$or": [{SORT_FIELD: {"$ne": None}}, tail]}
+    clauses = [{SORT_FIELD: {lt: value}}, {SORT_FIELD: value, "_id": {lt: _id}}]
+    # $lt/$gt only compare within a BSON type. Legacy documents store created_at
+    # as an ISO string, which sorts between null and dates (null < string < date).
+    if isinstance(value, datetime):
+        if older:
+            clauses.append({SORT_FIELD: {"$type": "string"}})
+    elif not older:
+        clauses.append({SORT_FIELD: {"$type": "date"}})
+    if older:
+        clauses.append({SORT_FIELD: None})
+    return {"$or": clauses}
+
+
+def _and(query: dict, extra: dict) -> dict:
+    return {"$and": [query, extra]} if query else extra
+
+
+async def paginate(collection, query: Optional[dict], params: PageParams, response: Response,
+                   projection: Optional[dict] = None) -> List[dict]:
+    """Documents for this request: the full list, or one page plus cursor headers."""
+    query = query or {}
+    if not params.paged:
+        return await collection.find(query, projection).sort([(SORT_FIELD, -1), ("_id", -1)]).to_list(length=None)
+
+    limit = params.limit or PAGE_DEFAULT_LIMIT
+    direction, boundary = "n", None
+    if params.cursor:
+        direction, value, _id = _decode(params.cursor)
+        boundary = (value, _id)
+
+    if direction == "n":
+        find = _and(query, _keyset(*boundary, older=True)) if boundary else query
+        docs = await collection.find(find, projection).sort([(SORT_FIELD, -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
+        has_more, docs = len(docs) > limit, docs[:limit]
+        next_cursor = _encode("n", docs[-1]) if has_more else None
+        prev_cursor = _encode("p", docs[0]) if boundary and docs else None
+    else:
+        find = _and(query, _keyset(*boundary, older=False))
+        docs = await collection.find(find, projection).sort([(SORT_FIELD, 1), ("_id", 1)]).limit(limit + 1).to_list(length=limit + 1)
+        has_more, docs = len(docs) > limit, list(reversed(docs[:limit]))
+        prev_cursor = _encode("p", docs[0]) if has_more else None
+        next_cursor = _encode("n", docs[-1]) if docs else None
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor
+    if params.total:
+        total = await collection.estimated_document_count() if not query else await collection.count_documents(query)
+        response.headers["X-Total-Count"] = str(total)
+    return docs
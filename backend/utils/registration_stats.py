@@ -0,0 +1,208 @@
+"""
+Denormalized registration counters for events.
+
+One document per event in the `registration_stats` collection:
+
+    {
+        "_id": "<event_id>",
+        "total": 12,                              # registered teams
+        "modules": {"Coding": 7, "AI": 5},        # teams per module
+        "statuses": {"pending": 3, "submitted": 6, "approved": 3},
+        "updated_at": datetime,
+    }
+
+Counters are kept in sync with `$inc` whenever a registration is created,
+deleted or changes payment status, so listing pages and admin emails read
+them in O(1) instead of counting `event_registrations` on every request.
+
+Registrations are inserted with `counted_in_stats: true` and add themselves
+with `$inc`. The first registration of an event without counters seeds the
+document from the registrations that lack the flag (those from before the
+counters existed), using `$setOnInsert`, so concurrent first registrations
+neither seed twice nor get counted by both the seed and their own `$inc`.
+
+Rebuild all counters from `event_registrations` (e.g. after a migration):
+    python -m backend.utils.registration_stats
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+STATS_COLLECTION = "registration_stats"
+DEFAULT_STATUS = "pending"
+# Set on registrations that record_registration counts with $inc
+SELF_COUNTED = "counted_in_stats"
+
+
+def _field_key(name: str) -> str:
+    """Escape a module/status name so it is a safe MongoDB field name."""
+    key = str(name).replace(".", "\uff0e")
+    if key.startswith("$"):
+        key = "\uff04" + key[1:]
+    return key
+
+
+def _decode_key(key: str) -> str:
+    name = key.replace("\uff0e", ".")
+    if name.startswith("\uff04"):
+        name = "$" + name[1:]
+    return name
+
+
+def _decode_counts(counts: Optional[dict]) -> Dict[str, int]:
+    return {_decode_key(k): v for k, v in (counts or {}).items() if v}
+
+
+def stats_helper(doc: Optional[dict]) -> dict:
+    """Public shape of a stats document (missing document -> zero counts)."""
+    doc = doc or {}
+    return {
+        "total": doc.get("total", 0),
+        "modules": _decode_counts(doc.get("modules")),
+        "statuses": _decode_counts(doc.get("statuses")),
+    }
+
+
+def _unique_modules(modules: Optional[Iterable[str]]) -> List[str]:
+    # A team listing the same module twice is still one team for that module,
+    # matching count_documents({"modules": module}).
+    return list(dict.fromkeys(m for m in (modules or []) if m))
+
+
+async def _seed_event_stats(db, event_id: str) -> None:
+    """Create the counters of an event from its registrations that do not count themselves."""
+    tally = await _tally(db, {"event_id": event_id, SELF_COUNTED: {"$ne": True}})
+    counts = tally.get(event_id, {"total": 0, "modules": {}, "statuses": {}})
+    try:
+        # A no-op if another registration created the document first
+        await db[STATS_COLLECTION].update_one(
+            {"_id": event_id},
+            {"$setOnInsert": {**counts, "updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        pass
+
+
+async def record_registration(db, event_id: str, modules: Optional[Iterable[str]], status: Optional[str] = None) -> dict:
+    """Count a new (already inserted, with SELF_COUNTED set) registration and return the updated stats for the event."""
+    if await db[STATS_COLLECTION].find_one({"_id": event_id}, {"_id": 1}) is None:
+        # First write for an event whose counters were never built
+        await _seed_event_stats(db, event_id)
+    inc = {"total": 1, f"statuses.{_field_key(status or DEFAULT_STATUS)}": 1}
+    for module in _unique_modules(modules):
+        inc[f"modules.{_field_key(module)}"] = 1
+    doc = await db[STATS_COLLECTION].find_one_and_update(
+        {"_id": event_id},
+        {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return stats_helper(doc)
+
+
+async def record_status_change(db, event_id: str, old_status: Optional[str], new_status: Optional[str]) -> None:
+    """Move one registration between payment status buckets."""
+    old_key = _field_key(old_status or DEFAULT_STATUS)
+    new_key = _field_key(new_status or DEFAULT_STATUS)
+    if old_key == new_key:
+        return
+    await db[STATS_COLLECTION].update_one(
+        {"_id": event_id},
+        {
+            "$inc": {f"statuses.{old_key}": -1, f"statuses.{new_key}": 1},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+    )
+
+
+async def update_payment_status(db, event_id: str, registration_id, new_status: str, fields: Optional[dict] = None) -> Optional[dict]:
+    """Set a registration's payment_status (and `fields`), moving it between status buckets.
+
+    The previous status comes from the same atomic update, so concurrent
+    changes count each real transition once. Returns the registration as it
+    was before, or None if it already had new_status (`fields` are still set).
+    """
+    before = await db.event_registrations.find_one_and_update(
+        {"_id": registration_id, "payment_status": {"$ne": new_status}},
+        {"$set": {**(fields or {}), "payment_status": new_status}},
+        return_document=ReturnDocument.BEFORE,
+    )
+    if before is None:
+        if fields:
+            await db.event_registrations.update_one({"_id": registration_id}, {"$set": fields})
+        return None
+    await record_status_change(db, event_id, before.get("payment_status"), new_status)
+    return before
+
+
+async def drop_event_stats(db, event_id: str) -> None:
+    await db[STATS_COLLECTION].delete_one({"_id": event_id})
+
+
+async def get_event_stats(db, event_id: str) -> Optional[dict]:
+    """Stats for one event, or None if counters were never built for it."""
+    doc = await db[STATS_COLLECTION].find_one({"_id": event_id})
+    return stats_helper(doc) if doc else None
+
+
+async def get_registration_totals(db, event_ids: List[str]) -> Dict[str, int]:
+    """Registered team count per event id, read from the counters in one query."""
+    if not event_ids:
+        return {}
+    totals = {}
+    async for doc in db[STATS_COLLECTION].find({"_id": {"$in": event_ids}}, {"total": 1}):
+        totals[doc["_id"]] = doc.get("total", 0)
+    return totals
+
+
+async def _tally(db, match: dict) -> Dict[str, dict]:
+    """Counters per event id for the event_registrations matching `match`."""
+    rebuilt: Dict[str, dict] = {}
+    projection = {"event_id": 1, "modules": 1, "payment_status": 1}
+    async for reg in db.event_registrations.find(match, projection):
+        event_id = reg.get("event_id")
+        if not event_id:
+            continue
+        stats = rebuilt.setdefault(event_id, {"total": 0, "modules": {}, "statuses": {}})
+        stats["total"] += 1
+        status_key = _field_key(reg.get("payment_status") or DEFAULT_STATUS)
+        stats["statuses"][status_key] = stats["statuses"].get(status_key, 0) + 1
+        for module in _unique_modules(reg.get("modules")):
+            module_key = _field_key(module)
+            stats["modules"][module_key] = stats["modules"].get(module_key, 0) + 1
+    return rebuilt
+
+
+async def reconcile_registration_stats(db, event_ids: Optional[List[str]] = None) -> int:
+    """Rebuild counters from event_registrations. Returns the number of events written."""
+    match = {"event_id": {"$in": event_ids}} if event_ids is not None else {}
+    rebuilt = await _tally(db, match)
+    now = datetime.utcnow()
+    for event_id, stats in rebuilt.items():
+        await db[STATS_COLLECTION].replace_one(
+            {"_id": event_id},
+            {**stats, "updated_at": now},
+            upsert=True,
+        )
+    # Events whose registrations are all gone keep no stale counters.
+    stale = {"_id": {"$nin": list(rebuilt)}}
+    if event_ids is not None:
+        stale["_id"]["$in"] = event_ids
+    await db[STATS_COLLECTION].delete_many(stale)
+    return len(rebuilt)
+
+
+async def _main():
+    from backend.config.database.init import init_db, get_event_db
+
+    await init_db()
+    count = await reconcile_registration_stats(get_event_db())
+    print(f"✅ Rebuilt registration stats for {count} events")
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
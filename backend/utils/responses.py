@@ -0,0 +1,171 @@
+"""
+JSON responses rendered with orjson.
+
+MongoJSONResponse is the app's default response class (server.py). It
+serializes ObjectId, datetime, Enum and nested pydantic models itself, so
+documents from Motor can be returned without converting every field by
+hand. Without the orjson package it falls back to jsonable_encoder and the
+standard json module.
+
+By default FastAPI still validates a handler's return value against its
+response_model and runs it through jsonable_encoder before rendering. List
+endpoints whose output is built from the database can skip both with
+@trusted_response; response_model then only documents the schema:
+
+    @router.get("/events", response_model=List[EventInDB])
+    @trusted_response
+    @cached("events", ttl=60)
+    async def get_events(db=Depends(get_event_db)): ...
+
+Headers set on an injected `response: Response` (the pagination cursors)
+are copied onto the returned response. Since nothing filters the output
+any more, such handlers must build each item from the model's fields,
+e.g. with model_fields(TeamMemberInDB, doc), so stored fields outside the
+model are never exposed.
+
+Benchmark (per-request serialization of /posts, /members/, /events):
+    python -m backend.utils.responses
+"""
+import functools
+import json
+from decimal import Decimal
+from typing import Any, Type
+
+from bson import ObjectId
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    # Without the package responses go through jsonable_encoder + json.dumps.
+    orjson = None
+
+# Headers of the injected response that describe its own body, not ours
+_OWN_HEADERS = {"content-length", "content-type"}
+
+
+def _default(value: Any):
+    """Types orjson does not serialize natively."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.dict()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class MongoJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return json.dumps(
+                jsonable_encoder(content, custom_encoder={ObjectId: str}),
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_fields(model: Type[BaseModel], doc: dict) -> dict:
+    """The model's fields from doc, with the model's defaults for missing ones."""
+    return {name: doc.get(name, field.get_default()) for name, field in model.__fields__.items()}
+
+
+def trusted_response(func):
+    """Render the handler's return value directly, skipping response_model validation."""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        result = await func(*args, **kwargs)
+        if isinstance(result, Response):
+            return result
+        rendered = MongoJSONResponse(result)
+        injected = kwargs.get("response")
+        if isinstance(injected, Response):
+            rendered.raw_headers += [(k, v) for k, v in injected.raw_headers if k.decode("latin-1") not in _OWN_HEADERS]
+        return rendered
+    return wrapper
+
+
+def _benchmark(iterations: int = 50):
+    import asyncio
+    import random
+    import time
+    from datetime import datetime, timedelta
+    from typing import List
+
+    from fastapi.routing import serialize_response
+    from fastapi.utils import create_response_field
+
+    from backend.Schemas.Blog import BlogPostInDB
+    from backend.Schemas.Event import EventInDB
+    from backend.Schemas.Team import TeamMemberInDB
+
+    rng = random.Random(0)
+    words = "taakra students coding design robotics event society workshop hackathon python react mongodb".split()
+
+    def text(n: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(n))
+
+    now = datetime(2026, 1, 1, 12, 30, 15, 123000)
+    posts = [
+        {"id": str(ObjectId()), "title": f"Post {i}", "excerpt": text(25), "content": "".join(f"<p>{text(80)}</p>" for _ in range(15)),
+         "author": "FDC", "read_time": "6 min read", "word_count": 1200, "image_url": None, "image_variants": None,
+         "likes": i, "created_at": now - timedelta(days=i), "updated_at": now}
+        for i in range(20)
+    ]
+    members = [
+        model_fields(TeamMemberInDB, {
+            "_id": ObjectId(), "id": str(ObjectId()), "name": f"Member {i}", "member_type": "team", "tenure": ["2025-2026"],
+            "roles_by_tenure": {"2025-2026": "Developer"}, "bio": text(50), "skills": ["Python", "React"],
+            "socials": {"linkedin": "https://linkedin.com/in/fdc", "github": "https://github.com/fdc"},
+            "projects": [{"title": f"Project {j}", "description": text(30), "link": "https://github.com/fdc"} for j in range(3)],
+            "order_by_tenure": {"2025-2026": i}, "created_at": now, "updated_at": now,
+        })
+        for i in range(80)
+    ]
+    events = [
+        {"id": str(ObjectId()), "title": f"Event {i}", "date": "2026-03-01", "time": "10:00", "location": "Main Hall",
+         "description": text(120), "image_url": None, "image_variants": None, "registration_open": True,
+         "modules": ["Speed Programming", "UI/UX"], "module_amounts": {"Speed Programming": 500, "UI/UX": 700},
+         "discount_codes": [{"code": "EARLY", "amount": "100", "module": "UI/UX"}],
+         "created_at": now, "updated_at": now}
+        for i in range(30)
+    ]
+
+    cases = [
+        ("/posts", List[BlogPostInDB], posts),
+        ("/members/", List[TeamMemberInDB], members),
+        ("/events", List[EventInDB], events),
+    ]
+
+    async def validated(field, content, response_class):
+        body = await serialize_response(field=field, response_content=content)
+        return response_class(body).body
+
+    def timed(run) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            run()
+        return (time.perf_counter() - start) / iterations * 1000
+
+    loop = asyncio.new_event_loop()
+    for path, model, content in cases:
+        field = create_response_field(name="Response_" + path.strip("/"), type_=model)
+        results = {
+            "response_model + JSONResponse": timed(lambda: loop.run_until_complete(validated(field, content, JSONResponse))),
+            "response_model + MongoJSONResponse": timed(lambda: loop.run_until_complete(validated(field, content, MongoJSONResponse))),
+            "trusted_response": timed(lambda: MongoJSONResponse(content).body),
+        }
+        print(f"{path} ({len(content)} items, {len(MongoJSONResponse(content).body):,} bytes)")
+        for name, ms in results.items():
+            print(f"  {name:36} {ms:8.3f} ms")
+    loop.close()
+
+
+if __name__ == "__main__":
+    _benchmark()